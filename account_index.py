@@ -0,0 +1,146 @@
+import heapq
+from typing import Dict, Iterable, List, Set
+
+from sqlalchemy import select
+
+from database import AccountCache, async_session
+
+# 한글 초성 (유니코드 음절 순서)
+CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+CHOSEONG_SET = set(CHOSEONG)
+HANGUL_BEGIN, HANGUL_END = 0xAC00, 0xD7A3
+
+
+def to_choseong(text: str) -> str:
+    """한글 음절을 초성으로 변환 (예: "매출액" → "ㅁㅊㅇ"), 그 외 문자는 그대로"""
+    chars = []
+    for char in text:
+        code = ord(char)
+        if HANGUL_BEGIN <= code <= HANGUL_END:
+            chars.append(CHOSEONG[(code - HANGUL_BEGIN) // 588])
+        else:
+            chars.append(char)
+    return "".join(chars)
+
+
+def _grams(text: str) -> Set[str]:
+    """1-gram, 2-gram 집합"""
+    grams = set(text)
+    grams.update(text[i:i + 2] for i in range(len(text) - 1))
+    return grams
+
+
+class AccountNameIndex:
+    """계정명 자동완성 인메모리 인덱스 (접두어/부분 일치/초성 검색)"""
+
+    def __init__(self):
+        self._names: List[str] = []
+        self._lowered: List[str] = []
+        self._choseong: List[str] = []
+        self._usage: List[int] = []
+        self._ids: Dict[str, int] = {}
+        # n-gram → 계정 id 목록 (일반 / 초성)
+        self._grams: Dict[str, Set[int]] = {}
+        self._choseong_grams: Dict[str, Set[int]] = {}
+        self.loaded = False
+
+    async def load(self):
+        """account_cache 테이블로 인덱스 구축 (앱 시작시 호출)"""
+        async with async_session() as session:
+            result = await session.execute(
+                select(AccountCache.account_nm, AccountCache.usage_count)
+            )
+            rows = result.all()
+
+        self.__init__()
+        for account_nm, usage_count in rows:
+            self._add(account_nm, usage_count or 0)
+        self.loaded = True
+        print(f"계정명 검색 인덱스 구축 완료: {len(self._names)}건")
+
+    def _add(self, account_nm: str, usage_count: int) -> int:
+        account_id = len(self._names)
+        lowered = account_nm.lower()
+        choseong = to_choseong(lowered)
+
+        self._names.append(account_nm)
+        self._lowered.append(lowered)
+        self._choseong.append(choseong)
+        self._usage.append(usage_count)
+        self._ids[account_nm] = account_id
+
+        for gram in _grams(lowered):
+            self._grams.setdefault(gram, set()).add(account_id)
+        for gram in _grams(choseong):
+            self._choseong_grams.setdefault(gram, set()).add(account_id)
+        return account_id
+
+    def record_usage(self, account_names: Iterable[str], increment: int = 1):
+        """계정명 사용 반영 (새 계정명은 추가, 기존 계정명은 사용 빈도 증가)"""
+        for account_nm in account_names:
+            account_id = self._ids.get(account_nm)
+            if account_id is None:
+                self._add(account_nm, increment)
+            else:
+                self._usage[account_id] += increment
+
+    def add_missing(self, account_names: Iterable[str]):
+        """없는 계정명만 추가 (사용 빈도 1)"""
+        for account_nm in account_names:
+            if account_nm not in self._ids:
+                self._add(account_nm, 1)
+
+    def search(self, query: str, limit: int = 20) -> List[str]:
+        """계정명 검색 (접두어 일치 우선, 사용 빈도순)
+
+        검색어에 초성(ㄱ~ㅎ)이 포함되면 초성 기준으로 비교합니다. (예: "ㅁㅊ" → 매출액)
+        """
+        query = query.strip().lower()
+        if not query:
+            return []
+
+        if any(char in CHOSEONG_SET for char in query):
+            query = to_choseong(query)
+            texts, gram_index = self._choseong, self._choseong_grams
+        else:
+            texts, gram_index = self._lowered, self._grams
+
+        # 검색어의 2-gram (한 글자면 1-gram) 목록을 작은 것부터 교집합
+        query_grams = {query[i:i + 2] for i in range(len(query) - 1)} or {query}
+        postings = []
+        for gram in query_grams:
+            ids = gram_index.get(gram)
+            if not ids:
+                return []
+            postings.append(ids)
+        postings.sort(key=len)
+
+        candidates = set(postings[0])
+        for ids in postings[1:]:
+            candidates &= ids
+            if not candidates:
+                return []
+
+        matched = (account_id for account_id in candidates if query in texts[account_id])
+        top = heapq.nsmallest(
+            limit,
+            matched,
+            key=lambda account_id: (
+                not texts[account_id].startswith(query),
+                -self._usage[account_id],
+                self._names[account_id]
+            )
+        )
+        return [self._names[account_id] for account_id in top]
+
+    def stats(self) -> Dict:
+        return {
+            "loaded": self.loaded,
+            "accounts": len(self._names),
+            "grams": len(self._grams),
+            "choseong_grams": len(self._choseong_grams),
+        }
+
+
+# 계정명 검색 인덱스 인스턴스
+account_index = AccountNameIndex()
@@ -0,0 +1,99 @@
+"""XBRL 파서 벤치마크
+
+사용법:
+    python benchmarks/bench_xbrl_parser.py                # 합성 XBRL 문서 사용
+    python benchmarks/bench_xbrl_parser.py filing.xml     # 실제 XBRL 인스턴스 문서 사용
+
+요소 분류(재무 요소 판별 + 계정명 매핑)를 이전 방식(요소마다 키워드/매핑 전체 검사)과
+사전 컴파일 분류기로 각각 수행하여 결과가 같은지 확인하고 소요 시간을 비교합니다.
+"""
+import os
+import random
+import sys
+import time
+import xml.etree.ElementTree as ET
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from xbrl_parser import XBRLParser, FINANCIAL_TAGS  # noqa: E402
+
+SAMPLE_TAGS = [
+    "ifrs-full:CashAndCashEquivalents", "ifrs-full:Inventories", "ifrs-full:TradeAndOtherCurrentReceivables",
+    "dart:AccountsPayable", "ifrs-full:PropertyPlantAndEquipment", "ifrs-full:Goodwill",
+    "ifrs-full:IntangibleAssetsOtherThanGoodwill", "ifrs-full:ShortTermBorrowings", "ifrs-full:LongtermBorrowings",
+    "ifrs-full:IssuedCapital", "ifrs-full:RetainedEarnings", "ifrs-full:Revenue", "ifrs-full:Assets",
+    "ifrs-full:Liabilities", "ifrs-full:Equity", "dart:OtherCurrentAssets", "ifrs-full:CostOfSales",
+    "dart:ShortTermInvestments", "dart:Patents", "dart:Bonds", "dart:SharePremium", "dart:PrepaidExpenses",
+]
+
+
+def generate_instance(facts: int = 200000) -> str:
+    """연도별 컨텍스트와 임의의 재무 요소로 구성된 합성 XBRL 인스턴스"""
+    random.seed(1)
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<xbrli:xbrl xmlns:xbrli="http://www.xbrl.org/2003/instance" '
+        'xmlns:ifrs-full="http://xbrl.ifrs.org/taxonomy/2019-03-27/ifrs-full" '
+        'xmlns:dart="http://dart.fss.or.kr/xbrl">',
+    ]
+    contexts = []
+    for year in (2023, 2022, 2021):
+        context_id = f"CFY{year}eFY"
+        contexts.append(context_id)
+        lines.append(
+            f'<xbrli:context id="{context_id}"><xbrli:entity>'
+            f'<xbrli:identifier scheme="http://dart.fss.or.kr">00126380</xbrli:identifier></xbrli:entity>'
+            f'<xbrli:period><xbrli:instant>{year}-12-31</xbrli:instant></xbrli:period></xbrli:context>'
+        )
+    for i in range(facts):
+        tag = random.choice(SAMPLE_TAGS) + ("" if i % 3 else f"Extension{i % 200}")
+        lines.append(f'<{tag} contextRef="{random.choice(contexts)}" unitRef="KRW">{random.randint(1, 10 ** 12)}</{tag}>')
+        if i % 7 == 0:
+            lines.append(f'<dart:Note{i % 50}>note {i}</dart:Note{i % 50}>')
+    lines.append('</xbrli:xbrl>')
+    return "\n".join(lines)
+
+
+def legacy_classify(parser: XBRLParser, tag: str):
+    """이전 방식: 요소마다 키워드 목록과 account_mapping 전체를 검사"""
+    tag_name = tag.split('}')[-1] if '}' in tag else tag
+    if not any(financial_tag in tag_name for financial_tag in FINANCIAL_TAGS):
+        return None
+    for korean, english in parser.account_mapping.items():
+        if english.lower() in tag_name.lower():
+            return korean
+    return tag_name
+
+
+def timed(func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+
+def main():
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], "rb") as f:
+            content = f.read()
+    else:
+        content = generate_instance().encode("utf-8")
+
+    tags = [elem.tag for elem in ET.fromstring(content).iter()]
+    print(f"문서 크기: {len(content) / 1024 / 1024:.1f}MB, 요소 수: {len(tags)}")
+
+    legacy_parser = XBRLParser()
+    legacy, legacy_seconds = timed(lambda: [legacy_classify(legacy_parser, tag) for tag in tags])
+
+    parser = XBRLParser()
+    compiled, compiled_seconds = timed(lambda: [parser.classify_tag(tag) for tag in tags])
+
+    assert legacy == compiled, "분류 결과가 이전 방식과 다릅니다."
+    print(f"요소 분류 - 이전 방식: {legacy_seconds:.3f}초, 사전 컴파일: {compiled_seconds:.3f}초 "
+          f"({legacy_seconds / compiled_seconds:.1f}배)")
+
+    _, parse_seconds = timed(XBRLParser().parse_xbrl_content, content)
+    print(f"전체 파싱 (스트리밍): {parse_seconds:.3f}초")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+import base64
+import json
+import os
+import time
+import zlib
+from typing import Any, Dict, Optional, Tuple
+
+# 환경변수 로드
+from dotenv import load_dotenv
+load_dotenv()
+
+# 캐시 저장 형식: auto | msgpack-zstd | zlib | json
+CACHE_CODEC = os.getenv("DART_CACHE_CODEC", "auto")
+
+# msgpack / zstandard 는 선택 의존성 (없으면 zlib 사용)
+try:
+    import msgpack
+    import zstandard
+except ImportError:
+    msgpack = None
+    zstandard = None
+
+
+class CacheCodec:
+    """캐시 페이로드 코덱 기본 클래스
+
+    저장 형식은 "<버전 마커>:<원본 JSON 크기>:<본문>" 이며,
+    마커가 없는 기존 행은 JSON 텍스트로 간주합니다.
+    """
+
+    name = ""
+    marker = ""
+
+    def encode_body(self, data: Any) -> str:
+        raise NotImplementedError
+
+    def decode_body(self, body: str) -> Any:
+        raise NotImplementedError
+
+
+class CompactJsonCodec(CacheCodec):
+    """공백/유니코드 이스케이프를 제거한 JSON"""
+
+    name = "json"
+    marker = "j1"
+
+    def encode_body(self, data: Any) -> str:
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+    def decode_body(self, body: str) -> Any:
+        return json.loads(body)
+
+
+class ZlibJsonCodec(CacheCodec):
+    """zlib 압축 JSON (표준 라이브러리만 사용)"""
+
+    name = "zlib"
+    marker = "z1"
+
+    def encode_body(self, data: Any) -> str:
+        raw = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return base64.b64encode(zlib.compress(raw, 6)).decode("ascii")
+
+    def decode_body(self, body: str) -> Any:
+        return json.loads(zlib.decompress(base64.b64decode(body)))
+
+
+class MsgpackZstdCodec(CacheCodec):
+    """msgpack 직렬화 + zstd 압축"""
+
+    name = "msgpack-zstd"
+    marker = "m1"
+
+    def __init__(self):
+        self._compressor = zstandard.ZstdCompressor(level=3)
+        self._decompressor = zstandard.ZstdDecompressor()
+
+    def encode_body(self, data: Any) -> str:
+        packed = msgpack.packb(data, use_bin_type=True)
+        return base64.b64encode(self._compressor.compress(packed)).decode("ascii")
+
+    def decode_body(self, body: str) -> Any:
+        packed = self._decompressor.decompress(base64.b64decode(body))
+        return msgpack.unpackb(packed, raw=False)
+
+
+class CacheSerializer:
+    """코덱 선택, 버전 마커 처리 및 압축/복원 통계"""
+
+    def __init__(self, codec_name: str = CACHE_CODEC):
+        self._codecs: Dict[str, CacheCodec] = {}
+        self.register(CompactJsonCodec())
+        self.register(ZlibJsonCodec())
+        if msgpack is not None and zstandard is not None:
+            self.register(MsgpackZstdCodec())
+
+        self.codec = self._select(codec_name)
+
+        self.encoded_count = 0
+        self.raw_bytes = 0
+        self.encoded_bytes = 0
+        self.decoded_count = 0
+        self.decode_seconds = 0.0
+
+    def register(self, codec: CacheCodec):
+        """코덱 등록 (마커로 기존 행 복원에도 사용)"""
+        self._codecs[codec.marker] = codec
+
+    def _select(self, codec_name: str) -> CacheCodec:
+        by_name = {codec.name: codec for codec in self._codecs.values()}
+        if codec_name == "auto":
+            return by_name.get("msgpack-zstd") or by_name["zlib"]
+        if codec_name not in by_name:
+            print(f"⚠️ 캐시 코덱 '{codec_name}'을(를) 사용할 수 없어 zlib 코덱을 사용합니다.")
+            return by_name["zlib"]
+        return by_name[codec_name]
+
+    def encode(self, data: Any) -> Tuple[str, int]:
+        """(저장할 문자열, 원본 JSON 크기) 반환"""
+        raw_size = len(json.dumps(data))
+        payload = f"{self.codec.marker}:{raw_size}:{self.codec.encode_body(data)}"
+
+        self.encoded_count += 1
+        self.raw_bytes += raw_size
+        self.encoded_bytes += len(payload)
+        return payload, raw_size
+
+    def decode(self, payload: str) -> Tuple[Any, int]:
+        """(데이터, 원본 JSON 크기) 반환"""
+        started = time.perf_counter()
+
+        codec: Optional[CacheCodec] = None
+        marker, _, rest = payload.partition(":")
+        if rest:
+            codec = self._codecs.get(marker)
+
+        if codec is None:
+            # 버전 마커가 없는 기존 JSON 행
+            data, raw_size = json.loads(payload), len(payload)
+        else:
+            size, _, body = rest.partition(":")
+            data, raw_size = codec.decode_body(body), int(size)
+
+        self.decoded_count += 1
+        self.decode_seconds += time.perf_counter() - started
+        return data, raw_size
+
+    def stats(self) -> Dict:
+        return {
+            "codec": self.codec.name,
+            "available_codecs": sorted(codec.name for codec in self._codecs.values()),
+            "encoded": self.encoded_count,
+            "raw_bytes": self.raw_bytes,
+            "encoded_bytes": self.encoded_bytes,
+            "bytes_saved": self.raw_bytes - self.encoded_bytes,
+            "decoded": self.decoded_count,
+            "avg_decode_ms": round(self.decode_seconds * 1000 / self.decoded_count, 3) if self.decoded_count else 0.0,
+        }
+
+
+# 캐시 직렬화 인스턴스
+cache_serializer = CacheSerializer()
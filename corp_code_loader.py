@@ -0,0 +1,168 @@
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import Dict, IO, Iterator, Optional
+
+from sqlalchemy import select
+
+from database import Company, async_session, init_db
+from http_client import dart_http_client
+from rate_limiter import dart_scheduler, PRIORITY_BACKGROUND
+from services import dart_service
+
+# 환경변수 로드
+from dotenv import load_dotenv
+load_dotenv()
+
+DART_API_KEY = os.getenv("DART_API_KEY", "")
+# 기업 고유번호 일괄 저장 단위
+CORP_CODE_BATCH_SIZE = int(os.getenv("DART_CORP_CODE_BATCH_SIZE", "2000"))
+# 다운로드 청크 크기 (바이트)
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+
+def _text(elem: ET.Element, tag: str) -> Optional[str]:
+    value = elem.findtext(tag)
+    if value is None:
+        return None
+    value = value.strip()
+    return value or None
+
+
+def iter_corp_codes(xml_file: IO[bytes]) -> Iterator[Dict]:
+    """CORPCODE.xml 스트리밍 파싱 (처리한 요소는 바로 해제하여 메모리 사용량 일정)"""
+    root = None
+    for event, elem in ET.iterparse(xml_file, events=("start", "end")):
+        if root is None:
+            root = elem
+            continue
+        if event != "end" or elem.tag != "list":
+            continue
+
+        corp_code = _text(elem, "corp_code")
+        corp_name = _text(elem, "corp_name")
+        if corp_code and corp_name:
+            yield {
+                'corp_code': corp_code,
+                'corp_name': corp_name,
+                'stock_code': _text(elem, "stock_code"),
+                'modify_date': _text(elem, "modify_date"),
+            }
+        root.clear()
+
+
+class CorpCodeLoader:
+    """DART 기업 고유번호 전체 목록(corpCode.xml) 가져오기"""
+
+    async def download(self, path: str) -> Optional[Dict]:
+        """zip 파일을 디스크로 스트리밍 다운로드 (실패시 DART 오류 응답 반환)"""
+        await dart_scheduler.acquire(PRIORITY_BACKGROUND)
+
+        async with dart_http_client.stream("corpCode.xml", {'crtfc_key': DART_API_KEY}) as response:
+            with open(path, "wb") as f:
+                async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+
+        if zipfile.is_zipfile(path):
+            return None
+
+        # 키 오류 등은 zip 대신 XML 오류 응답으로 옴
+        try:
+            error = ET.parse(path).getroot()
+            return {
+                'status': error.findtext('status') or '900',
+                'message': error.findtext('message') or '알 수 없는 응답'
+            }
+        except ET.ParseError:
+            return {'status': '900', 'message': 'corpCode.xml 응답이 zip 파일이 아닙니다.'}
+
+    async def import_archive(self, path: str) -> Dict:
+        """zip 파일의 기업 목록을 일괄 저장 (modify_date가 바뀐 기업만 반영)"""
+        started = time.perf_counter()
+        stats = {'total': 0, 'unchanged': 0, 'companies_inserted': 0, 'companies_updated': 0}
+
+        async with async_session() as session:
+            async def flush(batch):
+                # 일괄 저장 단위로 기존 modify_date 조회 (전체 기업 목록을 메모리에 올리지 않음)
+                result = await session.execute(
+                    select(Company.corp_code, Company.modify_date).where(
+                        Company.corp_code.in_([row['corp_code'] for row in batch])
+                    )
+                )
+                known = dict(result.all())
+                changed = [
+                    row for row in batch
+                    if row['corp_code'] not in known or known[row['corp_code']] != row['modify_date']
+                ]
+                stats['unchanged'] += len(batch) - len(changed)
+                if not changed:
+                    return
+
+                counts = await dart_service._upsert_companies(
+                    session, changed, ['corp_name', 'stock_code', 'modify_date']
+                )
+                await session.commit()
+                stats['companies_inserted'] += counts['companies_inserted']
+                stats['companies_updated'] += counts['companies_updated']
+
+            with zipfile.ZipFile(path) as archive:
+                xml_name = next(name for name in archive.namelist() if name.lower().endswith('.xml'))
+                with archive.open(xml_name) as xml_file:
+                    batch = []
+                    for row in iter_corp_codes(xml_file):
+                        stats['total'] += 1
+                        batch.append(row)
+                        if len(batch) >= CORP_CODE_BATCH_SIZE:
+                            await flush(batch)
+                            batch = []
+
+                    if batch:
+                        await flush(batch)
+
+        stats['elapsed_seconds'] = round(time.perf_counter() - started, 2)
+        print(
+            f"기업 고유번호 가져오기 완료: 전체 {stats['total']}건, "
+            f"신규 {stats['companies_inserted']}건, 변경 {stats['companies_updated']}건, "
+            f"변경 없음 {stats['unchanged']}건 ({stats['elapsed_seconds']}초)"
+        )
+        return stats
+
+    async def load(self, path: Optional[str] = None) -> Dict:
+        """기업 고유번호 전체 목록 가져오기 (path가 없으면 DART에서 다운로드)"""
+        if path:
+            return {'status': '000', 'message': '정상', 'data': await self.import_archive(path)}
+
+        if not DART_API_KEY:
+            return {'status': '013', 'message': 'API 키가 설정되지 않았습니다.'}
+
+        fd, temp_path = tempfile.mkstemp(suffix=".zip")
+        os.close(fd)
+        try:
+            error = await self.download(temp_path)
+            if error:
+                return error
+            return {'status': '000', 'message': '정상', 'data': await self.import_archive(temp_path)}
+        finally:
+            os.remove(temp_path)
+
+
+# 기업 고유번호 로더 인스턴스
+corp_code_loader = CorpCodeLoader()
+
+
+async def main():
+    """기업 고유번호 전체 목록 가져오기 (직접 실행용, 인자로 zip 파일 경로 지정 가능)"""
+    await init_db()
+    try:
+        result = await corp_code_loader.load(sys.argv[1] if len(sys.argv) > 1 else None)
+        print(result)
+    finally:
+        await dart_http_client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
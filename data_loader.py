@@ -1,8 +1,14 @@
 import asyncio
+import os
 from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from database import async_session
+from database import Company, async_session
 from services import dart_service
+from rate_limiter import PRIORITY_BACKGROUND
+from account_index import account_index
+from jobs import job_queue
 
 # 주요 기업 목록 (미리 데이터를 로드할 기업들)
 MAJOR_COMPANIES = [
@@ -18,85 +24,119 @@ MAJOR_COMPANIES = [
     {'corp_code': '00204368', 'corp_name': 'KT&G', 'corp_cls': 'Y'},
 ]
 
+# 환경변수 로드
+from dotenv import load_dotenv
+load_dotenv()
+
+# 미리 로드할 기업 고유번호 (쉼표 구분, 없으면 MAJOR_COMPANIES)
+PRELOAD_CORP_CODES = [code.strip() for code in os.getenv("DART_PRELOAD_CORP_CODES", "").split(",") if code.strip()]
+# 재무데이터 로드 연수 (동시 작업 수는 작업 큐의 DART_JOB_CONCURRENCY)
+PRELOAD_YEARS = int(os.getenv("DART_PRELOAD_YEARS", "3"))
+
+def preload_items(companies: List[Dict], years: int = PRELOAD_YEARS) -> List[Tuple[str, Dict]]:
+    """작업 항목 목록: 기업별 공시 1건 + 연도별 재무데이터. (항목 키, payload) 목록 반환"""
+    current_year = datetime.now().year
+    items = []
+    for company in companies:
+        corp_code, corp_name = company['corp_code'], company['corp_name']
+        items.append((f"{corp_code}:disclosures", {'corp_code': corp_code, 'corp_name': corp_name, 'year': None}))
+        for i in range(years):
+            year = str(current_year - i)
+            items.append((f"{corp_code}:{year}", {'corp_code': corp_code, 'corp_name': corp_name, 'year': year}))
+    return items
+
 class DataLoader:
     """데이터 로더 클래스"""
     
     def __init__(self):
         self.service = dart_service
     
-    async def load_major_companies_data(self):
-        """주요 기업들의 공시 및 재무 데이터를 미리 로드"""
+    async def resolve_companies(
+        self,
+        corp_codes: Optional[List[str]] = None,
+        corp_cls: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict]:
+        """로딩할 기업 목록 결정
+        
+        corp_codes(없으면 DART_PRELOAD_CORP_CODES) → 해당 기업,
+        corp_cls 또는 limit → companies 테이블의 상장 기업, 모두 없으면 MAJOR_COMPANIES
+        """
+        corp_codes = corp_codes or PRELOAD_CORP_CODES
+        
         async with async_session() as session:
-            print("📊 주요 기업 데이터 로딩 시작...")
-            
-            for company in MAJOR_COMPANIES:
-                try:
-                    corp_code = company['corp_code']
-                    corp_name = company['corp_name']
-                    
-                    print(f"🏢 {corp_name} 데이터 로딩 중...")
-                    
-                    # 1. 최근 6개월 공시 데이터 로드
-                    await self._load_company_disclosures(session, corp_code, corp_name)
-                    
-                    # 2. 최근 3년 재무데이터 로드
-                    await self._load_company_financials(session, corp_code, corp_name)
-                    
-                    print(f"✅ {corp_name} 데이터 로딩 완료")
-                    
-                except Exception as e:
-                    print(f"❌ {corp_name} 데이터 로딩 실패: {e}")
-                    continue
+            if corp_codes:
+                result = await session.execute(
+                    select(Company.corp_code, Company.corp_name).where(Company.corp_code.in_(corp_codes))
+                )
+                names = dict(result.all())
+                return [{'corp_code': code, 'corp_name': names.get(code, code)} for code in corp_codes]
             
-            print("🎉 주요 기업 데이터 로딩 완료!")
+            if corp_cls or limit:
+                stmt = select(Company.corp_code, Company.corp_name).where(
+                    Company.stock_code.isnot(None)
+                ).order_by(Company.corp_code)
+                if corp_cls:
+                    stmt = stmt.where(Company.corp_cls == corp_cls)
+                if limit:
+                    stmt = stmt.limit(limit)
+                result = await session.execute(stmt)
+                return [{'corp_code': code, 'corp_name': name} for code, name in result.all()]
+        
+        return MAJOR_COMPANIES
+    
+    async def load_item(self, payload: Dict):
+        """작업 항목 하나 로드 (기업 공시 또는 사업연도 재무데이터, 작업별 세션 사용)
+        
+        DART API가 오류를 반환하면 예외를 발생시켜 재시도 대상이 되도록 합니다.
+        """
+        async with async_session() as session:
+            if payload.get('year') is None:
+                data = await self._load_company_disclosures(session, payload['corp_code'], payload['corp_name'])
+            else:
+                data = await self._load_company_financial_year(
+                    session, payload['corp_code'], payload['corp_name'], payload['year']
+                )
+        
+        # 013: 조회된 데이터 없음
+        if data.get('status') not in ('000', '013'):
+            raise RuntimeError(f"DART API 오류 ({data.get('status')}): {data.get('message', '알 수 없는 오류')}")
     
     async def _load_company_disclosures(self, session: AsyncSession, corp_code: str, corp_name: str):
-        """기업 공시 데이터 로드"""
+        """기업 공시 데이터 로드 (실패시 예외 전달)"""
         # 최근 6개월 데이터
         end_date = datetime.now().strftime("%Y%m%d")
         start_date = (datetime.now() - timedelta(days=180)).strftime("%Y%m%d")
         
-        try:
-            # 정기공시 (사업보고서, 분기보고서 등)
-            disclosure_data = await self.service.search_companies_optimized(
-                session=session,
-                corp_code=corp_code,
-                bgn_de=start_date,
-                end_de=end_date,
-                pblntf_ty="A",  # 정기공시
-                page_count=50
-            )
-            
-            if disclosure_data.get('status') == '000' and disclosure_data.get('list'):
-                print(f"  📋 {corp_name} 공시 데이터: {len(disclosure_data['list'])}건")
-            
-        except Exception as e:
-            print(f"  ⚠️ {corp_name} 공시 데이터 로드 실패: {e}")
+        # 정기공시 (사업보고서, 분기보고서 등)
+        disclosure_data = await self.service.search_companies_optimized(
+            session=session,
+            corp_code=corp_code,
+            bgn_de=start_date,
+            end_de=end_date,
+            pblntf_ty="A",  # 정기공시
+            page_count=50,
+            priority=PRIORITY_BACKGROUND
+        )
+        
+        if disclosure_data.get('status') == '000' and disclosure_data.get('list'):
+            print(f"  📋 {corp_name} 공시 데이터: {len(disclosure_data['list'])}건")
+        return disclosure_data
     
-    async def _load_company_financials(self, session: AsyncSession, corp_code: str, corp_name: str):
-        """기업 재무 데이터 로드"""
-        current_year = datetime.now().year
-        years = [str(current_year - i) for i in range(3)]  # 최근 3년
+    async def _load_company_financial_year(self, session: AsyncSession, corp_code: str, corp_name: str, year: str):
+        """기업 사업연도 재무 데이터 로드 (실패시 예외 전달)"""
+        # 사업보고서 재무데이터
+        financial_data = await self.service.get_financial_data_optimized(
+            session=session,
+            corp_code=corp_code,
+            bsns_year=year,
+            reprt_code="11011",  # 사업보고서
+            priority=PRIORITY_BACKGROUND
+        )
         
-        for year in years:
-            try:
-                # 사업보고서 재무데이터
-                financial_data = await self.service.get_financial_data_optimized(
-                    session=session,
-                    corp_code=corp_code,
-                    bsns_year=year,
-                    reprt_code="11011"  # 사업보고서
-                )
-                
-                if financial_data.get('status') == '000' and financial_data.get('list'):
-                    print(f"  💰 {corp_name} {year}년 재무데이터: {len(financial_data['list'])}건")
-                
-                # API 부하를 줄이기 위해 잠시 대기
-                await asyncio.sleep(1)
-                
-            except Exception as e:
-                print(f"  ⚠️ {corp_name} {year}년 재무데이터 로드 실패: {e}")
-                continue
+        if financial_data.get('status') == '000' and financial_data.get('list'):
+            print(f"  💰 {corp_name} {year}년 재무데이터: {len(financial_data['list'])}건")
+        return financial_data
     
     async def load_popular_accounts(self):
         """인기 계정명 미리 로드"""
@@ -113,32 +153,30 @@ class DataLoader:
                 "감가상각비", "금융비용", "법인세비용", "주당순이익"
             ]
             
-            from database import AccountCache
+            from database import AccountCache, upsert_insert
             
-            for account_name in major_accounts:
-                try:
-                    # 계정명 캐시에 추가
-                    from sqlalchemy import select
-                    stmt = select(AccountCache).where(AccountCache.account_nm == account_name)
-                    result = await session.execute(stmt)
-                    existing = result.scalar_one_or_none()
-                    
-                    if not existing:
-                        cache_entry = AccountCache(
-                            account_nm=account_name,
-                            usage_count=1
-                        )
-                        session.add(cache_entry)
-                
-                except Exception as e:
-                    print(f"계정명 '{account_name}' 캐시 추가 실패: {e}")
+            try:
+                # 계정명 캐시에 일괄 추가 (이미 있는 계정명은 유지)
+                stmt = upsert_insert(AccountCache.__table__).on_conflict_do_nothing(
+                    index_elements=['account_nm']
+                )
+                await session.execute(
+                    stmt,
+                    [{'account_nm': account_name, 'usage_count': 1} for account_name in major_accounts]
+                )
+            except Exception as e:
+                print(f"계정명 캐시 추가 실패: {e}")
             
             await session.commit()
+            account_index.add_missing(major_accounts)
             print("✅ 인기 계정명 로딩 완료!")
 
 # 데이터 로더 인스턴스
 data_loader = DataLoader()
 
+# 작업 큐에서 주요 기업 데이터 로딩 항목 처리
+job_queue.register("preload", data_loader.load_item)
+
 async def initialize_sample_data():
     """샘플 데이터 초기화"""
     print("🚀 샘플 데이터 초기화 시작...")
@@ -147,8 +185,7 @@ async def initialize_sample_data():
         # 1. 인기 계정명 로드
         await data_loader.load_popular_accounts()
         
-        # 2. 주요 기업 데이터 로드 (선택적 - 시간이 오래 걸림)
-        # await data_loader.load_major_companies_data()
+        # 2. 주요 기업 데이터 로드는 작업 큐로 실행 (POST /api/data/load-major-companies)
         
         print("🎉 샘플 데이터 초기화 완료!")
         
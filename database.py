@@ -1,8 +1,9 @@
 import asyncio
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, mapped_column, Mapped
-from sqlalchemy import String, DateTime, Text, Integer, Boolean, Index
+from sqlalchemy import String, DateTime, Text, Integer, BigInteger, Boolean, Index
 from datetime import datetime
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
 from typing import Optional
 import os
 
@@ -13,7 +14,9 @@ DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./dart_data.db")
 engine = create_async_engine(
     DATABASE_URL,
     echo=False,  # SQL 로그 출력 (개발시에만 True)
-    future=True
+    future=True,
+    # SQLite: 병렬 로딩 중 쓰기 잠금을 기다릴 시간 (초)
+    connect_args={"timeout": 30} if DATABASE_URL.startswith("sqlite") else {}
 )
 
 # 세션 팩토리 생성
@@ -66,9 +69,13 @@ class DisclosureDocument(Base):
     __table_args__ = (
         Index('idx_corp_code', 'corp_code'),
         Index('idx_rcept_dt', 'rcept_dt'),
-        Index('idx_corp_name', 'corp_name'),
+        Index('idx_corp_name_disclosure', 'corp_name'),
         Index('idx_pblntf_ty', 'pblntf_ty'),
-        Index('idx_corp_cls', 'corp_cls'),
+        Index('idx_corp_cls_disclosure', 'corp_cls'),
+        # 최신순 커서 페이징용 복합 인덱스
+        Index('idx_rcept_dt_no', 'rcept_dt', 'rcept_no'),
+        Index('idx_corp_code_rcept', 'corp_code', 'rcept_dt', 'rcept_no'),
+        Index('idx_corp_cls_rcept', 'corp_cls', 'rcept_dt', 'rcept_no'),
     )
 
 class FinancialStatement(Base):
@@ -79,6 +86,7 @@ class FinancialStatement(Base):
     corp_code: Mapped[str] = mapped_column(String(8), nullable=False)
     bsns_year: Mapped[str] = mapped_column(String(4), nullable=False)
     reprt_code: Mapped[str] = mapped_column(String(5), nullable=False)
+    fs_div: Mapped[Optional[str]] = mapped_column(String(5))  # 개별/연결구분 (CFS, OFS)
     sj_div: Mapped[Optional[str]] = mapped_column(String(5))  # 재무제표구분
     sj_nm: Mapped[Optional[str]] = mapped_column(String(200))  # 재무제표명
     account_id: Mapped[Optional[str]] = mapped_column(String(50))  # 계정ID
@@ -94,6 +102,12 @@ class FinancialStatement(Base):
     bfefrmtrm_amount: Mapped[Optional[str]] = mapped_column(String(50))  # 전전기금액
     ord: Mapped[Optional[str]] = mapped_column(String(10))  # 계정과목 정렬순서
     currency: Mapped[Optional[str]] = mapped_column(String(10))  # 통화단위
+    # 금액 숫자 컬럼 (수집시 변환, SQL 집계/정렬용)
+    thstrm_amount_num: Mapped[Optional[int]] = mapped_column(BigInteger)  # 당기금액
+    thstrm_add_amount_num: Mapped[Optional[int]] = mapped_column(BigInteger)  # 당기누적금액
+    frmtrm_amount_num: Mapped[Optional[int]] = mapped_column(BigInteger)  # 전기금액
+    frmtrm_add_amount_num: Mapped[Optional[int]] = mapped_column(BigInteger)  # 전기누적금액
+    bfefrmtrm_amount_num: Mapped[Optional[int]] = mapped_column(BigInteger)  # 전전기금액
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     
     # 인덱스 설정
@@ -102,8 +116,59 @@ class FinancialStatement(Base):
         Index('idx_account_nm', 'account_nm'),
         Index('idx_corp_code_fs', 'corp_code'),
         Index('idx_bsns_year', 'bsns_year'),
+        Index('idx_account_year_amount', 'account_nm', 'bsns_year', 'thstrm_amount_num'),
     )
 
+class FullFinancialStatement(Base):
+    """전체 재무제표 테이블 (fnlttSinglAcntAll.json, 보고서당 수천 행)
+    
+    (기업, 사업연도, 보고서, 개별/연결, 재무제표구분) 순서의 복합 기본키로 저장하여
+    재무제표 하나를 연속된 구간으로 읽습니다. SQLite에서는 WITHOUT ROWID 테이블로
+    만들어 기본키 인덱스에 행을 함께 저장합니다.
+    """
+    __tablename__ = "full_financial_statements"
+    
+    corp_code: Mapped[str] = mapped_column(String(8), primary_key=True)
+    bsns_year: Mapped[str] = mapped_column(String(4), primary_key=True)
+    reprt_code: Mapped[str] = mapped_column(String(5), primary_key=True)
+    fs_div: Mapped[str] = mapped_column(String(5), primary_key=True)  # 개별/연결구분 (CFS, OFS)
+    sj_div: Mapped[str] = mapped_column(String(5), primary_key=True)  # 재무제표구분 (BS, IS, CIS, CF, SCE)
+    line_no: Mapped[int] = mapped_column(Integer, primary_key=True)  # 재무제표 내 행 순서
+    rcept_no: Mapped[Optional[str]] = mapped_column(String(20))  # 접수번호
+    sj_nm: Mapped[Optional[str]] = mapped_column(String(200))  # 재무제표명
+    account_id: Mapped[Optional[str]] = mapped_column(String(200))  # 계정ID
+    account_nm: Mapped[str] = mapped_column(String(300), nullable=False)  # 계정명
+    account_detail: Mapped[Optional[str]] = mapped_column(String(500))  # 계정상세
+    thstrm_nm: Mapped[Optional[str]] = mapped_column(String(50))  # 당기명
+    thstrm_amount: Mapped[Optional[str]] = mapped_column(String(50))  # 당기금액
+    thstrm_add_amount: Mapped[Optional[str]] = mapped_column(String(50))  # 당기누적금액
+    frmtrm_nm: Mapped[Optional[str]] = mapped_column(String(50))  # 전기명
+    frmtrm_amount: Mapped[Optional[str]] = mapped_column(String(50))  # 전기금액
+    frmtrm_add_amount: Mapped[Optional[str]] = mapped_column(String(50))  # 전기누적금액
+    bfefrmtrm_nm: Mapped[Optional[str]] = mapped_column(String(50))  # 전전기명
+    bfefrmtrm_amount: Mapped[Optional[str]] = mapped_column(String(50))  # 전전기금액
+    ord: Mapped[Optional[str]] = mapped_column(String(10))  # 계정과목 정렬순서
+    currency: Mapped[Optional[str]] = mapped_column(String(10))  # 통화단위
+    thstrm_amount_num: Mapped[Optional[int]] = mapped_column(BigInteger)  # 당기금액
+    thstrm_add_amount_num: Mapped[Optional[int]] = mapped_column(BigInteger)  # 당기누적금액
+    frmtrm_amount_num: Mapped[Optional[int]] = mapped_column(BigInteger)  # 전기금액
+    frmtrm_add_amount_num: Mapped[Optional[int]] = mapped_column(BigInteger)  # 전기누적금액
+    bfefrmtrm_amount_num: Mapped[Optional[int]] = mapped_column(BigInteger)  # 전전기금액
+    
+    # SQLite: WITHOUT ROWID (다른 DB에서는 무시됨)
+    __table_args__ = (
+        {'sqlite_with_rowid': False},
+    )
+
+# 금액 텍스트 컬럼 → 숫자 컬럼 매핑
+AMOUNT_COLUMNS = {
+    'thstrm_amount': 'thstrm_amount_num',
+    'thstrm_add_amount': 'thstrm_add_amount_num',
+    'frmtrm_amount': 'frmtrm_amount_num',
+    'frmtrm_add_amount': 'frmtrm_add_amount_num',
+    'bfefrmtrm_amount': 'bfefrmtrm_amount_num',
+}
+
 class AccountCache(Base):
     """계정명 캐시 테이블 (검색 최적화용)"""
     __tablename__ = "account_cache"
@@ -125,7 +190,7 @@ class ApiCache(Base):
     __tablename__ = "api_cache"
     
     cache_key: Mapped[str] = mapped_column(String(500), primary_key=True)
-    response_data: Mapped[str] = mapped_column(Text, nullable=False)  # JSON 데이터
+    response_data: Mapped[str] = mapped_column(Text, nullable=False)  # 응답 데이터 (cache_codec 형식, 기존 행은 JSON)
     expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     
@@ -134,11 +199,93 @@ class ApiCache(Base):
         Index('idx_expires_at', 'expires_at'),
     )
 
+class LoadJob(Base):
+    """백그라운드 데이터 로딩 작업 테이블"""
+    __tablename__ = "load_jobs"
+    
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    job_key: Mapped[str] = mapped_column(String(200), nullable=False, unique=True)  # 중복 등록 방지 키
+    job_type: Mapped[str] = mapped_column(String(50), nullable=False)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="pending")  # pending, running, completed, failed
+    params: Mapped[Optional[str]] = mapped_column(Text)  # JSON
+    total_items: Mapped[int] = mapped_column(Integer, default=0)
+    completed_items: Mapped[int] = mapped_column(Integer, default=0)
+    failed_items: Mapped[int] = mapped_column(Integer, default=0)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    
+    # 인덱스 설정
+    __table_args__ = (
+        Index('idx_load_job_status', 'status', 'id'),
+    )
+
+class LoadJobItem(Base):
+    """작업 항목 테이블 (항목별 진행 상태를 저장하여 중단된 작업 재개)"""
+    __tablename__ = "load_job_items"
+    
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    job_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    item_key: Mapped[str] = mapped_column(String(100), nullable=False)
+    payload: Mapped[Optional[str]] = mapped_column(Text)  # JSON
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="pending")  # pending, running, done, failed
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    next_attempt_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)  # 재시도 가능 시각
+    locked_until: Mapped[Optional[datetime]] = mapped_column(DateTime)  # 실행 중 항목 점유 만료 시각
+    last_error: Mapped[Optional[str]] = mapped_column(Text)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # 인덱스 설정
+    __table_args__ = (
+        Index('idx_job_item_key', 'job_id', 'item_key', unique=True),
+        Index('idx_job_item_status', 'job_id', 'status', 'next_attempt_at'),
+    )
+
+class SyncState(Base):
+    """증분 동기화 기준점 테이블 (마지막으로 반영한 접수일자/접수번호)"""
+    __tablename__ = "sync_state"
+    
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)  # 예: disclosures:A
+    last_rcept_dt: Mapped[Optional[str]] = mapped_column(String(8))
+    last_rcept_no: Mapped[Optional[str]] = mapped_column(String(20))
+    last_synced_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    covered_from: Mapped[Optional[str]] = mapped_column(String(8))  # 로컬에 모두 반영된 가장 이른 접수일자
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class XbrlHierarchyCache(Base):
+    """XBRL 파싱 결과(계층 구조) 캐시 테이블"""
+    __tablename__ = "xbrl_hierarchy_cache"
+    
+    corp_code: Mapped[str] = mapped_column(String(8), primary_key=True)
+    bsns_year: Mapped[str] = mapped_column(String(4), primary_key=True)
+    reprt_code: Mapped[str] = mapped_column(String(5), primary_key=True)
+    content_hash: Mapped[str] = mapped_column(String(64), nullable=False)  # XBRL 원문 SHA-256
+    hierarchy: Mapped[str] = mapped_column(Text, nullable=False)  # cache_codec 형식
+    stale: Mapped[bool] = mapped_column(Boolean, default=False)  # 정정 공시 접수로 다시 확인 필요
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class FinancialRollup(Base):
+    """보고서별 계층형 재무제표 집계 테이블 (재무제표 수집시 계산)"""
+    __tablename__ = "financial_rollups"
+    
+    corp_code: Mapped[str] = mapped_column(String(8), primary_key=True)
+    reprt_code: Mapped[str] = mapped_column(String(5), primary_key=True)
+    bsns_year: Mapped[str] = mapped_column(String(4), primary_key=True)
+    fs_div: Mapped[Optional[str]] = mapped_column(String(5))  # 집계에 사용한 개별/연결구분
+    source: Mapped[Optional[str]] = mapped_column(String(10))  # 집계에 사용한 재무제표 (summary: 주요계정, full: 전체)
+    hierarchy: Mapped[str] = mapped_column(Text, nullable=False)  # cache_codec 형식
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
 # 데이터베이스 초기화 함수
 async def init_db():
     """데이터베이스 테이블 생성"""
+    from migrations import run_migrations
+    
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        # 기존 DB에 추가된 컬럼/인덱스 반영
+        await run_migrations(conn)
     print("데이터베이스 테이블이 생성되었습니다.")
 
 # 세션 의존성
@@ -151,6 +298,34 @@ async def get_db():
             await session.close()
 
 # 유틸리티 함수들
+def parse_amount(value: Optional[str]) -> Optional[int]:
+    """DART 금액 문자열을 정수로 변환 (예: "1,234" → 1234, "(1,234)" → -1234, "-" → None)"""
+    if value is None:
+        return None
+    
+    text = str(value).strip().replace(',', '')
+    if not text or text == '-':
+        return None
+    
+    negative = text.startswith('(') and text.endswith(')')
+    if negative:
+        text = text[1:-1]
+    
+    try:
+        amount = int(Decimal(text).to_integral_value(rounding=ROUND_HALF_UP))
+    except (InvalidOperation, ValueError):
+        return None
+    
+    return -amount if negative else amount
+
+def upsert_insert(table):
+    """DB 종류에 맞는 INSERT 구문 생성 (ON CONFLICT 지원: SQLite / PostgreSQL)"""
+    if engine.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table)
+
 async def cleanup_expired_cache():
     """만료된 캐시 정리"""
     async with async_session() as session:
@@ -34,6 +34,7 @@ CREATE TABLE financial_statements (
     corp_code VARCHAR(8) NOT NULL,              -- 기업 고유번호
     bsns_year VARCHAR(4) NOT NULL,              -- 사업연도
     reprt_code VARCHAR(5) NOT NULL,             -- 보고서 코드
+    fs_div VARCHAR(5),                          -- 개별/연결구분 (CFS, OFS)
     sj_div VARCHAR(5),                          -- 재무제표구분
     sj_nm VARCHAR(200),                         -- 재무제표명
     account_id VARCHAR(50),                     -- 계정ID
@@ -49,6 +50,11 @@ CREATE TABLE financial_statements (
     bfefrmtrm_amount VARCHAR(50),               -- 전전기금액
     ord VARCHAR(10),                            -- 계정과목 정렬순서
     currency VARCHAR(10),                       -- 통화단위
+    thstrm_amount_num BIGINT,                   -- 당기금액 (숫자)
+    thstrm_add_amount_num BIGINT,               -- 당기누적금액 (숫자)
+    frmtrm_amount_num BIGINT,                   -- 전기금액 (숫자)
+    frmtrm_add_amount_num BIGINT,               -- 전기누적금액 (숫자)
+    bfefrmtrm_amount_num BIGINT,                -- 전전기금액 (숫자)
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP
 );
 
@@ -64,11 +70,106 @@ CREATE TABLE account_cache (
 -- 5. API 응답 캐시 테이블
 CREATE TABLE api_cache (
     cache_key VARCHAR(500) PRIMARY KEY,         -- 캐시 키
-    response_data TEXT NOT NULL,                -- JSON 응답 데이터
+    response_data TEXT NOT NULL,                -- 응답 데이터 (버전 마커 + 압축 본문, 기존 행은 JSON)
     expires_at DATETIME NOT NULL,               -- 만료 시간
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP
 );
 
+-- 6. 백그라운드 데이터 로딩 작업 테이블
+CREATE TABLE load_jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_key VARCHAR(200) NOT NULL UNIQUE,       -- 중복 등록 방지 키
+    job_type VARCHAR(50) NOT NULL,              -- 작업 종류 (preload 등)
+    status VARCHAR(20) NOT NULL DEFAULT 'pending', -- pending, running, completed, failed
+    params TEXT,                                -- 작업 파라미터 (JSON)
+    total_items INTEGER DEFAULT 0,
+    completed_items INTEGER DEFAULT 0,
+    failed_items INTEGER DEFAULT 0,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    started_at DATETIME,
+    finished_at DATETIME
+);
+
+-- 7. 작업 항목 테이블 (항목별 체크포인트, 재시작시 이어서 처리)
+CREATE TABLE load_job_items (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id INTEGER NOT NULL,
+    item_key VARCHAR(100) NOT NULL,             -- 예: 00126380:disclosures, 00126380:2024
+    payload TEXT,                               -- 항목 파라미터 (JSON)
+    status VARCHAR(20) NOT NULL DEFAULT 'pending', -- pending, running, done, failed
+    attempts INTEGER DEFAULT 0,                 -- 시도 횟수
+    next_attempt_at DATETIME,                   -- 재시도 가능 시각 (지수 백오프)
+    locked_until DATETIME,                      -- 실행 중 항목 점유 만료 시각
+    last_error TEXT,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+-- 8. 증분 동기화 기준점 테이블 (disclosure_sync.py)
+CREATE TABLE sync_state (
+    name VARCHAR(50) PRIMARY KEY,               -- 예: disclosures:A (공시유형별)
+    last_rcept_dt VARCHAR(8),                   -- 마지막으로 반영한 접수일자
+    last_rcept_no VARCHAR(20),                  -- 마지막으로 반영한 접수번호
+    last_synced_at DATETIME,
+    covered_from VARCHAR(8),                    -- 로컬에 모두 반영된 가장 이른 접수일자
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+-- 9. XBRL 파싱 결과 캐시 테이블 (정정 공시 접수시 stale 표시)
+CREATE TABLE xbrl_hierarchy_cache (
+    corp_code VARCHAR(8) NOT NULL,
+    bsns_year VARCHAR(4) NOT NULL,
+    reprt_code VARCHAR(5) NOT NULL,
+    content_hash VARCHAR(64) NOT NULL,          -- XBRL 원문 SHA-256
+    hierarchy TEXT NOT NULL,                    -- 계층 구조 (버전 마커 + 압축 본문)
+    stale BOOLEAN DEFAULT 0,                    -- 정정 공시 접수로 다시 확인 필요
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (corp_code, bsns_year, reprt_code)
+);
+
+-- 10. 계층형 재무제표 집계 테이블 (재무제표 수집시 계산)
+CREATE TABLE financial_rollups (
+    corp_code VARCHAR(8) NOT NULL,
+    reprt_code VARCHAR(5) NOT NULL,
+    bsns_year VARCHAR(4) NOT NULL,
+    fs_div VARCHAR(5),                          -- 집계에 사용한 개별/연결구분
+    source VARCHAR(10),                         -- 집계에 사용한 재무제표 (summary: 주요계정, full: 전체)
+    hierarchy TEXT NOT NULL,                    -- 계층 구조 (버전 마커 + 압축 본문, 집계할 계정이 없으면 빈 구조)
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (corp_code, reprt_code, bsns_year)
+);
+
+-- 11. 전체 재무제표 테이블 (fnlttSinglAcntAll.json, 재무제표 단위 구간 조회)
+CREATE TABLE full_financial_statements (
+    corp_code VARCHAR(8) NOT NULL,
+    bsns_year VARCHAR(4) NOT NULL,
+    reprt_code VARCHAR(5) NOT NULL,
+    fs_div VARCHAR(5) NOT NULL,                 -- 개별/연결구분 (CFS, OFS)
+    sj_div VARCHAR(5) NOT NULL,                 -- 재무제표구분 (BS, IS, CIS, CF, SCE)
+    line_no INTEGER NOT NULL,                   -- 재무제표 내 행 순서
+    rcept_no VARCHAR(20),                       -- 접수번호
+    sj_nm VARCHAR(200),                         -- 재무제표명
+    account_id VARCHAR(200),                    -- 계정ID
+    account_nm VARCHAR(300) NOT NULL,           -- 계정명
+    account_detail VARCHAR(500),                -- 계정상세
+    thstrm_nm VARCHAR(50),                      -- 당기명
+    thstrm_amount VARCHAR(50),                  -- 당기금액
+    thstrm_add_amount VARCHAR(50),              -- 당기누적금액
+    frmtrm_nm VARCHAR(50),                      -- 전기명
+    frmtrm_amount VARCHAR(50),                  -- 전기금액
+    frmtrm_add_amount VARCHAR(50),              -- 전기누적금액
+    bfefrmtrm_nm VARCHAR(50),                   -- 전전기명
+    bfefrmtrm_amount VARCHAR(50),               -- 전전기금액
+    ord VARCHAR(10),                            -- 계정과목 정렬순서
+    currency VARCHAR(10),                       -- 통화단위
+    thstrm_amount_num BIGINT,                   -- 금액 숫자 컬럼 (수집시 변환)
+    thstrm_add_amount_num BIGINT,
+    frmtrm_amount_num BIGINT,
+    frmtrm_add_amount_num BIGINT,
+    bfefrmtrm_amount_num BIGINT,
+    PRIMARY KEY (corp_code, bsns_year, reprt_code, fs_div, sj_div, line_no)
+) WITHOUT ROWID;
+
 -- 인덱스 생성
 CREATE INDEX idx_corp_name ON companies(corp_name);
 CREATE INDEX idx_corp_cls ON companies(corp_cls);
@@ -79,13 +180,28 @@ CREATE INDEX idx_rcept_dt ON disclosure_documents(rcept_dt);
 CREATE INDEX idx_corp_name_disclosure ON disclosure_documents(corp_name);
 CREATE INDEX idx_pblntf_ty ON disclosure_documents(pblntf_ty);
 CREATE INDEX idx_corp_cls_disclosure ON disclosure_documents(corp_cls);
+CREATE INDEX idx_rcept_dt_no ON disclosure_documents(rcept_dt, rcept_no);
+CREATE INDEX idx_corp_code_rcept ON disclosure_documents(corp_code, rcept_dt, rcept_no);
+CREATE INDEX idx_corp_cls_rcept ON disclosure_documents(corp_cls, rcept_dt, rcept_no);
 
 CREATE INDEX idx_corp_bsns_reprt ON financial_statements(corp_code, bsns_year, reprt_code);
 CREATE INDEX idx_account_nm_fs ON financial_statements(account_nm);
 CREATE INDEX idx_corp_code_fs ON financial_statements(corp_code);
 CREATE INDEX idx_bsns_year ON financial_statements(bsns_year);
+CREATE INDEX idx_account_year_amount ON financial_statements(account_nm, bsns_year, thstrm_amount_num);
 
 CREATE INDEX idx_account_nm_cache ON account_cache(account_nm);
 CREATE INDEX idx_usage_count ON account_cache(usage_count);
 
 CREATE INDEX idx_expires_at ON api_cache(expires_at);
+
+CREATE INDEX idx_load_job_status ON load_jobs(status, id);
+CREATE UNIQUE INDEX idx_job_item_key ON load_job_items(job_id, item_key);
+CREATE INDEX idx_job_item_status ON load_job_items(job_id, status, next_attempt_at);
+
+-- 기업명 부분 일치 검색 인덱스 (search_index.py 에서 자동 생성)
+-- SQLite: FTS5 trigram (company_name_fts: corp_code, disclosure_name_fts: rcept_no 키 포함) + 동기화 트리거
+--   SELECT rcept_no FROM disclosure_name_fts WHERE corp_name LIKE '%삼성전자%';
+-- PostgreSQL: pg_trgm GIN 인덱스
+--   CREATE INDEX idx_companies_name_trgm ON companies USING gin (corp_name gin_trgm_ops);
+--   CREATE INDEX idx_disclosure_name_trgm ON disclosure_documents USING gin (corp_name gin_trgm_ops);
@@ -0,0 +1,210 @@
+import asyncio
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+
+from database import SyncState, async_session, upsert_insert
+from rate_limiter import PRIORITY_BACKGROUND
+from services import dart_service
+
+# 환경변수 로드
+from dotenv import load_dotenv
+load_dotenv()
+
+# 동기화 주기 (분, 0이면 주기 동기화 사용 안 함)
+SYNC_INTERVAL_MINUTES = int(os.getenv("DART_SYNC_INTERVAL_MINUTES", "0"))
+# 마지막 동기화 후 로컬 데이터를 최신으로 간주하는 시간 (분)
+SYNC_FRESH_MINUTES = int(os.getenv("DART_SYNC_FRESH_MINUTES", "60"))
+# 기준점이 없을 때 처음 동기화할 기간 (일)
+SYNC_INITIAL_DAYS = int(os.getenv("DART_SYNC_INITIAL_DAYS", "7"))
+# 동기화할 공시유형 (A: 정기공시, B: 주요사항보고, ... J: 기타공시)
+SYNC_PBLNTF_TYPES = [ty.strip() for ty in os.getenv("DART_SYNC_PBLNTF_TYPES", "A,B,C,D,E,F,G,H,I,J").split(",") if ty.strip()]
+
+# list.json 페이지 크기 최대값 / 고유번호 없이 한 번에 조회할 수 있는 최대 기간 (일)
+SYNC_PAGE_COUNT = 100
+SYNC_MAX_RANGE_DAYS = 89
+
+
+class DisclosureSync:
+    """접수일자/접수번호 기준점 이후의 새 공시만 가져오는 증분 동기화"""
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.last_result: Optional[Dict] = None
+
+    @staticmethod
+    def state_name(pblntf_ty: str) -> str:
+        return f"disclosures:{pblntf_ty}"
+
+    async def _get_state(self, session, pblntf_ty: str) -> Optional[SyncState]:
+        return await session.get(SyncState, self.state_name(pblntf_ty))
+
+    async def _save_state(self, session, pblntf_ty: str, newest: Optional[Tuple[str, str]], covered_from: str):
+        stmt = upsert_insert(SyncState.__table__)
+        values = {
+            'name': self.state_name(pblntf_ty),
+            'last_rcept_dt': newest[0] if newest else None,
+            'last_rcept_no': newest[1] if newest else None,
+            'last_synced_at': datetime.utcnow(),
+            'covered_from': covered_from,
+            'updated_at': datetime.utcnow(),
+        }
+        stmt = stmt.values(**values).on_conflict_do_update(
+            index_elements=['name'],
+            set_={key: value for key, value in values.items() if key != 'name'}
+        )
+        await session.execute(stmt)
+        await session.commit()
+
+    async def _sync_type(self, pblntf_ty: str) -> Dict:
+        """공시유형 하나 동기화
+
+        기준일부터 오늘까지를 조회 가능 기간(SYNC_MAX_RANGE_DAYS) 단위 구간으로 나누어 오래된 구간부터 처리하고,
+        구간마다 최신순으로 페이지를 넘기다 기준점에 닿으면 중단합니다.
+        """
+        today = datetime.now()
+        async with async_session() as session:
+            state = await self._get_state(session, pblntf_ty)
+            watermark: Optional[Tuple[str, str]] = None
+            if state and state.last_rcept_dt and state.last_rcept_no:
+                watermark = (state.last_rcept_dt, state.last_rcept_no)
+
+            # 같은 날 나중에 접수된 공시가 있을 수 있으므로 기준일 당일부터 조회
+            bgn_de = watermark[0] if watermark else (today - timedelta(days=SYNC_INITIAL_DAYS)).strftime("%Y%m%d")
+            covered_from = min(filter(None, [bgn_de, state.covered_from if state else None]))
+
+            result = {'pblntf_ty': pblntf_ty, 'windows': 0, 'pages': 0, 'fetched': 0, 'documents_inserted': 0}
+            newest = watermark
+            window_start = datetime.strptime(bgn_de, "%Y%m%d")
+            while window_start.date() <= today.date():
+                window_end = min(window_start + timedelta(days=SYNC_MAX_RANGE_DAYS - 1), today)
+                result['windows'] += 1
+
+                page_no = 1
+                while True:
+                    data = await dart_service._make_api_request("list.json", {
+                        'bgn_de': window_start.strftime("%Y%m%d"),
+                        'end_de': window_end.strftime("%Y%m%d"),
+                        'pblntf_ty': pblntf_ty,
+                        'sort': 'date',
+                        'sort_mth': 'desc',
+                        'page_no': page_no,
+                        'page_count': SYNC_PAGE_COUNT
+                    }, PRIORITY_BACKGROUND)
+
+                    status = data.get('status')
+                    if status == '013':
+                        # 조회된 데이터 없음
+                        break
+                    if status != '000':
+                        raise RuntimeError(f"DART API 오류 ({status}): {data.get('message', '알 수 없는 오류')}")
+
+                    documents = data.get('list') or []
+                    result['pages'] += 1
+                    result['fetched'] += len(documents)
+                    if documents:
+                        counts = await dart_service._save_disclosure_documents(session, documents, pblntf_ty=pblntf_ty)
+                        result['documents_inserted'] += counts['documents_inserted']
+
+                    reached_watermark = False
+                    for doc in documents:
+                        key = (doc['rcept_dt'], doc['rcept_no'])
+                        if newest is None or key > newest:
+                            newest = key
+                        if watermark and key <= watermark:
+                            reached_watermark = True
+
+                    if reached_watermark or page_no >= int(data.get('total_page') or 1):
+                        break
+                    page_no += 1
+
+                # 구간을 모두 반영한 뒤에만 기준점 이동 (중간에 실패하면 다음 동기화에서 이 구간부터 다시 조회)
+                await self._save_state(session, pblntf_ty, newest, covered_from)
+                window_start = window_end + timedelta(days=1)
+
+        result['watermark'] = f"{newest[0]}:{newest[1]}" if newest else None
+        return result
+
+    async def sync(self, pblntf_types: Optional[List[str]] = None) -> Dict:
+        """공시유형별 증분 동기화 (동시에 하나만 실행)"""
+        async with self._lock:
+            started = datetime.utcnow()
+            results = []
+            for pblntf_ty in pblntf_types or SYNC_PBLNTF_TYPES:
+                try:
+                    results.append(await self._sync_type(pblntf_ty))
+                except Exception as e:
+                    print(f"⚠️ 공시 동기화 실패 ({pblntf_ty}): {e}")
+                    results.append({'pblntf_ty': pblntf_ty, 'error': str(e)})
+
+            self.last_result = {
+                'started_at': started.isoformat(),
+                'finished_at': datetime.utcnow().isoformat(),
+                'documents_inserted': sum(item.get('documents_inserted', 0) for item in results),
+                'types': results,
+            }
+            print(f"공시 동기화 완료: 신규 {self.last_result['documents_inserted']}건")
+            return self.last_result
+
+    async def is_fresh(self, pblntf_ty: str, bgn_de: Optional[str] = None) -> bool:
+        """최근에 동기화되어 로컬 데이터로 응답할 수 있는지 여부 (bgn_de: 응답할 기간의 시작일)"""
+        async with async_session() as session:
+            state = await self._get_state(session, pblntf_ty)
+        return (
+            state is not None
+            and state.last_synced_at is not None
+            and datetime.utcnow() - state.last_synced_at < timedelta(minutes=SYNC_FRESH_MINUTES)
+            and (bgn_de is None or (state.covered_from is not None and state.covered_from <= bgn_de))
+        )
+
+    async def get_state(self) -> Dict:
+        """공시유형별 동기화 기준점 및 마지막 실행 결과"""
+        async with async_session() as session:
+            result = await session.execute(
+                select(SyncState).where(SyncState.name.like("disclosures:%")).order_by(SyncState.name)
+            )
+            states = result.scalars().all()
+
+        return {
+            'interval_minutes': SYNC_INTERVAL_MINUTES,
+            'running': self._lock.locked(),
+            'states': [
+                {
+                    'name': state.name,
+                    'last_rcept_dt': state.last_rcept_dt,
+                    'last_rcept_no': state.last_rcept_no,
+                    'last_synced_at': state.last_synced_at.isoformat() if state.last_synced_at else None,
+                    'covered_from': state.covered_from,
+                }
+                for state in states
+            ],
+            'last_result': self.last_result,
+        }
+
+    async def _run_periodic(self):
+        while True:
+            try:
+                await self.sync()
+            except Exception as e:
+                print(f"공시 동기화 오류: {e}")
+            await asyncio.sleep(SYNC_INTERVAL_MINUTES * 60)
+
+    def start(self):
+        """주기 동기화 시작 (DART_SYNC_INTERVAL_MINUTES > 0 인 경우)"""
+        if SYNC_INTERVAL_MINUTES <= 0 or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run_periodic())
+        print(f"공시 증분 동기화 시작: {SYNC_INTERVAL_MINUTES}분 주기")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+# 공시 동기화 인스턴스
+disclosure_sync = DisclosureSync()
@@ -0,0 +1,264 @@
+import asyncio
+import json
+import os
+import shutil
+import sys
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import BigInteger, Boolean, DateTime, Integer, func, select, and_
+
+from database import Company, DisclosureDocument, FinancialStatement, async_session, init_db
+from jobs import job_queue
+
+# 환경변수 로드
+from dotenv import load_dotenv
+load_dotenv()
+
+# pyarrow 는 선택 의존성 (없으면 내보내기 사용 불가)
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# Parquet 내보내기 위치 / 한 번에 읽어 쓰는 행 수 / 압축 방식
+EXPORT_DIR = os.getenv("DART_EXPORT_DIR", "exports")
+EXPORT_CHUNK_SIZE = int(os.getenv("DART_EXPORT_CHUNK_SIZE", "50000"))
+EXPORT_COMPRESSION = os.getenv("DART_EXPORT_COMPRESSION", "zstd")
+
+MANIFEST_FILE = "manifest.json"
+PARTITION_FILE = "part-0.parquet"
+
+
+class ExportUnavailable(Exception):
+    """pyarrow 가 설치되지 않음"""
+    pass
+
+
+class ExportTable:
+    """내보낼 테이블 정의 (파티션 컬럼과 파티션별 변경 감지 기준)"""
+
+    def __init__(self, model, partition_by: Optional[List[Tuple[str, object]]] = None, signature=None):
+        self.model = model
+        self.name = model.__tablename__
+        # [(파티션 이름, SQL 식)], 없으면 파일 하나로 내보냄
+        self.partition_by = partition_by or []
+        # 파티션별 변경 감지용 집계 식 (값이 달라진 파티션만 다시 씀)
+        self.signature = signature or [func.count()]
+
+    @property
+    def columns(self):
+        # 파티션 컬럼은 디렉터리 이름(hive 형식)으로 표현하므로 파일에서 제외
+        partition_names = {name for name, _ in self.partition_by}
+        return [column for column in self.model.__table__.columns if column.name not in partition_names]
+
+
+EXPORT_TABLES = {
+    table.name: table
+    for table in [
+        # 재무제표는 삭제 후 다시 저장되므로 행 수 + 최대 id 로 변경 감지
+        ExportTable(
+            FinancialStatement,
+            partition_by=[
+                ('bsns_year', FinancialStatement.bsns_year),
+                ('reprt_code', FinancialStatement.reprt_code),
+            ],
+            signature=[func.count(), func.max(FinancialStatement.id)]
+        ),
+        # 공시는 접수연도별 (신규 공시와 공시유형 보완 반영)
+        ExportTable(
+            DisclosureDocument,
+            partition_by=[('rcept_year', func.substr(DisclosureDocument.rcept_dt, 1, 4))],
+            signature=[func.count(), func.max(DisclosureDocument.rcept_no), func.count(DisclosureDocument.pblntf_ty)]
+        ),
+        ExportTable(
+            Company,
+            signature=[func.count(), func.max(Company.updated_at)]
+        ),
+    ]
+}
+
+
+def _arrow_type(column):
+    if isinstance(column.type, (Integer, BigInteger)):
+        return pa.int64()
+    if isinstance(column.type, Boolean):
+        return pa.bool_()
+    if isinstance(column.type, DateTime):
+        return pa.timestamp('us')
+    return pa.string()
+
+
+class ParquetExporter:
+    """financial_statements / disclosure_documents / companies 를 파티션별 Parquet 으로 내보내기
+
+    파티션마다 집계값(행 수 등)을 manifest.json 에 기록하고, 값이 바뀐 파티션만 다시 씁니다.
+    행은 EXPORT_CHUNK_SIZE 단위로 읽어 바로 파일에 쓰므로 메모리 사용량이 일정합니다.
+    """
+
+    def __init__(self, export_dir: str = EXPORT_DIR, chunk_size: int = EXPORT_CHUNK_SIZE):
+        self.export_dir = export_dir
+        self.chunk_size = chunk_size
+        self._lock = asyncio.Lock()
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.export_dir, MANIFEST_FILE)
+
+    def load_manifest(self) -> Dict:
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _save_manifest(self, manifest: Dict):
+        os.makedirs(self.export_dir, exist_ok=True)
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _partition_dir(self, table: ExportTable, values: Tuple) -> str:
+        parts = [f"{name}={value}" for (name, _), value in zip(table.partition_by, values)]
+        return os.path.join(table.name, *parts)
+
+    async def _partition_signatures(self, session, table: ExportTable) -> Dict[str, Tuple[Tuple, List]]:
+        """파티션별 (파티션 값, 집계값)"""
+        partition_exprs = [expr for _, expr in table.partition_by]
+        stmt = select(*partition_exprs, *table.signature).select_from(table.model)
+        if partition_exprs:
+            stmt = stmt.group_by(*partition_exprs)
+
+        result = await session.execute(stmt)
+        signatures = {}
+        for row in result.all():
+            values = tuple(row[:len(partition_exprs)])
+            signature = [value.isoformat() if isinstance(value, datetime) else value for value in row[len(partition_exprs):]]
+            if not partition_exprs and not signature[0]:
+                continue
+            signatures[self._partition_dir(table, values)] = (values, signature)
+        return signatures
+
+    async def _write_partition(self, session, table: ExportTable, values: Tuple, path: str) -> int:
+        """파티션 하나를 청크 단위로 읽어 Parquet 파일로 쓰기 (완료 후 교체)"""
+        columns = table.columns
+        schema = pa.schema([pa.field(column.name, _arrow_type(column)) for column in columns])
+
+        stmt = select(*columns)
+        if table.partition_by:
+            stmt = stmt.where(and_(*[expr == value for (_, expr), value in zip(table.partition_by, values)]))
+
+        target_dir = os.path.join(self.export_dir, path)
+        os.makedirs(target_dir, exist_ok=True)
+        tmp_path = os.path.join(target_dir, PARTITION_FILE + ".tmp")
+
+        rows_written = 0
+        writer = pq.ParquetWriter(tmp_path, schema, compression=EXPORT_COMPRESSION)
+        try:
+            result = await session.stream(stmt.execution_options(yield_per=self.chunk_size))
+            async for rows in result.partitions(self.chunk_size):
+                arrays = [pa.array(values, type=field.type) for values, field in zip(zip(*rows), schema)]
+                writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+                rows_written += len(rows)
+        except BaseException:
+            writer.close()
+            os.remove(tmp_path)
+            raise
+        writer.close()
+
+        os.replace(tmp_path, os.path.join(target_dir, PARTITION_FILE))
+        return rows_written
+
+    async def export_table(self, table_name: str, full: bool = False) -> Dict:
+        """테이블 하나 내보내기 (full=True 이면 모든 파티션을 다시 씀)"""
+        if pa is None:
+            raise ExportUnavailable("Parquet 내보내기에는 pyarrow 가 필요합니다. (pip install pyarrow)")
+
+        table = EXPORT_TABLES[table_name]
+        result = {'table': table_name, 'written': 0, 'skipped': 0, 'removed': 0, 'rows': 0}
+
+        async with self._lock:
+            manifest = self.load_manifest()
+            exported = manifest.get(table_name, {})
+
+            async with async_session() as session:
+                signatures = await self._partition_signatures(session, table)
+
+                for path, (values, signature) in sorted(signatures.items()):
+                    if not full and exported.get(path, {}).get('signature') == signature:
+                        result['skipped'] += 1
+                        continue
+
+                    rows = await self._write_partition(session, table, values, path)
+                    exported[path] = {
+                        'signature': signature,
+                        'rows': rows,
+                        'exported_at': datetime.utcnow().isoformat(),
+                    }
+                    result['written'] += 1
+                    result['rows'] += rows
+                    # 중간에 실패해도 완료한 파티션은 다시 쓰지 않도록 매번 기록
+                    manifest[table_name] = exported
+                    self._save_manifest(manifest)
+
+            # DB에서 사라진 파티션 정리
+            for path in [path for path in exported if path not in signatures]:
+                shutil.rmtree(os.path.join(self.export_dir, path), ignore_errors=True)
+                del exported[path]
+                result['removed'] += 1
+
+            manifest[table_name] = exported
+            self._save_manifest(manifest)
+
+        print(
+            f"Parquet 내보내기 {table_name}: 파티션 {result['written']}개 작성 ({result['rows']}행), "
+            f"{result['skipped']}개 변경 없음, {result['removed']}개 삭제"
+        )
+        return result
+
+    async def export(self, table_names: Optional[List[str]] = None, full: bool = False) -> Dict:
+        """여러 테이블 내보내기"""
+        started = datetime.utcnow()
+        results = [await self.export_table(name, full) for name in table_names or list(EXPORT_TABLES)]
+        return {
+            'export_dir': os.path.abspath(self.export_dir),
+            'started_at': started.isoformat(),
+            'finished_at': datetime.utcnow().isoformat(),
+            'tables': results,
+        }
+
+    async def export_item(self, payload: Dict):
+        """작업 큐 항목 처리 (테이블 하나)"""
+        await self.export_table(payload['table'], payload.get('full', False))
+
+
+# Parquet 내보내기 인스턴스
+parquet_exporter = ParquetExporter()
+
+# 작업 큐에서 테이블별 내보내기 항목 처리
+job_queue.register("export", parquet_exporter.export_item)
+
+
+async def main():
+    """Parquet 내보내기 (직접 실행용)
+
+    사용법: python exporter.py [--full] [테이블명 ...]
+    """
+    args = sys.argv[1:]
+    full = "--full" in args
+    table_names = [arg for arg in args if arg != "--full"]
+    unknown = [name for name in table_names if name not in EXPORT_TABLES]
+    if unknown:
+        print(f"알 수 없는 테이블: {', '.join(unknown)} (가능: {', '.join(EXPORT_TABLES)})")
+        sys.exit(1)
+
+    await init_db()
+    result = await parquet_exporter.export(table_names or None, full)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
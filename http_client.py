@@ -0,0 +1,112 @@
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+
+import httpx
+
+# 환경변수 로드
+from dotenv import load_dotenv
+load_dotenv()
+
+DART_BASE_URL = "https://opendart.fss.or.kr/api"
+
+# 연결 풀 설정
+HTTP_MAX_CONNECTIONS = int(os.getenv("DART_HTTP_MAX_CONNECTIONS", "20"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("DART_HTTP_MAX_KEEPALIVE", "10"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("DART_HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP2_ENABLED = os.getenv("DART_HTTP2", "false").lower() in ("1", "true", "yes")
+HTTP_DEFAULT_TIMEOUT = float(os.getenv("DART_HTTP_TIMEOUT", "30"))
+
+# 엔드포인트별 타임아웃 (초)
+ENDPOINT_TIMEOUTS = {
+    "list.json": 10.0,
+    "fnlttSinglAcnt.json": 20.0,
+    "fnlttXbrl.xml": 60.0,
+    "corpCode.xml": 120.0,
+}
+
+
+class DartHttpClient:
+    """DART API 공용 HTTP 클라이언트 (프로세스당 하나의 연결 풀 유지)"""
+
+    def __init__(self, base_url: str = DART_BASE_URL):
+        self.base_url = base_url
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _http2_available(self) -> bool:
+        """HTTP/2 사용 가능 여부 (h2 패키지 필요)"""
+        if not HTTP2_ENABLED:
+            return False
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            print("⚠️ h2 패키지가 없어 HTTP/1.1로 연결합니다. (pip install httpx[http2])")
+            return False
+        return True
+
+    async def start(self):
+        """연결 풀 생성 (앱 시작시 호출)"""
+        if self._client is not None:
+            return
+
+        limits = httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        )
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            limits=limits,
+            timeout=HTTP_DEFAULT_TIMEOUT,
+            http2=self._http2_available(),
+        )
+        print(f"DART HTTP 클라이언트 시작: 최대 연결={HTTP_MAX_CONNECTIONS}, keep-alive={HTTP_MAX_KEEPALIVE}")
+
+    async def close(self):
+        """연결 풀 종료 (앱 종료시 호출)"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            print("DART HTTP 클라이언트 종료")
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            raise RuntimeError("DART HTTP 클라이언트가 시작되지 않았습니다.")
+        return self._client
+
+    def timeout_for(self, endpoint: str) -> float:
+        """엔드포인트별 타임아웃 조회"""
+        return ENDPOINT_TIMEOUTS.get(endpoint, HTTP_DEFAULT_TIMEOUT)
+
+    async def get(self, endpoint: str, params: Dict) -> httpx.Response:
+        """GET 요청 (스크립트 등 startup 없이 호출된 경우 자동으로 풀 생성)"""
+        if self._client is None:
+            await self.start()
+
+        response = await self.client.get(
+            f"/{endpoint}",
+            params=params,
+            timeout=self.timeout_for(endpoint),
+        )
+        response.raise_for_status()
+        return response
+
+    @asynccontextmanager
+    async def stream(self, endpoint: str, params: Dict) -> AsyncIterator[httpx.Response]:
+        """스트리밍 GET 요청 (대용량 파일 다운로드용, 본문을 메모리에 올리지 않음)"""
+        if self._client is None:
+            await self.start()
+
+        async with self.client.stream(
+            "GET",
+            f"/{endpoint}",
+            params=params,
+            timeout=self.timeout_for(endpoint),
+        ) as response:
+            response.raise_for_status()
+            yield response
+
+
+# HTTP 클라이언트 인스턴스
+dart_http_client = DartHttpClient()
@@ -0,0 +1,390 @@
+import asyncio
+import json
+import os
+import random
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import select, update, insert, func, or_, and_, desc
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import LoadJob, LoadJobItem, async_session
+
+# 환경변수 로드
+from dotenv import load_dotenv
+load_dotenv()
+
+# 항목별 최대 시도 횟수 / 재시도 대기 시간 (초, 시도할 때마다 2배)
+JOB_MAX_ATTEMPTS = int(os.getenv("DART_JOB_MAX_ATTEMPTS", "5"))
+JOB_RETRY_BASE_SECONDS = float(os.getenv("DART_JOB_RETRY_BASE_SECONDS", "30"))
+JOB_RETRY_MAX_SECONDS = 3600
+# 동시 처리 항목 수 / 대기 항목이 없을 때 확인 간격 (초)
+JOB_CONCURRENCY = int(os.getenv("DART_JOB_CONCURRENCY", "8"))
+JOB_POLL_SECONDS = float(os.getenv("DART_JOB_POLL_SECONDS", "5"))
+# 실행 중 항목 점유 시간 (초, 처리 중에는 주기적으로 연장하며 프로세스가 비정상 종료되면 이 시간 후 다시 처리)
+JOB_LEASE_SECONDS = int(os.getenv("DART_JOB_LEASE_SECONDS", "300"))
+
+ACTIVE_JOB_STATUSES = ("pending", "running")
+
+# 작업 항목 처리 함수 (항목 payload를 받아 실패시 예외 발생)
+ItemHandler = Callable[[Dict], Awaitable[None]]
+
+
+def retry_delay(attempts: int) -> float:
+    """지수 백오프 재시도 대기 시간 (10% 지터 포함)"""
+    delay = min(JOB_RETRY_BASE_SECONDS * (2 ** (attempts - 1)), JOB_RETRY_MAX_SECONDS)
+    return delay * random.uniform(1.0, 1.1)
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+class JobQueue:
+    """DB에 저장되는 백그라운드 작업 큐
+
+    작업은 항목 단위로 저장되고 항목마다 완료 여부를 기록하므로,
+    서버가 재시작되어도 끝나지 않은 항목부터 이어서 처리합니다.
+    """
+
+    def __init__(self, concurrency: int = JOB_CONCURRENCY):
+        self.concurrency = concurrency
+        self._handlers: Dict[str, ItemHandler] = {}
+        self._workers: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        # 이 프로세스에서 실행 중인 항목 id (종료시 점유 해제)
+        self._running_items: Set[int] = set()
+
+    def register(self, job_type: str, handler: ItemHandler):
+        """작업 종류별 항목 처리 함수 등록"""
+        self._handlers[job_type] = handler
+
+    async def start(self):
+        """작업 워커 시작 (앱 시작시 호출)"""
+        if self._workers:
+            return
+        self._wakeup = asyncio.Event()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(max(1, self.concurrency))]
+        print(f"작업 큐 워커 시작: 동시 {len(self._workers)}개")
+
+    async def stop(self):
+        """작업 워커 종료 (처리 중이던 항목은 다음 실행에서 다시 처리)"""
+        if not self._workers:
+            return
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        if self._running_items:
+            async with async_session() as session:
+                await session.execute(
+                    update(LoadJobItem)
+                    .where(LoadJobItem.id.in_(list(self._running_items)), LoadJobItem.status == "running")
+                    .values(status="pending", locked_until=None, attempts=LoadJobItem.attempts - 1)
+                )
+                await session.commit()
+            self._running_items.clear()
+        print("작업 큐 워커 종료")
+
+    async def enqueue(
+        self,
+        job_type: str,
+        job_key: str,
+        items: List[Tuple[str, Dict]],
+        params: Optional[Dict] = None
+    ) -> Tuple[Dict, bool]:
+        """작업 등록. (작업 정보, 새로 등록 여부) 반환
+
+        같은 job_key 작업이 있으면 그 작업을 반환하되, 끝난 작업에 실패한 항목이 있으면
+        그 항목들을 다시 대기 상태로 돌려 재시도합니다 (이 경우도 새로 등록한 것으로 봄).
+        """
+        now = datetime.utcnow()
+        async with async_session() as session:
+            existing = await self._get_job_by_key(session, job_key)
+            if existing is not None:
+                if existing.status not in ACTIVE_JOB_STATUSES and await self._reopen(session, existing.id, now):
+                    await session.refresh(existing)
+                    return self._job_to_dict(existing), True
+                return self._job_to_dict(existing), False
+
+            job = LoadJob(
+                job_key=job_key,
+                job_type=job_type,
+                status="pending" if items else "completed",
+                params=json.dumps(params or {}, ensure_ascii=False),
+                total_items=len(items),
+                created_at=now,
+                finished_at=None if items else now
+            )
+            session.add(job)
+            try:
+                await session.flush()
+                if items:
+                    await session.execute(insert(LoadJobItem.__table__), [
+                        {
+                            'job_id': job.id,
+                            'item_key': item_key,
+                            'payload': json.dumps(payload, ensure_ascii=False),
+                            'status': 'pending',
+                            'attempts': 0,
+                            'next_attempt_at': now,
+                            'updated_at': now,
+                        }
+                        for item_key, payload in items
+                    ])
+                await session.commit()
+            except IntegrityError:
+                # 동시에 같은 키로 등록된 경우
+                await session.rollback()
+                existing = await self._get_job_by_key(session, job_key)
+                return self._job_to_dict(existing), False
+
+            job_info = self._job_to_dict(job)
+
+        print(f"작업 등록: #{job_info['id']} {job_type} ({len(items)}건)")
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job_info, True
+
+    async def retry(self, job_id: int) -> Optional[Dict]:
+        """작업의 실패한 항목을 다시 대기 상태로 돌림 (작업이 없으면 None)"""
+        async with async_session() as session:
+            job = await session.get(LoadJob, job_id)
+            if job is None:
+                return None
+            retried = await self._reopen(session, job_id, datetime.utcnow())
+            if retried:
+                await session.refresh(job)
+            job_info = self._job_to_dict(job)
+        job_info['retried_items'] = retried
+        return job_info
+
+    async def _reopen(self, session: AsyncSession, job_id: int, now: datetime) -> int:
+        """실패한 항목을 시도 횟수를 초기화하여 대기 상태로 돌리고 작업을 다시 시작 (재시도할 항목 수 반환)"""
+        result = await session.execute(
+            update(LoadJobItem)
+            .where(LoadJobItem.job_id == job_id, LoadJobItem.status == "failed")
+            .values(status="pending", attempts=0, next_attempt_at=now, locked_until=None,
+                    last_error=None, updated_at=now)
+        )
+        if not result.rowcount:
+            return 0
+
+        await session.execute(
+            update(LoadJob).where(LoadJob.id == job_id)
+            .values(status="pending", failed_items=0, finished_at=None)
+        )
+        await session.commit()
+
+        print(f"작업 재시도: #{job_id} (실패 항목 {result.rowcount}건)")
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return result.rowcount
+
+    async def _get_job_by_key(self, session: AsyncSession, job_key: str) -> Optional[LoadJob]:
+        result = await session.execute(select(LoadJob).where(LoadJob.job_key == job_key))
+        return result.scalar_one_or_none()
+
+    def _claimable(self, now: datetime):
+        """처리 가능한 항목 조건 (재시도 시각이 된 대기 항목 또는 점유가 만료된 실행 중 항목)"""
+        return or_(
+            and_(LoadJobItem.status == "pending", LoadJobItem.next_attempt_at <= now),
+            and_(LoadJobItem.status == "running", LoadJobItem.locked_until < now)
+        )
+
+    async def _claim_item(self) -> Optional[Tuple[int, int, str, str, int]]:
+        """처리할 항목 하나를 점유. (항목 id, 작업 id, 작업 종류, payload, 시도 횟수) 반환"""
+        now = datetime.utcnow()
+        async with async_session() as session:
+            result = await session.execute(
+                select(LoadJobItem.id)
+                .join(LoadJob, LoadJob.id == LoadJobItem.job_id)
+                .where(LoadJob.status.in_(ACTIVE_JOB_STATUSES), self._claimable(now))
+                .order_by(LoadJobItem.job_id, LoadJobItem.id)
+                .limit(self.concurrency)
+            )
+            candidate_ids = result.scalars().all()
+
+            for item_id in candidate_ids:
+                # 다른 워커가 먼저 점유한 항목은 건너뜀
+                claimed = await session.execute(
+                    update(LoadJobItem)
+                    .where(LoadJobItem.id == item_id, self._claimable(now))
+                    .values(
+                        status="running",
+                        attempts=LoadJobItem.attempts + 1,
+                        locked_until=now + timedelta(seconds=JOB_LEASE_SECONDS)
+                    )
+                )
+                if claimed.rowcount != 1:
+                    continue
+
+                result = await session.execute(
+                    select(LoadJobItem.job_id, LoadJob.job_type, LoadJobItem.payload, LoadJobItem.attempts)
+                    .join(LoadJob, LoadJob.id == LoadJobItem.job_id)
+                    .where(LoadJobItem.id == item_id)
+                )
+                job_id, job_type, payload, attempts = result.one()
+                await session.execute(
+                    update(LoadJob)
+                    .where(LoadJob.id == job_id, LoadJob.status == "pending")
+                    .values(status="running", started_at=now)
+                )
+                await session.commit()
+                self._running_items.add(item_id)
+                return item_id, job_id, job_type, payload, attempts
+
+        return None
+
+    async def _worker(self):
+        while True:
+            try:
+                claimed = await self._claim_item()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"작업 항목 조회 오류: {e}")
+                claimed = None
+
+            if claimed is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), JOB_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self._run_item(*claimed)
+
+    async def _heartbeat(self, item_id: int):
+        """처리 중인 항목의 점유 시간을 주기적으로 연장 (오래 걸리는 항목이 다시 점유되지 않도록)"""
+        while True:
+            await asyncio.sleep(JOB_LEASE_SECONDS / 3)
+            try:
+                async with async_session() as session:
+                    await session.execute(
+                        update(LoadJobItem)
+                        .where(LoadJobItem.id == item_id, LoadJobItem.status == "running")
+                        .values(locked_until=datetime.utcnow() + timedelta(seconds=JOB_LEASE_SECONDS))
+                    )
+                    await session.commit()
+            except Exception as e:
+                print(f"작업 항목 점유 연장 오류 (#{item_id}): {e}")
+
+    async def _run_item(self, item_id: int, job_id: int, job_type: str, payload: str, attempts: int):
+        """항목 처리 후 결과 기록 (실패시 백오프 후 재시도, 최대 시도 횟수를 넘으면 실패 처리)"""
+        error = None
+        heartbeat = asyncio.create_task(self._heartbeat(item_id))
+        try:
+            handler = self._handlers.get(job_type)
+            if handler is None:
+                raise RuntimeError(f"등록되지 않은 작업 종류입니다: {job_type}")
+            await handler(json.loads(payload or "{}"))
+        except asyncio.CancelledError:
+            # 종료 중: stop()에서 점유 해제
+            raise
+        except Exception as e:
+            error = str(e) or e.__class__.__name__
+        finally:
+            heartbeat.cancel()
+            await asyncio.gather(heartbeat, return_exceptions=True)
+
+        now = datetime.utcnow()
+        if error is None:
+            values = {'status': 'done', 'locked_until': None, 'last_error': None}
+        elif attempts >= JOB_MAX_ATTEMPTS:
+            values = {'status': 'failed', 'locked_until': None, 'last_error': error[:1000]}
+        else:
+            values = {
+                'status': 'pending',
+                'locked_until': None,
+                'last_error': error[:1000],
+                'next_attempt_at': now + timedelta(seconds=retry_delay(attempts)),
+            }
+
+        async with async_session() as session:
+            await session.execute(update(LoadJobItem).where(LoadJobItem.id == item_id).values(**values))
+            await self._refresh_job(session, job_id, now)
+            await session.commit()
+        self._running_items.discard(item_id)
+
+    async def _refresh_job(self, session: AsyncSession, job_id: int, now: datetime):
+        """항목 상태로 작업 진행 현황 갱신 (남은 항목이 없으면 작업 종료)"""
+        result = await session.execute(
+            select(LoadJobItem.status, func.count())
+            .where(LoadJobItem.job_id == job_id)
+            .group_by(LoadJobItem.status)
+        )
+        counts = dict(result.all())
+        completed = counts.get("done", 0)
+        failed = counts.get("failed", 0)
+
+        values = {'completed_items': completed, 'failed_items': failed}
+        if not counts.get("pending") and not counts.get("running"):
+            values['status'] = "failed" if failed and not completed else "completed"
+            values['finished_at'] = now
+            print(f"작업 종료: #{job_id} (완료 {completed}건, 실패 {failed}건)")
+
+        await session.execute(update(LoadJob).where(LoadJob.id == job_id).values(**values))
+
+    def _job_to_dict(self, job: LoadJob) -> Dict:
+        return {
+            'id': job.id,
+            'job_key': job.job_key,
+            'job_type': job.job_type,
+            'status': job.status,
+            'params': json.loads(job.params) if job.params else {},
+            'total_items': job.total_items,
+            'completed_items': job.completed_items or 0,
+            'failed_items': job.failed_items or 0,
+            'created_at': _isoformat(job.created_at),
+            'started_at': _isoformat(job.started_at),
+            'finished_at': _isoformat(job.finished_at),
+        }
+
+    async def list_jobs(self, limit: int = 20) -> List[Dict]:
+        """최근 작업 목록"""
+        async with async_session() as session:
+            result = await session.execute(select(LoadJob).order_by(desc(LoadJob.id)).limit(limit))
+            return [self._job_to_dict(job) for job in result.scalars().all()]
+
+    async def get_job(self, job_id: int, error_limit: int = 20) -> Optional[Dict]:
+        """작업 상세 (항목 상태별 건수 및 최근 오류 포함)"""
+        async with async_session() as session:
+            job = await session.get(LoadJob, job_id)
+            if job is None:
+                return None
+
+            job_info = self._job_to_dict(job)
+
+            result = await session.execute(
+                select(LoadJobItem.status, func.count())
+                .where(LoadJobItem.job_id == job_id)
+                .group_by(LoadJobItem.status)
+            )
+            job_info['items'] = dict(result.all())
+
+            result = await session.execute(
+                select(LoadJobItem.item_key, LoadJobItem.status, LoadJobItem.attempts,
+                       LoadJobItem.next_attempt_at, LoadJobItem.last_error)
+                .where(LoadJobItem.job_id == job_id, LoadJobItem.last_error.isnot(None))
+                .order_by(desc(LoadJobItem.updated_at))
+                .limit(error_limit)
+            )
+            job_info['errors'] = [
+                {
+                    'item_key': item_key,
+                    'status': status,
+                    'attempts': attempts,
+                    'next_attempt_at': _isoformat(next_attempt_at) if status == 'pending' else None,
+                    'error': last_error,
+                }
+                for item_key, status, attempts, next_attempt_at, last_error in result.all()
+            ]
+            return job_info
+
+
+# 작업 큐 인스턴스
+job_queue = JobQueue()
@@ -1,7 +1,8 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 import httpx
 import os
@@ -9,16 +10,27 @@ from datetime import datetime, timedelta
 from typing import Optional, List
 from dotenv import load_dotenv
 import asyncio
+import hashlib
+import json
 
 from database import init_db, get_db, cleanup_expired_cache
-from services import dart_service
-from xbrl_parser import xbrl_parser, generate_sample_hierarchical_data
+from services import dart_service, FS_DIVS, SJ_DIVS
+from account_index import account_index
+from jobs import job_queue
+from disclosure_sync import disclosure_sync
+from data_loader import data_loader, preload_items, PRELOAD_YEARS
+from http_client import dart_http_client
+from rate_limiter import dart_scheduler, DailyQuotaExceeded
+from xbrl_parser import generate_sample_hierarchical_data
+from xbrl_pool import xbrl_pool, XBRLPoolBusy, XBRLParseTimeout
+from xbrl_cache import xbrl_hierarchy_cache, content_hash
+from exporter import parquet_exporter, EXPORT_TABLES, pa
+from streaming import negotiate_format, stream_query, stream_rows
 
 load_dotenv()
 
 # DART API 기본 설정
 DART_API_KEY = os.getenv("DART_API_KEY", "")  # 환경변수에서 API 키 로드
-DART_BASE_URL = "https://opendart.fss.or.kr/api"
 
 print(f"🔑 API 키 로드 상태: {'있음' if DART_API_KEY else '없음'} (길이: {len(DART_API_KEY) if DART_API_KEY else 0})")
 
@@ -39,12 +51,36 @@ async def startup_event():
     await init_db()
     print("데이터베이스 초기화 완료")
     
+    # DART API 공용 HTTP 연결 풀 생성
+    await dart_http_client.start()
+    
+    # XBRL 파싱 프로세스 풀 생성
+    xbrl_pool.start()
+    
+    # 계정명 자동완성 인덱스 구축
+    await account_index.load()
+    
+    # 백그라운드 작업 워커 시작 (중단된 작업은 이어서 처리)
+    await job_queue.start()
+    
+    # 공시 증분 동기화 (DART_SYNC_INTERVAL_MINUTES 설정시)
+    if DART_API_KEY:
+        disclosure_sync.start()
+    
     # 샘플 데이터 로드 (백그라운드)
     asyncio.create_task(load_sample_data_background())
     
     # 만료된 캐시 정리 (백그라운드)
     asyncio.create_task(periodic_cache_cleanup())
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """앱 종료시 실행"""
+    await disclosure_sync.stop()
+    await job_queue.stop()
+    await dart_http_client.close()
+    xbrl_pool.shutdown()
+
 async def load_sample_data_background():
     """백그라운드에서 샘플 데이터 로드"""
     try:
@@ -75,12 +111,30 @@ class CompanySearchRequest(BaseModel):
     corp_cls: Optional[str] = None
     page_no: Optional[int] = 1
     page_count: Optional[int] = 10
+    cursor: Optional[str] = None  # 이전 응답의 next_cursor (커서 기반 페이징)
+    with_total: Optional[bool] = True  # 전체 건수 포함 여부
+
+class PreloadRequest(BaseModel):
+    corp_codes: Optional[List[str]] = None  # 지정하지 않으면 기본 주요 기업
+    corp_cls: Optional[str] = None  # 기업 목록에서 시장구분으로 선택
+    limit: Optional[int] = None  # 기업 목록에서 선택할 최대 기업 수
+    years: Optional[int] = None  # 재무데이터 로드 연수
+    job_key: Optional[str] = None  # 중복 등록 방지 키 (기본: 기업 목록 + 날짜)
 
 class FinancialDataRequest(BaseModel):
     corp_code: str
     bsns_year: str
     reprt_code: str = "11011"  # 기본값: 사업보고서
 
+class ExportRequest(BaseModel):
+    tables: Optional[List[str]] = None  # 지정하지 않으면 전체 (financial_statements, disclosure_documents, companies)
+    full: bool = False  # True 이면 변경 여부와 관계없이 모든 파티션을 다시 씀
+
+class FinancialBatchRequest(BaseModel):
+    corp_codes: List[str]
+    bsns_year: str
+    reprt_code: str = "11011"  # 기본값: 사업보고서
+
 @app.get("/")
 async def read_root():
     return {
@@ -91,8 +145,58 @@ async def read_root():
     }
 
 @app.post("/api/company/search")
-async def search_companies(request: CompanySearchRequest, db: AsyncSession = Depends(get_db)):
-    """기업 공시 검색 (최적화된)"""
+async def search_companies(
+    request: CompanySearchRequest,
+    http_request: Request,
+    format: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """기업 공시 검색 (최적화된)
+    
+    format=ndjson|csv 또는 Accept 헤더로 요청하면 로컬 DB의 검색 결과 전체를
+    페이지 제한 없이 스트리밍합니다. 기업 고유번호를 지정하면 공시 목록을 먼저 수집하고,
+    지정하지 않으면 동기화로 로컬 데이터가 갖춰진 공시유형/기간만 스트리밍합니다.
+    """
+    response_format = negotiate_format(http_request, format)
+    if response_format != "json":
+        if DART_API_KEY:
+            if request.corp_code:
+                try:
+                    data = await dart_service.ensure_disclosures(
+                        session=db,
+                        corp_code=request.corp_code,
+                        bgn_de=request.bgn_de,
+                        end_de=request.end_de,
+                        pblntf_ty=request.pblntf_ty,
+                        corp_cls=request.corp_cls
+                    )
+                except DailyQuotaExceeded as e:
+                    raise HTTPException(status_code=429, detail=str(e))
+                except Exception as e:
+                    raise HTTPException(status_code=500, detail=f"검색 오류: {str(e)}")
+                if data.get("status") != "000":
+                    raise HTTPException(status_code=400, detail=f"DART API 오류: {data.get('message', '알 수 없는 오류')}")
+            elif not (
+                request.pblntf_ty and request.bgn_de
+                and await disclosure_sync.is_fresh(request.pblntf_ty, bgn_de=request.bgn_de)
+            ):
+                raise HTTPException(
+                    status_code=409,
+                    detail="로컬 공시 데이터가 완전하지 않을 수 있습니다. corp_code를 지정하거나, 동기화된 공시유형(pblntf_ty)과 기간(bgn_de)을 지정하세요."
+                )
+        return stream_query(
+            dart_service.disclosures_query(
+                corp_code=request.corp_code,
+                bgn_de=request.bgn_de,
+                end_de=request.end_de,
+                pblntf_ty=request.pblntf_ty,
+                corp_cls=request.corp_cls,
+                cursor=request.cursor
+            ),
+            response_format,
+            filename="disclosures"
+        )
+    
     if not DART_API_KEY:
         raise HTTPException(status_code=500, detail="DART API 키가 설정되지 않았습니다.")
     
@@ -105,7 +209,9 @@ async def search_companies(request: CompanySearchRequest, db: AsyncSession = Dep
             pblntf_ty=request.pblntf_ty,
             corp_cls=request.corp_cls,
             page_no=request.page_no,
-            page_count=request.page_count
+            page_count=request.page_count,
+            cursor=request.cursor,
+            with_total=request.with_total
         )
         
         if data.get("status") != "000":
@@ -149,10 +255,17 @@ async def get_company_list(db: AsyncSession = Depends(get_db)):
                 "list": company_list
             }
         
-        # 최근 1개월 데이터 조회 (API 직접 호출 강제)
+        # 최근 1개월 데이터 조회
         today = datetime.now().strftime("%Y%m%d")
         last_month = (datetime.now() - timedelta(days=30)).strftime("%Y%m%d")
         
+        # 정기공시가 최근에 동기화되었고 조회 기간 전체가 반영되어 있으면 로컬 DB에서 응답
+        if await disclosure_sync.is_fresh('A', bgn_de=last_month):
+            return await dart_service._get_recent_companies_local(
+                db, page_count=20, pblntf_ty='A', bgn_de=last_month,
+                message='정상 (로컬 DB, 동기화)'
+            )
+        
         # 로컬 DB 건너뛰고 API 직접 호출
         params = {
             'bgn_de': last_month,
@@ -176,13 +289,19 @@ async def get_company_list(db: AsyncSession = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"API 요청 오류: {str(e)}")
 
 @app.post("/api/financial/data")
-async def get_financial_data(request: FinancialDataRequest, db: AsyncSession = Depends(get_db)):
-    """재무제표 데이터 조회 (최적화된)"""
+async def get_financial_data(
+    request: FinancialDataRequest,
+    http_request: Request,
+    format: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """재무제표 데이터 조회 (최적화된, format=ndjson|csv 또는 Accept 헤더로 스트리밍)"""
+    response_format = negotiate_format(http_request, format)
     try:
         # API 키가 없어도 샘플 데이터로 응답
         if not DART_API_KEY:
             print("API 키가 없어 샘플 재무데이터를 반환합니다.")
-            return {
+            sample = {
                 "status": "000",
                 "message": "샘플 데이터 (API 키 없음)",
                 "list": [
@@ -221,6 +340,13 @@ async def get_financial_data(request: FinancialDataRequest, db: AsyncSession = D
                     }
                 ]
             }
+            if response_format != "json":
+                return stream_rows(
+                    sample["list"],
+                    response_format,
+                    filename=f"financial_{request.corp_code}_{request.bsns_year}_{request.reprt_code}"
+                )
+            return sample
         
         data = await dart_service.get_financial_data_optimized(
             session=db,
@@ -232,10 +358,82 @@ async def get_financial_data(request: FinancialDataRequest, db: AsyncSession = D
         if data.get("status") != "000":
             raise HTTPException(status_code=400, detail=f"DART API 오류: {data.get('message', '알 수 없는 오류')}")
         
+        if response_format != "json":
+            # 수집된 행을 DB에서 다시 읽어 스트리밍
+            return stream_query(
+                dart_service.financial_statements_query(request.corp_code, request.bsns_year, request.reprt_code),
+                response_format,
+                filename=f"financial_{request.corp_code}_{request.bsns_year}_{request.reprt_code}"
+            )
+        
         return data
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"재무데이터 조회 오류: {str(e)}")
 
+@app.post("/api/financial/data/batch")
+async def get_financial_data_batch(request: FinancialBatchRequest, db: AsyncSession = Depends(get_db)):
+    """여러 기업의 재무제표 일괄 조회 (다중회사 주요계정 API로 묶어서 호출)"""
+    if not request.corp_codes:
+        raise HTTPException(status_code=400, detail="기업 고유번호를 하나 이상 입력해주세요.")
+    
+    try:
+        return await dart_service.get_financial_data_batch(
+            session=db,
+            corp_codes=request.corp_codes,
+            bsns_year=request.bsns_year,
+            reprt_code=request.reprt_code
+        )
+    except DailyQuotaExceeded as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"재무데이터 일괄 조회 오류: {str(e)}")
+
+@app.get("/api/financial/full/{corp_code}")
+async def get_full_financial_statements(
+    corp_code: str,
+    bsns_year: str,
+    http_request: Request,
+    reprt_code: str = "11011",
+    fs_div: str = "CFS",
+    sj_div: Optional[str] = None,
+    format: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """전체 재무제표 조회 (fs_div: CFS 연결/OFS 개별, sj_div: BS/IS/CIS/CF/SCE 중 하나만 조회)
+    
+    format=ndjson|csv 또는 Accept 헤더로 요청하면 행을 읽는 대로 스트리밍합니다.
+    """
+    if fs_div not in FS_DIVS:
+        raise HTTPException(status_code=400, detail=f"fs_div는 {', '.join(FS_DIVS)} 중 하나여야 합니다.")
+    if sj_div and sj_div not in SJ_DIVS:
+        raise HTTPException(status_code=400, detail=f"sj_div는 {', '.join(SJ_DIVS)} 중 하나여야 합니다.")
+    response_format = negotiate_format(http_request, format)
+    
+    try:
+        if response_format != "json":
+            data = await dart_service.ensure_full_financial_statements(
+                db, corp_code, bsns_year, reprt_code, fs_div
+            )
+        else:
+            data = await dart_service.get_full_financial_statements(
+                db, corp_code, bsns_year, reprt_code, fs_div, sj_div
+            )
+    except DailyQuotaExceeded as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"전체 재무제표 조회 오류: {str(e)}")
+    
+    if data.get("status") not in ("000", "013"):
+        raise HTTPException(status_code=400, detail=f"DART API 오류: {data.get('message', '알 수 없는 오류')}")
+    
+    if response_format != "json":
+        return stream_query(
+            dart_service.full_statements_query(corp_code, bsns_year, reprt_code, fs_div, sj_div),
+            response_format,
+            filename=f"full_{corp_code}_{bsns_year}_{reprt_code}_{fs_div}"
+        )
+    return data
+
 # 새로운 최적화된 엔드포인트들
 @app.get("/api/accounts/popular")
 async def get_popular_accounts(limit: int = 50, db: AsyncSession = Depends(get_db)):
@@ -269,6 +467,8 @@ async def search_companies_by_name(
     corp_cls: Optional[str] = None,
     page_no: int = 1,
     page_count: int = 20,
+    cursor: Optional[str] = None,
+    with_total: bool = True,
     db: AsyncSession = Depends(get_db)
 ):
     """기업명으로 검색 (빠른 검색용)"""
@@ -278,7 +478,9 @@ async def search_companies_by_name(
             corp_name=corp_name,
             corp_cls=corp_cls,
             page_no=page_no,
-            page_count=page_count
+            page_count=page_count,
+            cursor=cursor,
+            with_total=with_total
         )
         
         return data
@@ -286,21 +488,154 @@ async def search_companies_by_name(
         raise HTTPException(status_code=500, detail=f"기업명 검색 오류: {str(e)}")
 
 @app.post("/api/data/load-major-companies")
-async def load_major_companies_data(db: AsyncSession = Depends(get_db)):
-    """주요 기업 데이터 수동 로드"""
+async def load_major_companies_data(request: Optional[PreloadRequest] = None):
+    """주요 기업 데이터 로딩 작업 등록 (진행 현황은 /api/jobs/{job_id})"""
     try:
-        from data_loader import data_loader
+        request = request or PreloadRequest()
+        companies = await data_loader.resolve_companies(request.corp_codes, request.corp_cls, request.limit)
+        years = request.years or PRELOAD_YEARS
         
-        # 백그라운드에서 실행
-        asyncio.create_task(data_loader.load_major_companies_data())
+        # 같은 날 같은 기업 목록으로 다시 요청하면 기존 작업 반환 (실패한 항목은 다시 처리)
+        params = {'corp_codes': [company['corp_code'] for company in companies], 'years': years}
+        job_key = request.job_key or "preload:{}:{}".format(
+            hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()[:16],
+            datetime.now().strftime("%Y%m%d")
+        )
+        
+        job, created = await job_queue.enqueue("preload", job_key, preload_items(companies, years), params)
         
         return {
             "status": "000",
-            "message": "주요 기업 데이터 로딩이 백그라운드에서 시작되었습니다."
+            "message": (
+                f"주요 기업 {len(companies)}곳 데이터 로딩 작업이 등록되었습니다." if created
+                else "같은 데이터 로딩 작업이 이미 등록되어 있습니다."
+            ),
+            "data": job
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"데이터 로드 오류: {str(e)}")
 
+@app.get("/api/jobs")
+async def list_jobs(limit: int = 20):
+    """최근 백그라운드 작업 목록"""
+    return {
+        "status": "000",
+        "message": "정상",
+        "data": await job_queue.list_jobs(limit)
+    }
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: int):
+    """백그라운드 작업 진행 현황"""
+    job = await job_queue.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    
+    return {
+        "status": "000",
+        "message": "정상",
+        "data": job
+    }
+
+@app.post("/api/jobs/{job_id}/retry")
+async def retry_job(job_id: int):
+    """백그라운드 작업의 실패한 항목 다시 처리"""
+    job = await job_queue.retry(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    
+    return {
+        "status": "000",
+        "message": f"실패한 항목 {job['retried_items']}건을 다시 처리합니다." if job['retried_items'] else "다시 처리할 실패 항목이 없습니다.",
+        "data": job
+    }
+
+@app.post("/api/data/import-corp-codes")
+async def import_corp_codes():
+    """DART 기업 고유번호 전체 목록 가져오기 (변경된 기업만 반영)"""
+    try:
+        from corp_code_loader import corp_code_loader
+        
+        result = await corp_code_loader.load()
+        if result.get("status") != "000":
+            raise HTTPException(status_code=400, detail=f"DART API 오류: {result.get('message', '알 수 없는 오류')}")
+        
+        return result
+    except DailyQuotaExceeded as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"기업 고유번호 가져오기 오류: {str(e)}")
+
+@app.post("/api/data/export")
+async def export_parquet(request: Optional[ExportRequest] = None):
+    """Parquet 내보내기 작업 등록 (변경된 파티션만 다시 씀, 진행 현황은 /api/jobs/{job_id})"""
+    request = request or ExportRequest()
+    if pa is None:
+        raise HTTPException(status_code=503, detail="Parquet 내보내기에는 pyarrow 가 필요합니다. (pip install pyarrow)")
+    
+    tables = request.tables or list(EXPORT_TABLES)
+    unknown = [name for name in tables if name not in EXPORT_TABLES]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"알 수 없는 테이블: {', '.join(unknown)}")
+    
+    try:
+        # 같은 분에 같은 요청이 다시 오면 기존 작업 반환
+        params = {'tables': tables, 'full': request.full}
+        job_key = "export:{}:{}".format(
+            hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()[:16],
+            datetime.now().strftime("%Y%m%d%H%M")
+        )
+        items = [(name, {'table': name, 'full': request.full}) for name in tables]
+        job, created = await job_queue.enqueue("export", job_key, items, params)
+        
+        return {
+            "status": "000",
+            "message": "Parquet 내보내기 작업이 등록되었습니다." if created else "같은 내보내기 작업이 이미 등록되어 있습니다.",
+            "data": job
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"내보내기 작업 등록 오류: {str(e)}")
+
+@app.get("/api/data/export")
+async def get_export_manifest():
+    """Parquet 내보내기 현황 (테이블/파티션별 행 수와 내보낸 시각)"""
+    return {
+        "status": "000",
+        "message": "정상",
+        "export_dir": os.path.abspath(parquet_exporter.export_dir),
+        "data": parquet_exporter.load_manifest()
+    }
+
+@app.get("/api/data/export/{table_name}")
+async def stream_export_table(
+    table_name: str,
+    http_request: Request,
+    format: Optional[str] = None,
+    corp_code: Optional[str] = None,
+    bsns_year: Optional[str] = None,
+    reprt_code: Optional[str] = None
+):
+    """테이블 행 스트리밍 내보내기 (NDJSON 기본, format=csv 또는 Accept: text/csv)"""
+    table = EXPORT_TABLES.get(table_name)
+    if table is None:
+        raise HTTPException(status_code=404, detail=f"알 수 없는 테이블: {table_name}")
+    
+    response_format = negotiate_format(http_request, format)
+    if response_format == "json":
+        response_format = "ndjson"
+    
+    # 테이블에 있는 컬럼만 필터로 사용
+    columns = table.model.__table__.c
+    stmt = select(*columns)
+    for name, value in (('corp_code', corp_code), ('bsns_year', bsns_year), ('reprt_code', reprt_code)):
+        if value is not None and name in columns:
+            stmt = stmt.where(columns[name] == value)
+    stmt = stmt.order_by(*table.model.__table__.primary_key.columns)
+    
+    return stream_query(stmt, response_format, filename=table_name)
+
 @app.get("/api/data/status")
 async def get_data_status(db: AsyncSession = Depends(get_db)):
     """데이터베이스 현황 조회"""
@@ -342,16 +677,79 @@ async def get_data_status(db: AsyncSession = Depends(get_db)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"데이터 현황 조회 오류: {str(e)}")
 
+@app.get("/api/system/rate-limit")
+async def get_rate_limit_status():
+    """DART API 호출 한도 및 대기열 현황"""
+    return {
+        "status": "000",
+        "message": "정상",
+        "data": dart_scheduler.stats()
+    }
+
+@app.get("/api/system/disclosure-sync")
+async def get_disclosure_sync_status():
+    """공시 증분 동기화 기준점 및 마지막 실행 결과"""
+    return {
+        "status": "000",
+        "message": "정상",
+        "data": await disclosure_sync.get_state()
+    }
+
+@app.post("/api/system/disclosure-sync")
+async def run_disclosure_sync(pblntf_ty: Optional[str] = None):
+    """공시 증분 동기화 즉시 실행 (pblntf_ty 미지정시 설정된 모든 공시유형)"""
+    if not DART_API_KEY:
+        raise HTTPException(status_code=500, detail="DART API 키가 설정되지 않았습니다.")
+    
+    try:
+        result = await disclosure_sync.sync([pblntf_ty] if pblntf_ty else None)
+        return {
+            "status": "000",
+            "message": "정상",
+            "data": result
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"공시 동기화 오류: {str(e)}")
+
+@app.get("/api/system/xbrl-pool")
+async def get_xbrl_pool_status():
+    """XBRL 파싱 프로세스 풀 대기열 및 지연시간 현황"""
+    return {
+        "status": "000",
+        "message": "정상",
+        "data": xbrl_pool.stats()
+    }
+
+@app.get("/api/system/cache-stats")
+async def get_cache_stats():
+    """캐시 계층별 적중 현황"""
+    return {
+        "status": "000",
+        "message": "정상",
+        "data": dart_service.get_cache_stats()
+    }
+
 @app.get("/api/financial/hierarchical/{corp_code}")
 async def get_hierarchical_financial_data(
     corp_code: str,
     years: int = 5,
+    reprt_code: str = "11011",
     db: AsyncSession = Depends(get_db)
 ):
-    """계층형 재무제표 데이터 조회 (네이버 증권 스타일)"""
+    """계층형 재무제표 데이터 조회 (네이버 증권 스타일, 수집시 계산한 집계 사용)"""
     try:
-        # 현재는 샘플 데이터 반환 (실제로는 XBRL 데이터를 파싱해야 함)
-        hierarchical_data = generate_sample_hierarchical_data()
+        hierarchical_data = await dart_service.get_hierarchical_financials(db, corp_code, years, reprt_code)
+        
+        if hierarchical_data is None:
+            # 수집된 재무제표가 없으면 샘플 데이터 반환
+            return {
+                "status": "000",
+                "message": "샘플 데이터 (수집된 재무제표 없음)",
+                "corp_code": corp_code,
+                "data_type": "sample",
+                "years_requested": years,
+                "data": generate_sample_hierarchical_data()
+            }
         
         return {
             "status": "000",
@@ -369,13 +767,27 @@ async def get_xbrl_financial_data(
     corp_code: str,
     bsns_year: str,
     reprt_code: str = "11011",
+    refresh: bool = False,
     db: AsyncSession = Depends(get_db)
 ):
-    """XBRL 재무제표 데이터 조회 및 파싱"""
+    """XBRL 재무제표 데이터 조회 및 파싱 (파싱 결과는 정정 공시 전까지 캐시)"""
     if not DART_API_KEY:
         raise HTTPException(status_code=500, detail="DART API 키가 설정되지 않았습니다.")
     
     try:
+        # 이미 파싱한 보고서는 원문을 다시 받지 않음
+        if not refresh:
+            cached_data = await xbrl_hierarchy_cache.get(db, corp_code, bsns_year, reprt_code)
+            if cached_data is not None:
+                return {
+                    "status": "000",
+                    "message": "정상 (캐시)",
+                    "corp_code": corp_code,
+                    "bsns_year": bsns_year,
+                    "data_type": "xbrl_parsed",
+                    "data": cached_data
+                }
+        
         # DART API에서 XBRL 데이터 조회
         params = {
             "crtfc_key": DART_API_KEY,
@@ -384,54 +796,64 @@ async def get_xbrl_financial_data(
             "reprt_code": reprt_code
         }
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            # XBRL 원문 조회 API 호출 (올바른 엔드포인트 사용)
-            response = await client.get(
-                f"{DART_BASE_URL}/fnlttXbrl.xml", 
-                params=params
-            )
-            response.raise_for_status()
-            xbrl_data = response.json()
-            
-            if xbrl_data.get("status") != "000":
-                # XBRL 데이터가 없으면 샘플 데이터 반환
-                print(f"XBRL 데이터 없음, 샘플 데이터 반환: {xbrl_data.get('message')}")
-                hierarchical_data = generate_sample_hierarchical_data()
-                return {
-                    "status": "000",
-                    "message": "샘플 데이터 (XBRL 데이터 없음)",
-                    "corp_code": corp_code,
-                    "bsns_year": bsns_year,
-                    "data_type": "sample",
-                    "data": hierarchical_data
-                }
-            
-            # XBRL 내용 파싱
-            if xbrl_data.get("list") and len(xbrl_data["list"]) > 0:
-                xbrl_content = xbrl_data["list"][0].get("xbrl_cont", "")
-                if xbrl_content:
-                    parsed_data = xbrl_parser.parse_xbrl_content(xbrl_content)
-                    
-                    return {
-                        "status": "000",
-                        "message": "정상",
-                        "corp_code": corp_code,
-                        "bsns_year": bsns_year,
-                        "data_type": "xbrl_parsed",
-                        "data": parsed_data
-                    }
-            
-            # 파싱할 수 없으면 샘플 데이터
+        # XBRL 원문 조회 API 호출 (공용 연결 풀 사용, 전역 호출 한도 적용)
+        await dart_scheduler.acquire()
+        response = await dart_http_client.get("fnlttXbrl.xml", params)
+        xbrl_data = response.json()
+        
+        if xbrl_data.get("status") != "000":
+            # XBRL 데이터가 없으면 샘플 데이터 반환
+            print(f"XBRL 데이터 없음, 샘플 데이터 반환: {xbrl_data.get('message')}")
             hierarchical_data = generate_sample_hierarchical_data()
             return {
                 "status": "000",
-                "message": "샘플 데이터 (XBRL 파싱 실패)",
+                "message": "샘플 데이터 (XBRL 데이터 없음)",
                 "corp_code": corp_code,
                 "bsns_year": bsns_year,
                 "data_type": "sample",
                 "data": hierarchical_data
             }
-            
+        
+        # XBRL 내용 파싱
+        if xbrl_data.get("list") and len(xbrl_data["list"]) > 0:
+            xbrl_content = xbrl_data["list"][0].get("xbrl_cont", "")
+            if xbrl_content:
+                # 정정 공시로 다시 받은 원문이 기존과 같으면 파싱 생략
+                xbrl_hash = content_hash(xbrl_content)
+                parsed_data = await xbrl_hierarchy_cache.get_by_hash(db, corp_code, bsns_year, reprt_code, xbrl_hash)
+                
+                if parsed_data is None:
+                    # 별도 프로세스에서 파싱 (큰 문서도 이벤트 루프를 막지 않음)
+                    parsed_data = await xbrl_pool.parse(xbrl_content)
+                    if parsed_data:
+                        await xbrl_hierarchy_cache.put(db, corp_code, bsns_year, reprt_code, xbrl_hash, parsed_data)
+                
+                return {
+                    "status": "000",
+                    "message": "정상",
+                    "corp_code": corp_code,
+                    "bsns_year": bsns_year,
+                    "data_type": "xbrl_parsed",
+                    "data": parsed_data
+                }
+        
+        # 파싱할 수 없으면 샘플 데이터
+        hierarchical_data = generate_sample_hierarchical_data()
+        return {
+            "status": "000",
+            "message": "샘플 데이터 (XBRL 파싱 실패)",
+            "corp_code": corp_code,
+            "bsns_year": bsns_year,
+            "data_type": "sample",
+            "data": hierarchical_data
+        }
+        
+    except DailyQuotaExceeded as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except XBRLPoolBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except XBRLParseTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except httpx.RequestError as e:
         raise HTTPException(status_code=500, detail=f"XBRL API 요청 오류: {str(e)}")
     except Exception as e:
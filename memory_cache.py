@@ -0,0 +1,84 @@
+import os
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+# 환경변수 로드
+from dotenv import load_dotenv
+load_dotenv()
+
+# 인메모리 캐시 최대 크기 (바이트) / 만료 후 재검증 동안 제공할 수 있는 시간 (초)
+MEMORY_CACHE_MAX_BYTES = int(os.getenv("DART_MEMORY_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+CACHE_STALE_SECONDS = int(os.getenv("DART_CACHE_STALE_SECONDS", "3600"))
+
+
+class MemoryCache:
+    """바이트 크기 기준 LRU + TTL 인메모리 캐시"""
+
+    def __init__(self, max_bytes: int = MEMORY_CACHE_MAX_BYTES, stale_seconds: int = CACHE_STALE_SECONDS):
+        self.max_bytes = max_bytes
+        self.stale_window = timedelta(seconds=stale_seconds)
+        # 키 → (값, 만료시각, 크기)
+        self._entries: "OrderedDict[Hashable, Tuple[Any, datetime, int]]" = OrderedDict()
+        self._current_bytes = 0
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Tuple[Any, bool]]:
+        """(값, 만료 여부) 반환. 재검증 허용 시간도 지났으면 None"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, expires_at, _ = entry
+        now = datetime.utcnow()
+        if now >= expires_at + self.stale_window:
+            self.delete(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        if now >= expires_at:
+            self.stale_hits += 1
+            return value, True
+
+        self.hits += 1
+        return value, False
+
+    def set(self, key: Hashable, value: Any, expires_at: datetime, size: int):
+        """값 저장 후 최대 크기를 넘으면 오래 사용하지 않은 항목부터 제거"""
+        if size > self.max_bytes:
+            return
+
+        self.delete(key)
+        self._entries[key] = (value, expires_at, size)
+        self._current_bytes += size
+
+        while self._current_bytes > self.max_bytes:
+            _, (_, _, evicted_size) = self._entries.popitem(last=False)
+            self._current_bytes -= evicted_size
+            self.evictions += 1
+
+    def delete(self, key: Hashable):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._current_bytes -= entry[2]
+
+    def clear(self):
+        self._entries.clear()
+        self._current_bytes = 0
+
+    def stats(self) -> Dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._current_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,188 @@
+import asyncio
+from typing import List, Tuple
+
+from sqlalchemy import inspect, select, update, bindparam, and_, or_
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from database import Base, FinancialStatement, FinancialRollup, FullFinancialStatement, AMOUNT_COLUMNS, engine, parse_amount
+from search_index import ensure_name_index
+
+# 백필 배치 크기
+BACKFILL_BATCH_SIZE = 5000
+
+
+def _add_missing_columns(sync_conn) -> List[Tuple[str, str]]:
+    """모델에는 있지만 기존 테이블에 없는 컬럼 추가 (create_all은 기존 테이블을 변경하지 않음)"""
+    inspector = inspect(sync_conn)
+    existing_tables = set(inspector.get_table_names())
+    added = []
+
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+
+        existing_columns = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing_columns:
+                continue
+
+            column_type = column.type.compile(dialect=sync_conn.dialect)
+            sync_conn.exec_driver_sql(
+                f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"
+            )
+            added.append((table.name, column.name))
+            print(f"컬럼 추가: {table.name}.{column.name}")
+
+    return added
+
+
+def _create_missing_indexes(sync_conn):
+    """모델에 정의된 인덱스 중 기존 테이블에 없는 인덱스 생성"""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
+
+
+async def backfill_amount_columns(conn: AsyncConnection, only_missing: bool = True) -> int:
+    """financial_statements 금액 텍스트를 숫자 컬럼으로 변환하여 채움"""
+    text_columns = [getattr(FinancialStatement, name) for name in AMOUNT_COLUMNS]
+    num_columns = list(AMOUNT_COLUMNS.values())
+
+    stmt = select(FinancialStatement.id, *text_columns).order_by(FinancialStatement.id)
+    if only_missing:
+        # 텍스트는 있는데 숫자 컬럼이 비어 있는 행만
+        stmt = stmt.where(or_(*[
+            and_(getattr(FinancialStatement, text_name).isnot(None),
+                 getattr(FinancialStatement, num_name).is_(None))
+            for text_name, num_name in AMOUNT_COLUMNS.items()
+        ]))
+
+    update_stmt = (
+        update(FinancialStatement.__table__)
+        .where(FinancialStatement.__table__.c.id == bindparam('row_id'))
+        .values({name: bindparam(name) for name in num_columns})
+    )
+
+    updated = 0
+    last_id = 0
+    while True:
+        result = await conn.execute(
+            stmt.where(FinancialStatement.id > last_id).limit(BACKFILL_BATCH_SIZE)
+        )
+        rows = result.all()
+        if not rows:
+            break
+
+        params = []
+        for row in rows:
+            values = {'row_id': row[0]}
+            for text_value, num_name in zip(row[1:], num_columns):
+                values[num_name] = parse_amount(text_value)
+            params.append(values)
+
+        await conn.execute(update_stmt, params)
+        updated += len(rows)
+        last_id = rows[-1][0]
+
+    return updated
+
+
+async def backfill_financial_rollups(conn: AsyncConnection) -> int:
+    """계층형 집계가 없는 보고서의 집계를 저장된 재무제표로 계산 (집계 도입 전 수집된 데이터용, 이후 실행에서는 건너뜀)"""
+    from services import dart_service
+
+    rollup_exists = select(FinancialRollup.corp_code).where(
+        FinancialRollup.corp_code == FinancialStatement.corp_code,
+        FinancialRollup.bsns_year == FinancialStatement.bsns_year,
+        FinancialRollup.reprt_code == FinancialStatement.reprt_code
+    ).exists()
+    result = await conn.execute(
+        select(FinancialStatement.corp_code, FinancialStatement.bsns_year, FinancialStatement.reprt_code)
+        .where(~rollup_exists)
+        .distinct()
+    )
+    filings = result.all()
+
+    columns = [
+        FinancialStatement.fs_div, FinancialStatement.sj_div, FinancialStatement.account_nm,
+        *[getattr(FinancialStatement, num_column) for num_column in AMOUNT_COLUMNS.values()]
+    ]
+    for corp_code, bsns_year, reprt_code in filings:
+        rows = await conn.execute(
+            select(*columns).where(
+                FinancialStatement.corp_code == corp_code,
+                FinancialStatement.bsns_year == bsns_year,
+                FinancialStatement.reprt_code == reprt_code
+            ).order_by(FinancialStatement.id)
+        )
+        await dart_service._save_financial_rollup(
+            conn, [dict(row) for row in rows.mappings().all()], corp_code, bsns_year, reprt_code
+        )
+
+    # 전체 재무제표의 재무상태표가 있으면 세부 계정까지 집계
+    full_rollup_exists = select(FinancialRollup.corp_code).where(
+        FinancialRollup.corp_code == FullFinancialStatement.corp_code,
+        FinancialRollup.bsns_year == FullFinancialStatement.bsns_year,
+        FinancialRollup.reprt_code == FullFinancialStatement.reprt_code,
+        FinancialRollup.source == "full"
+    ).exists()
+    result = await conn.execute(
+        select(FullFinancialStatement.corp_code, FullFinancialStatement.bsns_year,
+               FullFinancialStatement.reprt_code, FullFinancialStatement.fs_div)
+        .where(FullFinancialStatement.sj_div == 'BS', ~full_rollup_exists)
+        .distinct()
+    )
+    full_filings = result.all()
+
+    full_columns = [
+        FullFinancialStatement.fs_div, FullFinancialStatement.sj_div, FullFinancialStatement.account_nm,
+        *[getattr(FullFinancialStatement, num_column) for num_column in AMOUNT_COLUMNS.values()]
+    ]
+    for corp_code, bsns_year, reprt_code, fs_div in full_filings:
+        rows = await conn.execute(
+            select(*full_columns).where(
+                FullFinancialStatement.corp_code == corp_code,
+                FullFinancialStatement.bsns_year == bsns_year,
+                FullFinancialStatement.reprt_code == reprt_code,
+                FullFinancialStatement.fs_div == fs_div,
+                FullFinancialStatement.sj_div == 'BS'
+            ).order_by(FullFinancialStatement.line_no)
+        )
+        await dart_service._save_financial_rollup(
+            conn, [dict(row) for row in rows.mappings().all()], corp_code, bsns_year, reprt_code, source="full"
+        )
+
+    return len(filings) + len(full_filings)
+
+
+async def run_migrations(conn: AsyncConnection):
+    """스키마 변경사항 반영 (init_db에서 호출, 여러 번 실행해도 안전)"""
+    added = await conn.run_sync(_add_missing_columns)
+    await conn.run_sync(_create_missing_indexes)
+
+    # 금액 숫자 컬럼이 새로 추가된 경우 기존 데이터 백필
+    if any(table == FinancialStatement.__tablename__ and column in AMOUNT_COLUMNS.values()
+           for table, column in added):
+        updated = await backfill_amount_columns(conn)
+        print(f"금액 숫자 컬럼 백필 완료: {updated}건")
+
+    # 집계 도입 전 수집된 재무제표의 계층형 집계
+    rebuilt = await backfill_financial_rollups(conn)
+    if rebuilt:
+        print(f"계층형 재무제표 집계 백필 완료: {rebuilt}건")
+
+    # 기업명 부분 일치 검색 인덱스
+    await ensure_name_index(conn)
+
+
+async def main():
+    """기존 DB 마이그레이션 및 금액 컬럼 전체 백필 (직접 실행용)"""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await run_migrations(conn)
+        updated = await backfill_amount_columns(conn, only_missing=False)
+    print(f"마이그레이션 완료 (금액 컬럼 백필: {updated}건)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,150 @@
+import asyncio
+import os
+import time
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, List, Optional
+
+# 환경변수 로드
+from dotenv import load_dotenv
+load_dotenv()
+
+# 초당 요청 수 / 순간 허용량 / 일일 한도 (DART 기본 한도: 키당 하루 20,000건)
+DART_RATE_LIMIT_PER_SEC = float(os.getenv("DART_RATE_LIMIT_PER_SEC", "5"))
+DART_RATE_LIMIT_BURST = int(os.getenv("DART_RATE_LIMIT_BURST", "5"))
+DART_DAILY_QUOTA = int(os.getenv("DART_DAILY_QUOTA", "20000"))
+
+# 우선순위 (숫자가 작을수록 먼저 처리)
+PRIORITY_INTERACTIVE = 0  # 사용자 요청
+PRIORITY_BACKGROUND = 1   # 백그라운드 데이터 로드
+
+
+class DailyQuotaExceeded(Exception):
+    """일일 API 호출 한도 초과"""
+    pass
+
+
+class DartRequestScheduler:
+    """DART API 요청 스케줄러 (토큰 버킷 + 우선순위 대기열)"""
+
+    def __init__(
+        self,
+        rate_per_sec: float = DART_RATE_LIMIT_PER_SEC,
+        burst: int = DART_RATE_LIMIT_BURST,
+        daily_quota: int = DART_DAILY_QUOTA
+    ):
+        self.rate_per_sec = rate_per_sec
+        self.burst = max(1, burst)
+        self.daily_quota = daily_quota
+
+        self._tokens = float(self.burst)
+        self._last_refill = time.monotonic()
+        self._queues: List[Deque[asyncio.Future]] = [deque(), deque()]
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self._quota_date = datetime.now().date()
+        self._used_today = 0
+
+    def _reset_daily_if_needed(self):
+        """날짜가 바뀌면 일일 사용량 초기화"""
+        today = datetime.now().date()
+        if today != self._quota_date:
+            self._quota_date = today
+            self._used_today = 0
+
+    @property
+    def remaining_quota(self) -> int:
+        self._reset_daily_if_needed()
+        return max(0, self.daily_quota - self._used_today)
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        self._tokens = min(float(self.burst), self._tokens + elapsed * self.rate_per_sec)
+
+    def _next_waiter(self) -> Optional[asyncio.Future]:
+        """우선순위가 높은 대기열부터 취소되지 않은 대기자 반환"""
+        for queue in self._queues:
+            while queue:
+                fut = queue.popleft()
+                if not fut.done():
+                    return fut
+        return None
+
+    def _has_waiters(self) -> bool:
+        for queue in self._queues:
+            # 취소된 대기자 정리
+            while queue and queue[0].done():
+                queue.popleft()
+            if queue:
+                return True
+        return False
+
+    async def _dispatch(self):
+        """토큰이 생기는 대로 우선순위가 높은 대기자부터 허가"""
+        while True:
+            if not self._has_waiters():
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate_per_sec)
+                continue
+
+            # 토큰 확보 시점에 대기열을 다시 확인하므로 사용자 요청이 백그라운드 요청을 앞지름
+            waiter = self._next_waiter()
+            if waiter is None:
+                continue
+
+            self._reset_daily_if_needed()
+            if self._used_today >= self.daily_quota:
+                waiter.set_exception(DailyQuotaExceeded("DART API 일일 호출 한도를 초과했습니다."))
+                continue
+
+            self._tokens -= 1
+            self._used_today += 1
+            waiter.set_result(None)
+
+    def _ensure_dispatcher(self):
+        loop = asyncio.get_running_loop()
+        # 스크립트에서 asyncio.run을 여러 번 호출하는 경우 이벤트 루프별로 새로 시작
+        if self._dispatcher is None or self._dispatcher.done() or self._loop is not loop:
+            self._loop = loop
+            self._queues = [deque(), deque()]
+            self._wakeup = asyncio.Event()
+            self._dispatcher = loop.create_task(self._dispatch())
+
+    async def acquire(self, priority: int = PRIORITY_INTERACTIVE):
+        """요청 1건 허가 대기 (일일 한도 초과시 DailyQuotaExceeded)"""
+        if self.remaining_quota <= 0:
+            raise DailyQuotaExceeded("DART API 일일 호출 한도를 초과했습니다.")
+
+        self._ensure_dispatcher()
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._queues[priority].append(waiter)
+        self._wakeup.set()
+        await waiter
+
+    def stats(self) -> Dict:
+        """남은 한도 및 대기열 현황"""
+        return {
+            "rate_per_sec": self.rate_per_sec,
+            "burst": self.burst,
+            "daily_quota": self.daily_quota,
+            "used_today": self._used_today,
+            "remaining_quota": self.remaining_quota,
+            "queue_depth": {
+                "interactive": sum(1 for fut in self._queues[PRIORITY_INTERACTIVE] if not fut.done()),
+                "background": sum(1 for fut in self._queues[PRIORITY_BACKGROUND] if not fut.done()),
+            },
+        }
+
+
+# 스케줄러 인스턴스
+dart_scheduler = DartRequestScheduler()
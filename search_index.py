@@ -0,0 +1,127 @@
+from sqlalchemy import text, column
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from database import Company, DisclosureDocument, engine
+
+# 기업명 검색 인덱스 사용 가능 여부 (init_db 시점에 확인)
+name_index_available = False
+
+# trigram 인덱스를 사용할 수 있는 최소 검색어 길이
+TRIGRAM_MIN_LENGTH = 3
+
+# SQLite: 원본 테이블별 FTS5 trigram 인덱스 (인덱스명 → (원본 테이블, 키 컬럼))
+# companies / disclosure_documents 는 문자열 기본키라 rowid가 VACUUM 등으로 바뀔 수 있으므로
+# rowid 대신 키 컬럼을 인덱스에 함께 저장
+SQLITE_NAME_INDEXES = {
+    "company_name_fts": ("companies", "corp_code"),
+    "disclosure_name_fts": ("disclosure_documents", "rcept_no"),
+}
+
+# PostgreSQL: pg_trgm GIN 인덱스 (LIKE '%이름%' 검색에 인덱스 사용)
+POSTGRES_NAME_INDEX_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS idx_companies_name_trgm ON companies USING gin (corp_name gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS idx_disclosure_name_trgm ON disclosure_documents USING gin (corp_name gin_trgm_ops)",
+]
+
+
+def _sqlite_name_index_ddl(fts_name: str, table: str, key: str):
+    """키 컬럼을 함께 저장하는 FTS5 인덱스와 동기화 트리거 (수집시 자동 갱신)"""
+    return [
+        f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {fts_name} USING fts5(
+            {key} UNINDEXED, corp_name, tokenize='trigram'
+        )
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {fts_name}_ai AFTER INSERT ON {table} BEGIN
+            INSERT INTO {fts_name}({key}, corp_name) VALUES (new.{key}, new.corp_name);
+        END
+        """,
+        # 삭제/이름 변경은 드물어 키 컬럼 전체 탐색을 허용 (upsert로 같은 이름을 다시 쓰는 경우는 제외)
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {fts_name}_ad AFTER DELETE ON {table} BEGIN
+            DELETE FROM {fts_name} WHERE {key} = old.{key};
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {fts_name}_au AFTER UPDATE OF corp_name ON {table}
+        WHEN old.corp_name IS NOT new.corp_name BEGIN
+            DELETE FROM {fts_name} WHERE {key} = old.{key};
+            INSERT INTO {fts_name}({key}, corp_name) VALUES (new.{key}, new.corp_name);
+        END
+        """,
+    ]
+
+
+async def ensure_name_index(conn: AsyncConnection):
+    """기업명 부분 일치 검색 인덱스 생성 (없을 때만, 최초 생성시 기존 데이터로 구축)"""
+    global name_index_available
+
+    dialect = conn.dialect.name
+    if dialect not in ("sqlite", "postgresql"):
+        return
+
+    try:
+        # 인덱스 생성이 실패해도 init_db의 테이블 생성/마이그레이션은 유지되도록 SAVEPOINT 안에서 실행
+        async with conn.begin_nested():
+            if dialect == "sqlite":
+                for fts_name, (table, key) in SQLITE_NAME_INDEXES.items():
+                    result = await conn.execute(
+                        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                        {"name": fts_name}
+                    )
+                    is_new = result.first() is None
+
+                    for ddl in _sqlite_name_index_ddl(fts_name, table, key):
+                        await conn.exec_driver_sql(ddl)
+
+                    if is_new:
+                        await conn.exec_driver_sql(
+                            f"INSERT INTO {fts_name}({key}, corp_name) SELECT {key}, corp_name FROM {table}"
+                        )
+                        print(f"기업명 검색 인덱스 생성 완료: {fts_name}")
+            else:
+                for ddl in POSTGRES_NAME_INDEX_DDL:
+                    await conn.exec_driver_sql(ddl)
+
+        name_index_available = True
+    except Exception as e:
+        # FTS5 trigram은 SQLite 3.34 이상, pg_trgm은 확장 생성 권한 필요 (없으면 LIKE 검색 사용)
+        print(f"⚠️ 기업명 검색 인덱스를 사용할 수 없습니다: {e}")
+
+
+def _fts_keys(fts_name: str, key: str, pattern: str):
+    return text(
+        f"SELECT {key} FROM {fts_name} WHERE corp_name LIKE :name_pattern"
+    ).bindparams(name_pattern=pattern).columns(column(key))
+
+
+def _use_sqlite_index(corp_name: str) -> bool:
+    # trigram은 3글자 미만 검색어에 사용할 수 없음
+    return (
+        name_index_available
+        and engine.dialect.name == "sqlite"
+        and len(corp_name) >= TRIGRAM_MIN_LENGTH
+    )
+
+
+def company_name_filter(corp_name: str):
+    """기업 테이블 기업명 부분 일치 조건"""
+    pattern = f"%{corp_name}%"
+
+    if _use_sqlite_index(corp_name):
+        return Company.corp_code.in_(_fts_keys("company_name_fts", "corp_code", pattern))
+
+    # PostgreSQL은 pg_trgm 인덱스가 LIKE 검색에 그대로 사용됨
+    return Company.corp_name.like(pattern)
+
+
+def disclosure_name_filter(corp_name: str):
+    """공시 문서 기업명 부분 일치 조건 (공시 당시 제출된 기업명 기준)"""
+    pattern = f"%{corp_name}%"
+
+    if _use_sqlite_index(corp_name):
+        return DisclosureDocument.rcept_no.in_(_fts_keys("disclosure_name_fts", "rcept_no", pattern))
+
+    return DisclosureDocument.corp_name.like(pattern)
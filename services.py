@@ -2,24 +2,48 @@ import asyncio
 import json
 import hashlib
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable, Awaitable
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, or_, and_, desc, asc, text
+from sqlalchemy import select, insert, func, or_, and_, desc, asc, text, tuple_
 from sqlalchemy.orm import selectinload
-import httpx
 import os
 
 from database import (
-    Company, DisclosureDocument, FinancialStatement, 
-    AccountCache, ApiCache, get_db
+    Company, DisclosureDocument, FinancialStatement, FullFinancialStatement,
+    AccountCache, ApiCache, FinancialRollup, get_db, async_session, upsert_insert,
+    AMOUNT_COLUMNS, parse_amount
 )
+from http_client import dart_http_client, DART_BASE_URL
+from rate_limiter import dart_scheduler, DailyQuotaExceeded, PRIORITY_INTERACTIVE
+from memory_cache import MemoryCache
+from cache_codec import cache_serializer
+from search_index import disclosure_name_filter, company_name_filter
+from account_index import account_index
+from xbrl_cache import xbrl_hierarchy_cache
+from xbrl_parser import xbrl_parser
 
 # 환경변수 로드
 from dotenv import load_dotenv
 load_dotenv()
 
 DART_API_KEY = os.getenv("DART_API_KEY", "")
-DART_BASE_URL = "https://opendart.fss.or.kr/api"
+# 로컬 공시 검색 건수 캐시 유지 시간 (초)
+COUNT_CACHE_SECONDS = int(os.getenv("DART_COUNT_CACHE_SECONDS", "300"))
+# 다중회사 주요계정 API 한 번에 조회할 수 있는 최대 기업 수
+MULTI_ACNT_MAX_CORPS = 100
+# 전체 재무제표 구분값
+FS_DIVS = ('CFS', 'OFS')
+SJ_DIVS = ('BS', 'IS', 'CIS', 'CF', 'SCE')
+# 전체 재무제표 응답 필드 (금액 숫자 컬럼 제외)
+FULL_STATEMENT_FIELDS = [
+    'rcept_no', 'sj_nm', 'account_id', 'account_nm', 'account_detail',
+    'thstrm_nm', 'frmtrm_nm', 'bfefrmtrm_nm', 'ord', 'currency', *AMOUNT_COLUMNS
+]
+
+
+def _account_names(statements: List[Dict]) -> set:
+    return {stmt['account_nm'] for stmt in statements if stmt.get('account_nm')}
+
 
 class DartApiService:
     """DART API 서비스 클래스"""
@@ -27,6 +51,15 @@ class DartApiService:
     def __init__(self):
         self.api_key = DART_API_KEY
         self.base_url = DART_BASE_URL
+        # 진행 중인 API 요청 (캐시 키 → Task)
+        self._inflight: Dict[str, asyncio.Task] = {}
+        # api_cache 테이블 앞단의 인메모리 캐시
+        self.memory_cache = MemoryCache()
+        # 로컬 공시 검색 필터별 전체 건수 캐시
+        self.count_cache = MemoryCache(max_bytes=1024 * 1024, stale_seconds=0)
+        self.db_cache_hits = 0
+        self.db_cache_misses = 0
+        self.revalidations = 0
         print(f"DartApiService 초기화: API 키 있음={bool(self.api_key)}, 키 길이={len(self.api_key) if self.api_key else 0}")
         
     def _generate_cache_key(self, endpoint: str, params: Dict) -> str:
@@ -36,8 +69,24 @@ class DartApiService:
         param_str = json.dumps(cache_params, sort_keys=True)
         return hashlib.md5(f"{endpoint}:{param_str}".encode()).hexdigest()
     
-    async def _get_cached_response(self, session: AsyncSession, cache_key: str) -> Optional[Dict]:
-        """캐시된 응답 조회"""
+    async def _get_cached_response(
+        self, 
+        session: AsyncSession, 
+        cache_key: str,
+        refresh: Optional[Callable[[], Awaitable[Dict]]] = None
+    ) -> Optional[Dict]:
+        """캐시된 응답 조회 (메모리 → DB 순)"""
+        entry = self.memory_cache.get(cache_key)
+        if entry is not None:
+            data, is_stale = entry
+            if not is_stale:
+                return data
+            
+            # 만료된 항목은 즉시 반환하고 백그라운드에서 갱신 (stale-while-revalidate)
+            if refresh is not None:
+                self._revalidate(cache_key, refresh)
+                return data
+        
         stmt = select(ApiCache).where(
             and_(
                 ApiCache.cache_key == cache_key,
@@ -48,39 +97,78 @@ class DartApiService:
         cache_entry = result.scalar_one_or_none()
         
         if cache_entry:
-            return json.loads(cache_entry.response_data)
+            self.db_cache_hits += 1
+            data, raw_size = cache_serializer.decode(cache_entry.response_data)
+            self.memory_cache.set(cache_key, data, cache_entry.expires_at, raw_size)
+            return data
+        
+        self.db_cache_misses += 1
         return None
     
+    def _revalidate(self, cache_key: str, refresh: Callable[[], Awaitable[Dict]]):
+        """만료된 캐시 항목 백그라운드 갱신 (진행 중인 동일 요청이 있으면 합류)"""
+        async def run():
+            try:
+                await self._single_flight(cache_key, refresh)
+            except Exception as e:
+                print(f"캐시 갱신 실패 ({cache_key}): {e}")
+        
+        if cache_key not in self._inflight:
+            self.revalidations += 1
+            asyncio.create_task(run())
+    
+    def get_cache_stats(self) -> Dict:
+        """캐시 계층별 적중 현황"""
+        return {
+            "memory": self.memory_cache.stats(),
+            "db": {
+                "hits": self.db_cache_hits,
+                "misses": self.db_cache_misses,
+            },
+            "revalidations": self.revalidations,
+            "inflight": len(self._inflight),
+            "codec": cache_serializer.stats(),
+            "account_index": account_index.stats(),
+            "xbrl_hierarchy": xbrl_hierarchy_cache.stats(),
+        }
+    
     async def _cache_response(
         self, 
         session: AsyncSession, 
         cache_key: str, 
         data: Dict, 
-        cache_hours: int = 6
+        cache_hours: int = 6,
+        commit: bool = True
     ):
-        """응답 캐싱"""
+        """응답 캐싱 (같은 세션에서 저장한 데이터와 함께 커밋)"""
         expires_at = datetime.utcnow() + timedelta(hours=cache_hours)
+        response_data, raw_size = cache_serializer.encode(data)
         
-        # 기존 캐시 삭제 후 새로 생성
-        stmt = select(ApiCache).where(ApiCache.cache_key == cache_key)
-        result = await session.execute(stmt)
-        existing = result.scalar_one_or_none()
-        
-        if existing:
-            existing.response_data = json.dumps(data)
-            existing.expires_at = expires_at
-        else:
-            cache_entry = ApiCache(
-                cache_key=cache_key,
-                response_data=json.dumps(data),
-                expires_at=expires_at
-            )
-            session.add(cache_entry)
+        stmt = upsert_insert(ApiCache.__table__).values(
+            cache_key=cache_key,
+            response_data=response_data,
+            expires_at=expires_at
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['cache_key'],
+            set_={
+                'response_data': stmt.excluded.response_data,
+                'expires_at': stmt.excluded.expires_at
+            }
+        )
+        await session.execute(stmt)
         
-        await session.commit()
+        if commit:
+            await session.commit()
+        self.memory_cache.set(cache_key, data, expires_at, raw_size)
     
-    async def _make_api_request(self, endpoint: str, params: Dict) -> Dict:
-        """실제 API 요청"""
+    async def _make_api_request(
+        self, 
+        endpoint: str, 
+        params: Dict, 
+        priority: int = PRIORITY_INTERACTIVE
+    ) -> Dict:
+        """실제 API 요청 (전역 스케줄러로 호출 속도 및 일일 한도 제한)"""
         if not self.api_key:
             # API 키가 없는 경우 에러 응답 반환
             return {
@@ -89,12 +177,67 @@ class DartApiService:
                 "list": []
             }
         
-        params['crtfc_key'] = self.api_key
+        try:
+            await dart_scheduler.acquire(priority)
+        except DailyQuotaExceeded as e:
+            return {
+                "status": "020",
+                "message": str(e),
+                "list": []
+            }
+        
+        params = {**params, 'crtfc_key': self.api_key}
+        
+        # 공용 연결 풀 사용 (요청마다 TCP/TLS 연결을 새로 맺지 않음)
+        response = await dart_http_client.get(endpoint, params)
+        return response.json()
+    
+    async def _single_flight(self, cache_key: str, fetch: Callable[[], Awaitable[Dict]]) -> Dict:
+        """동일한 캐시 키로 진행 중인 요청이 있으면 그 결과를 함께 사용"""
+        task = self._inflight.get(cache_key)
+        if task is None:
+            task = asyncio.create_task(fetch())
+            self._inflight[cache_key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(cache_key, None))
+        
+        # 한 호출자가 취소되어도 공유 중인 요청은 계속 진행
+        return await asyncio.shield(task)
+    
+    async def _fetch_and_store(
+        self,
+        session: AsyncSession,
+        endpoint: str,
+        params: Dict,
+        cache_hours: int,
+        persist: Callable[[AsyncSession, Dict], Awaitable[None]],
+        priority: int = PRIORITY_INTERACTIVE,
+        after_commit: Optional[Callable[[Dict], None]] = None
+    ) -> Dict:
+        """캐시 확인 후 API 호출, DB 저장 및 캐싱 (동일 요청은 한 번만 수행)
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(f"{self.base_url}/{endpoint}", params=params)
-            response.raise_for_status()
-            return response.json()
+        after_commit은 저장이 커밋된 뒤에 호출됩니다 (메모리 인덱스 갱신 등).
+        """
+        cache_key = self._generate_cache_key(endpoint, params)
+        
+        async def fetch() -> Dict:
+            data = await self._make_api_request(endpoint, params, priority)
+            
+            # 성공한 경우 DB 저장과 캐싱을 한 트랜잭션으로 처리 (요청자 세션과 무관하게 별도 세션 사용)
+            if data.get('status') == '000' and data.get('list'):
+                async with async_session() as flight_session:
+                    await persist(flight_session, data)
+                    await self._cache_response(flight_session, cache_key, data, cache_hours=cache_hours)
+                if after_commit is not None:
+                    after_commit(data)
+            
+            return data
+        
+        # 캐시 확인
+        cached_data = await self._get_cached_response(session, cache_key, refresh=fetch)
+        if cached_data:
+            return cached_data
+        
+        return await self._single_flight(cache_key, fetch)
     
     async def search_companies_optimized(
         self, 
@@ -106,7 +249,10 @@ class DartApiService:
         pblntf_ty: Optional[str] = None,
         corp_cls: Optional[str] = None,
         page_no: int = 1,
-        page_count: int = 20
+        page_count: int = 20,
+        priority: int = PRIORITY_INTERACTIVE,
+        cursor: Optional[str] = None,
+        with_total: bool = True
     ) -> Dict:
         """최적화된 기업 검색"""
         
@@ -116,29 +262,39 @@ class DartApiService:
             
             if corp_name:
                 return await self._search_companies_local(
-                    session, corp_name, corp_cls, page_no, page_count
+                    session, corp_name, corp_cls, page_no, page_count, cursor, with_total
                 )
             elif corp_code:
-                return await self._search_by_corp_code_local(session, corp_code, page_no, page_count)
+                return await self._search_by_corp_code_local(
+                    session, corp_code, page_no, page_count, cursor, with_total
+                )
             else:
                 # 일반적인 검색 - 로컬 DB에서 최근 데이터 반환
-                return await self._get_recent_companies_local(session, corp_cls, page_no, page_count)
+                return await self._get_recent_companies_local(
+                    session, corp_cls, page_no, page_count, cursor, with_total
+                )
         
         # 먼저 로컬 DB에서 검색 시도 (기업명 검색인 경우)
         if corp_name:
             local_results = await self._search_companies_local(
-                session, corp_name, corp_cls, page_no, page_count
+                session, corp_name, corp_cls, page_no, page_count, cursor, with_total
             )
-            if local_results['list']:
+            # 커서로 다음 페이지를 요청한 경우 로컬 결과가 끝이면 그대로 반환
+            if local_results['list'] or cursor:
                 print(f"로컬 DB에서 '{corp_name}' 검색 결과: {len(local_results['list'])}건")
                 return local_results
             else:
                 print(f"로컬 DB에 '{corp_name}' 데이터가 없어 API 호출을 시도합니다.")
+                # list.json은 기업명 검색을 지원하지 않으므로 기업 목록에서 고유번호 확인
+                if not corp_code:
+                    corp_code = await self._resolve_corp_code(session, corp_name)
         
         # 특정 기업 고유번호로 검색하는 경우 로컬 DB 먼저 확인
         if corp_code:
-            local_corp_results = await self._search_by_corp_code_local(session, corp_code, page_no, page_count)
-            if local_corp_results['list']:
+            local_corp_results = await self._search_by_corp_code_local(
+                session, corp_code, page_no, page_count, cursor, with_total
+            )
+            if local_corp_results['list'] or cursor:
                 print(f"로컬 DB에서 기업코드 '{corp_code}' 검색 결과: {len(local_corp_results['list'])}건")
                 return local_corp_results
             else:
@@ -160,75 +316,54 @@ class DartApiService:
         
         print(f"API 호출 - 파라미터: {params}")
         
-        cache_key = self._generate_cache_key("list.json", params)
-        
-        # 캐시 확인
-        cached_data = await self._get_cached_response(session, cache_key)
-        if cached_data:
-            return cached_data
-        
         # API 호출
-        data = await self._make_api_request("list.json", params)
-        
-        # 성공한 경우 DB에 저장 및 캐싱
-        if data.get('status') == '000' and data.get('list'):
-            await self._save_disclosure_documents(session, data['list'])
-            await self._cache_response(session, cache_key, data, cache_hours=2)
+        async def persist(flight_session: AsyncSession, data: Dict):
+            await self._save_disclosure_documents(flight_session, data['list'], commit=False, pblntf_ty=pblntf_ty)
         
-        return data
+        return await self._fetch_and_store(
+            session, "list.json", params, 2, persist, priority
+        )
     
     async def _get_recent_companies_local(
         self, 
         session: AsyncSession, 
         corp_cls: Optional[str] = None,
         page_no: int = 1,
-        page_count: int = 20
+        page_count: int = 20,
+        cursor: Optional[str] = None,
+        with_total: bool = True,
+        pblntf_ty: Optional[str] = None,
+        bgn_de: Optional[str] = None,
+        message: str = '정상 (로컬 DB)'
     ) -> Dict:
         """로컬 DB에서 최근 기업 데이터 조회"""
-        
-        stmt = select(DisclosureDocument).order_by(desc(DisclosureDocument.rcept_dt))
-        
-        if corp_cls:
-            stmt = stmt.where(DisclosureDocument.corp_cls == corp_cls)
-        
-        # 페이징
-        offset = (page_no - 1) * page_count
-        stmt = stmt.offset(offset).limit(page_count)
-        
-        result = await session.execute(stmt)
-        documents = result.scalars().all()
-        
-        # 전체 건수 조회
-        count_stmt = select(func.count(DisclosureDocument.rcept_no))
+        filters = []
         if corp_cls:
-            count_stmt = count_stmt.where(DisclosureDocument.corp_cls == corp_cls)
-            
-        count_result = await session.execute(count_stmt)
-        total_count = count_result.scalar()
-        
-        # 결과 형태 맞추기
-        document_list = []
-        for doc in documents:
-            document_list.append({
-                'rcept_no': doc.rcept_no,
-                'corp_code': doc.corp_code,
-                'corp_name': doc.corp_name,
-                'corp_cls': doc.corp_cls,
-                'report_nm': doc.report_nm,
-                'rcept_dt': doc.rcept_dt,
-                'flr_nm': doc.flr_nm,
-                'rm': doc.rm or ''
-            })
+            filters.append(DisclosureDocument.corp_cls == corp_cls)
+        if pblntf_ty:
+            filters.append(DisclosureDocument.pblntf_ty == pblntf_ty)
+        if bgn_de:
+            filters.append(DisclosureDocument.rcept_dt >= bgn_de)
+        
+        return await self._query_disclosures_local(
+            session, filters, f"recent:{corp_cls}:{pblntf_ty}:{bgn_de}", page_no, page_count, cursor, with_total,
+            message=message
+        )
+    
+    async def _resolve_corp_code(self, session: AsyncSession, corp_name: str) -> Optional[str]:
+        """기업명으로 고유번호 조회 (정확히 일치하거나 하나만 일치하는 경우)"""
+        result = await session.execute(
+            select(Company.corp_code).where(Company.corp_name == corp_name).limit(1)
+        )
+        corp_code = result.scalar()
+        if corp_code:
+            return corp_code
         
-        return {
-            'status': '000',
-            'message': '정상 (로컬 DB)',
-            'page_no': page_no,
-            'page_count': page_count,
-            'total_count': total_count,
-            'total_page': (total_count + page_count - 1) // page_count,
-            'list': document_list
-        }
+        result = await session.execute(
+            select(Company.corp_code).where(company_name_filter(corp_name)).limit(2)
+        )
+        matches = result.scalars().all()
+        return matches[0] if len(matches) == 1 else None
     
     async def _search_companies_local(
         self, 
@@ -236,94 +371,152 @@ class DartApiService:
         corp_name: str,
         corp_cls: Optional[str] = None,
         page_no: int = 1,
-        page_count: int = 20
+        page_count: int = 20,
+        cursor: Optional[str] = None,
+        with_total: bool = True
     ) -> Dict:
         """로컬 DB에서 기업 검색"""
-        
-        # 기본 쿼리
-        stmt = select(DisclosureDocument).where(
-            DisclosureDocument.corp_name.like(f"%{corp_name}%")
-        )
+        # 기업명 부분 일치 (검색 인덱스 사용)
+        filters = [disclosure_name_filter(corp_name)]
         
         # 법인구분 필터
         if corp_cls:
-            stmt = stmt.where(DisclosureDocument.corp_cls == corp_cls)
-        
-        # 최신 순 정렬
-        stmt = stmt.order_by(desc(DisclosureDocument.rcept_dt))
-        
-        # 페이징
-        offset = (page_no - 1) * page_count
-        stmt = stmt.offset(offset).limit(page_count)
+            filters.append(DisclosureDocument.corp_cls == corp_cls)
         
-        result = await session.execute(stmt)
-        documents = result.scalars().all()
-        
-        # 전체 건수 조회
-        count_stmt = select(func.count(DisclosureDocument.rcept_no)).where(
-            DisclosureDocument.corp_name.like(f"%{corp_name}%")
+        return await self._query_disclosures_local(
+            session, filters, f"name:{corp_name}:{corp_cls}", page_no, page_count, cursor, with_total
         )
-        if corp_cls:
-            count_stmt = count_stmt.where(DisclosureDocument.corp_cls == corp_cls)
-        
-        count_result = await session.execute(count_stmt)
-        total_count = count_result.scalar()
-        
-        # 결과 형태 맞추기
-        document_list = []
-        for doc in documents:
-            document_list.append({
-                'rcept_no': doc.rcept_no,
-                'corp_code': doc.corp_code,
-                'corp_name': doc.corp_name,
-                'corp_cls': doc.corp_cls,
-                'report_nm': doc.report_nm,
-                'rcept_dt': doc.rcept_dt,
-                'flr_nm': doc.flr_nm,
-                'rm': doc.rm or ''
-            })
-        
-        return {
-            'status': '000',
-            'message': '정상',
-            'page_no': page_no,
-            'page_count': page_count,
-            'total_count': total_count,
-            'total_page': (total_count + page_count - 1) // page_count,
-            'list': document_list
-        }
     
     async def _search_by_corp_code_local(
         self, 
         session: AsyncSession, 
         corp_code: str,
         page_no: int = 1,
-        page_count: int = 20
+        page_count: int = 20,
+        cursor: Optional[str] = None,
+        with_total: bool = True
     ) -> Dict:
         """기업 고유번호로 로컬 DB 검색"""
+        filters = [DisclosureDocument.corp_code == corp_code]
         
-        # 기본 쿼리
-        stmt = select(DisclosureDocument).where(
-            DisclosureDocument.corp_code == corp_code
+        return await self._query_disclosures_local(
+            session, filters, f"corp:{corp_code}", page_no, page_count, cursor, with_total
         )
+    
+    def disclosures_query(
+        self,
+        corp_code: Optional[str] = None,
+        bgn_de: Optional[str] = None,
+        end_de: Optional[str] = None,
+        pblntf_ty: Optional[str] = None,
+        corp_cls: Optional[str] = None,
+        cursor: Optional[str] = None
+    ):
+        """로컬 공시 문서 조회 구문 (최신순, 페이지 제한 없음 - 스트리밍 응답용)"""
+        columns = [
+            DisclosureDocument.rcept_no, DisclosureDocument.corp_code, DisclosureDocument.corp_name,
+            DisclosureDocument.corp_cls, DisclosureDocument.report_nm, DisclosureDocument.rcept_dt,
+            DisclosureDocument.flr_nm, DisclosureDocument.pblntf_ty, DisclosureDocument.rm
+        ]
+        stmt = select(*columns)
+        if corp_code:
+            stmt = stmt.where(DisclosureDocument.corp_code == corp_code)
+        if bgn_de:
+            stmt = stmt.where(DisclosureDocument.rcept_dt >= bgn_de)
+        if end_de:
+            stmt = stmt.where(DisclosureDocument.rcept_dt <= end_de)
+        if pblntf_ty:
+            stmt = stmt.where(DisclosureDocument.pblntf_ty == pblntf_ty)
+        if corp_cls:
+            stmt = stmt.where(DisclosureDocument.corp_cls == corp_cls)
+        if cursor:
+            cursor_dt, _, cursor_no = cursor.partition(':')
+            stmt = stmt.where(
+                tuple_(DisclosureDocument.rcept_dt, DisclosureDocument.rcept_no) < tuple_(cursor_dt, cursor_no)
+            )
+        return stmt.order_by(desc(DisclosureDocument.rcept_dt), desc(DisclosureDocument.rcept_no))
+
+    async def ensure_disclosures(
+        self,
+        session: AsyncSession,
+        corp_code: str,
+        bgn_de: Optional[str] = None,
+        end_de: Optional[str] = None,
+        pblntf_ty: Optional[str] = None,
+        corp_cls: Optional[str] = None,
+        priority: int = PRIORITY_INTERACTIVE
+    ) -> Dict:
+        """기업의 공시 목록 전체 페이지를 수집하여 로컬에 저장 (행은 반환하지 않음 - 스트리밍 응답 전 사용)"""
+        params = {
+            'corp_code': corp_code,
+            'bgn_de': bgn_de,
+            'end_de': end_de,
+            'pblntf_ty': pblntf_ty,
+            'corp_cls': corp_cls,
+            'page_count': 100
+        }
+        params = {k: v for k, v in params.items() if v is not None}
+
+        page_no = 1
+        fetched = 0
+        while True:
+            data = await self._make_api_request("list.json", {**params, 'page_no': page_no}, priority)
+            status = data.get('status')
+            if status == '013':
+                # 조회된 데이터 없음
+                break
+            if status != '000':
+                return data
+
+            documents = data.get('list') or []
+            if documents:
+                await self._save_disclosure_documents(session, documents, pblntf_ty=pblntf_ty)
+                fetched += len(documents)
+            if page_no >= int(data.get('total_page') or 1):
+                break
+            page_no += 1
+
+        print(f"공시 목록 수집: {corp_code} ({fetched}건, {page_no}페이지)")
+        return {'status': '000', 'message': '정상', 'fetched': fetched}
+
+    async def _query_disclosures_local(
+        self,
+        session: AsyncSession,
+        filters: List,
+        filter_key: str,
+        page_no: int = 1,
+        page_count: int = 20,
+        cursor: Optional[str] = None,
+        with_total: bool = True,
+        message: str = '정상'
+    ) -> Dict:
+        """로컬 공시 문서 조회 (최신순, 커서 기반 페이징)
+
+        cursor는 직전 페이지의 next_cursor 값("접수일자:접수번호")이며,
+        cursor가 없으면 page_no로 OFFSET 페이징합니다.
+        """
+        stmt = select(DisclosureDocument).where(*filters)
         
-        # 최신 순 정렬
-        stmt = stmt.order_by(desc(DisclosureDocument.rcept_dt))
+        # 최신 순 정렬 (접수일자, 접수번호 복합 인덱스 사용)
+        stmt = stmt.order_by(desc(DisclosureDocument.rcept_dt), desc(DisclosureDocument.rcept_no))
         
         # 페이징
-        offset = (page_no - 1) * page_count
-        stmt = stmt.offset(offset).limit(page_count)
+        if cursor:
+            cursor_dt, _, cursor_no = cursor.partition(':')
+            stmt = stmt.where(
+                tuple_(DisclosureDocument.rcept_dt, DisclosureDocument.rcept_no) < tuple_(cursor_dt, cursor_no)
+            )
+        else:
+            stmt = stmt.offset((page_no - 1) * page_count)
+        stmt = stmt.limit(page_count)
         
         result = await session.execute(stmt)
         documents = result.scalars().all()
         
-        # 전체 건수 조회
-        count_stmt = select(func.count(DisclosureDocument.rcept_no)).where(
-            DisclosureDocument.corp_code == corp_code
-        )
-        
-        count_result = await session.execute(count_stmt)
-        total_count = count_result.scalar()
+        # 전체 건수 조회 (선택, 필터별로 캐싱)
+        total_count = None
+        if with_total:
+            total_count = await self._count_disclosures_local(session, filters, filter_key)
         
         # 결과 형태 맞추기
         document_list = []
@@ -339,81 +532,166 @@ class DartApiService:
                 'rm': doc.rm or ''
             })
         
+        next_cursor = None
+        if len(documents) == page_count:
+            next_cursor = f"{documents[-1].rcept_dt}:{documents[-1].rcept_no}"
+        
         return {
             'status': '000',
-            'message': '정상',
+            'message': message,
             'page_no': page_no,
             'page_count': page_count,
             'total_count': total_count,
-            'total_page': (total_count + page_count - 1) // page_count,
+            'total_page': (total_count + page_count - 1) // page_count if total_count is not None else None,
+            'next_cursor': next_cursor,
             'list': document_list
         }
     
-    async def _save_disclosure_documents(self, session: AsyncSession, documents: List[Dict]):
-        """공시 문서를 DB에 저장 (기업 정보도 함께 저장)"""
-        saved_count = 0
+    async def _count_disclosures_local(self, session: AsyncSession, filters: List, filter_key: str) -> int:
+        """필터별 공시 건수 (짧은 시간 동안 메모리에 캐싱)"""
+        entry = self.count_cache.get(filter_key)
+        if entry is not None:
+            return entry[0]
         
+        count_stmt = select(func.count(DisclosureDocument.rcept_no)).where(*filters)
+        count_result = await session.execute(count_stmt)
+        total_count = count_result.scalar()
+        
+        self.count_cache.set(
+            filter_key, total_count, 
+            datetime.utcnow() + timedelta(seconds=COUNT_CACHE_SECONDS), 
+            len(filter_key) + 64
+        )
+        return total_count
+    
+    async def _save_disclosure_documents(
+        self, 
+        session: AsyncSession, 
+        documents: List[Dict], 
+        commit: bool = True,
+        pblntf_ty: Optional[str] = None
+    ) -> Dict:
+        """공시 문서를 DB에 일괄 저장 (기업 정보도 함께 저장)
+
+        페이지 크기와 관계없이 일정한 수의 SQL 문으로 처리합니다.
+        list.json 응답에는 공시유형이 없으므로 조회시 지정한 pblntf_ty를 함께 저장합니다.
+        """
+        # 배치 내 중복 제거 (나중 항목 우선)
+        document_rows = {}
+        company_rows = {}
         for doc_data in documents:
-            # 1. 기업 정보 저장/업데이트
-            await self._save_company_info(session, doc_data)
-            
-            # 2. 공시 문서 중복 확인
-            stmt = select(DisclosureDocument).where(
-                DisclosureDocument.rcept_no == doc_data['rcept_no']
+            document_rows[doc_data['rcept_no']] = {
+                'rcept_no': doc_data['rcept_no'],
+                'corp_code': doc_data['corp_code'],
+                'corp_name': doc_data['corp_name'],
+                'corp_cls': doc_data.get('corp_cls'),
+                'report_nm': doc_data['report_nm'],
+                'rcept_dt': doc_data['rcept_dt'],
+                'flr_nm': doc_data['flr_nm'],
+                'pblntf_ty': doc_data.get('pblntf_ty') or pblntf_ty,
+                'pblntf_detail_ty': doc_data.get('pblntf_detail_ty'),
+                'rm': doc_data.get('rm', '')
+            }
+            company_rows[doc_data['corp_code']] = {
+                'corp_code': doc_data['corp_code'],
+                'corp_name': doc_data['corp_name'],
+                'corp_cls': doc_data.get('corp_cls')
+            }
+        
+        if not document_rows:
+            return {'documents_inserted': 0, 'documents_updated': 0, 'companies_inserted': 0, 'companies_updated': 0}
+        
+        # 1. 기업 정보 저장/업데이트
+        company_counts = await self._upsert_companies(
+            session, list(company_rows.values()), ['corp_name', 'corp_cls']
+        )
+        
+        # 2. 공시 문서 저장/업데이트
+        existing_result = await session.execute(
+            select(DisclosureDocument.rcept_no).where(
+                DisclosureDocument.rcept_no.in_(list(document_rows))
             )
-            result = await session.execute(stmt)
-            existing = result.scalar_one_or_none()
-            
-            if not existing:
-                document = DisclosureDocument(
-                    rcept_no=doc_data['rcept_no'],
-                    corp_code=doc_data['corp_code'],
-                    corp_name=doc_data['corp_name'],
-                    corp_cls=doc_data.get('corp_cls'),
-                    report_nm=doc_data['report_nm'],
-                    rcept_dt=doc_data['rcept_dt'],
-                    flr_nm=doc_data['flr_nm'],
-                    pblntf_ty=doc_data.get('pblntf_ty'),
-                    pblntf_detail_ty=doc_data.get('pblntf_detail_ty'),
-                    rm=doc_data.get('rm', '')
-                )
-                session.add(document)
-                saved_count += 1
+        )
+        existing_rcept_nos = set(existing_result.scalars().all())
+        existing_count = len(existing_rcept_nos)
+        
+        table = DisclosureDocument.__table__
+        stmt = upsert_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['rcept_no'],
+            set_={
+                **{
+                    column: stmt.excluded[column]
+                    for column in ('corp_name', 'corp_cls', 'report_nm', 'rcept_dt', 'flr_nm', 'rm')
+                },
+                # 공시유형 없이 조회한 결과가 기존 공시유형을 지우지 않도록 유지
+                **{
+                    column: func.coalesce(stmt.excluded[column], table.c[column])
+                    for column in ('pblntf_ty', 'pblntf_detail_ty')
+                }
+            }
+        )
+        await session.execute(stmt, list(document_rows.values()))
         
-        await session.commit()
-        print(f"새로 저장된 공시 문서: {saved_count}건")
-    
-    async def _save_company_info(self, session: AsyncSession, doc_data: Dict):
-        """기업 정보 저장/업데이트"""
-        corp_code = doc_data['corp_code']
-        corp_name = doc_data['corp_name']
-        corp_cls = doc_data.get('corp_cls')
+        # 새로 접수된 정정 공시는 해당 보고서의 XBRL 캐시를 무효화
+        await xbrl_hierarchy_cache.invalidate_amendments(
+            session, [row for rcept_no, row in document_rows.items() if rcept_no not in existing_rcept_nos]
+        )
+        if commit:
+            await session.commit()
         
-        # 기존 기업 정보 확인
-        stmt = select(Company).where(Company.corp_code == corp_code)
-        result = await session.execute(stmt)
-        existing_company = result.scalar_one_or_none()
+        # 새 문서가 들어왔으므로 건수 캐시 무효화
+        if len(document_rows) > existing_count:
+            self.count_cache.clear()
         
-        if existing_company:
-            # 기업 정보 업데이트
-            existing_company.corp_name = corp_name
-            existing_company.corp_cls = corp_cls
-            existing_company.updated_at = datetime.utcnow()
-        else:
-            # 새 기업 정보 생성
-            company = Company(
-                corp_code=corp_code,
-                corp_name=corp_name,
-                corp_cls=corp_cls
+        counts = {
+            'documents_inserted': len(document_rows) - existing_count,
+            'documents_updated': existing_count,
+            **company_counts
+        }
+        print(f"공시 문서 저장: 신규 {counts['documents_inserted']}건, 갱신 {counts['documents_updated']}건 "
+              f"(기업 신규 {counts['companies_inserted']}건, 갱신 {counts['companies_updated']}건)")
+        return counts
+    
+    async def _upsert_companies(
+        self, 
+        session: AsyncSession, 
+        rows: List[Dict], 
+        update_columns: List[str]
+    ) -> Dict:
+        """기업 정보 일괄 저장/업데이트 (커밋은 호출자가 수행)"""
+        if not rows:
+            return {'companies_inserted': 0, 'companies_updated': 0}
+        
+        existing_result = await session.execute(
+            select(Company.corp_code).where(
+                Company.corp_code.in_([row['corp_code'] for row in rows])
             )
-            session.add(company)
+        )
+        existing_count = len(existing_result.all())
+        
+        stmt = upsert_insert(Company.__table__)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['corp_code'],
+            set_={
+                **{column: stmt.excluded[column] for column in update_columns},
+                'updated_at': datetime.utcnow()
+            }
+        )
+        await session.execute(stmt, rows)
+        
+        return {
+            'companies_inserted': len(rows) - existing_count,
+            'companies_updated': existing_count
+        }
     
     async def get_financial_data_optimized(
         self,
         session: AsyncSession,
         corp_code: str,
         bsns_year: str,
-        reprt_code: str = "11011"
+        reprt_code: str = "11011",
+        priority: int = PRIORITY_INTERACTIVE
     ) -> Dict:
         """최적화된 재무제표 데이터 조회"""
         
@@ -432,23 +710,291 @@ class DartApiService:
             'reprt_code': reprt_code
         }
         
-        cache_key = self._generate_cache_key("fnlttSinglAcnt.json", params)
+        # API 호출
+        async def persist(flight_session: AsyncSession, data: Dict):
+            await self._save_financial_statements(flight_session, data['list'], corp_code, bsns_year, reprt_code)
+            await self._update_account_cache(flight_session, data['list'])
         
-        # 캐시 확인
-        cached_data = await self._get_cached_response(session, cache_key)
-        if cached_data:
-            return cached_data
+        # 커밋된 계정명만 자동완성 인덱스에 반영
+        def record_accounts(data: Dict):
+            account_index.record_usage(_account_names(data['list']))
         
-        # API 호출
-        data = await self._make_api_request("fnlttSinglAcnt.json", params)
+        # 재무데이터는 24시간 캐싱
+        return await self._fetch_and_store(
+            session, "fnlttSinglAcnt.json", params, 24, persist, priority, after_commit=record_accounts
+        )
+    
+    async def get_financial_data_batch(
+        self,
+        session: AsyncSession,
+        corp_codes: List[str],
+        bsns_year: str,
+        reprt_code: str = "11011",
+        priority: int = PRIORITY_INTERACTIVE
+    ) -> Dict:
+        """여러 기업의 재무제표 일괄 조회
+        
+        로컬 DB에 없는 기업만 다중회사 주요계정 API(fnlttMultiAcnt.json)로
+        최대 100개씩 묶어 호출하고, 결과를 기업별로 나누어 저장/캐싱합니다.
+        기업별 캐시는 단일회사 조회(fnlttSinglAcnt.json)와 같은 키를 사용합니다.
+        """
+        corp_codes = list(dict.fromkeys(code for code in corp_codes if code))
+        results: Dict[str, Dict] = {}
+        
+        # 로컬 DB에 있는 기업 확인 (한 번의 조회)
+        stored_result = await session.execute(
+            select(FinancialStatement.corp_code).where(
+                FinancialStatement.corp_code.in_(corp_codes),
+                FinancialStatement.bsns_year == bsns_year,
+                FinancialStatement.reprt_code == reprt_code
+            ).distinct()
+        )
+        stored = set(stored_result.scalars().all())
+        for corp_code in corp_codes:
+            if corp_code in stored:
+                results[corp_code] = await self._get_financial_data_local(session, corp_code, bsns_year, reprt_code)
+        
+        missing = [corp_code for corp_code in corp_codes if corp_code not in stored]
+        chunks = [missing[i:i + MULTI_ACNT_MAX_CORPS] for i in range(0, len(missing), MULTI_ACNT_MAX_CORPS)]
+        
+        # 응답 행에 기업 고유번호가 없으면 종목코드로 기업 구분
+        stock_to_corp: Dict[str, str] = {}
+        if missing:
+            company_result = await session.execute(
+                select(Company.stock_code, Company.corp_code).where(
+                    Company.corp_code.in_(missing), Company.stock_code.isnot(None)
+                )
+            )
+            stock_to_corp = {stock_code: corp_code for stock_code, corp_code in company_result.all()}
+        
+        responses = await asyncio.gather(*[
+            self._make_api_request("fnlttMultiAcnt.json", {
+                'corp_code': ','.join(chunk),
+                'bsns_year': bsns_year,
+                'reprt_code': reprt_code
+            }, priority)
+            for chunk in chunks
+        ])
         
-        # 성공한 경우 DB에 저장 및 캐싱
-        if data.get('status') == '000' and data.get('list'):
-            await self._save_financial_statements(session, data['list'], corp_code, bsns_year, reprt_code)
-            await self._update_account_cache(session, data['list'])
-            await self._cache_response(session, cache_key, data, cache_hours=24)  # 재무데이터는 24시간 캐싱
+        account_names = set()
+        async with async_session() as batch_session:
+            for chunk, data in zip(chunks, responses):
+                status = data.get('status')
+                if status not in ('000', '013'):
+                    for corp_code in chunk:
+                        results[corp_code] = {'status': status, 'message': data.get('message', '알 수 없는 오류'), 'list': []}
+                    continue
+                
+                rows_by_corp: Dict[str, List[Dict]] = {}
+                for row in data.get('list') or []:
+                    corp_code = row.get('corp_code') or stock_to_corp.get((row.get('stock_code') or '').strip())
+                    if corp_code in chunk:
+                        rows_by_corp.setdefault(corp_code, []).append(row)
+                
+                for corp_code in chunk:
+                    rows = rows_by_corp.get(corp_code)
+                    if not rows:
+                        results[corp_code] = {'status': '013', 'message': '조회된 데이타가 없습니다.', 'list': []}
+                        continue
+                    
+                    company_data = {'status': '000', 'message': '정상', 'list': rows}
+                    await self._save_financial_statements(batch_session, rows, corp_code, bsns_year, reprt_code)
+                    account_names |= await self._update_account_cache(batch_session, rows)
+                    cache_key = self._generate_cache_key("fnlttSinglAcnt.json", {
+                        'corp_code': corp_code,
+                        'bsns_year': bsns_year,
+                        'reprt_code': reprt_code
+                    })
+                    await self._cache_response(batch_session, cache_key, company_data, cache_hours=24, commit=False)
+                    results[corp_code] = company_data
+            
+            await batch_session.commit()
+        account_index.record_usage(account_names)
         
-        return data
+        print(f"재무제표 일괄 조회: {len(corp_codes)}개 기업 (로컬 {len(stored)}개, API 호출 {len(chunks)}회)")
+        return {
+            'status': '000',
+            'message': '정상',
+            'bsns_year': bsns_year,
+            'reprt_code': reprt_code,
+            'api_calls': len(chunks),
+            'results': results
+        }
+    
+    async def get_full_financial_statements(
+        self,
+        session: AsyncSession,
+        corp_code: str,
+        bsns_year: str,
+        reprt_code: str = "11011",
+        fs_div: str = "CFS",
+        sj_div: Optional[str] = None,
+        priority: int = PRIORITY_INTERACTIVE
+    ) -> Dict:
+        """전체 재무제표 조회 (로컬에 없으면 fnlttSinglAcntAll.json 수집 후 저장)
+        
+        응답이 수천 행이므로 api_cache에 원문을 두지 않고 전용 테이블에만 저장합니다.
+        """
+        local_data = await self._get_full_statements_local(session, corp_code, bsns_year, reprt_code, fs_div, sj_div)
+        if local_data['list']:
+            return local_data
+        
+        data = await self.ensure_full_financial_statements(session, corp_code, bsns_year, reprt_code, fs_div, priority)
+        if data.get('status') != '000':
+            return data
+        
+        return await self._get_full_statements_local(session, corp_code, bsns_year, reprt_code, fs_div, sj_div)
+    
+    async def ensure_full_financial_statements(
+        self,
+        session: AsyncSession,
+        corp_code: str,
+        bsns_year: str,
+        reprt_code: str = "11011",
+        fs_div: str = "CFS",
+        priority: int = PRIORITY_INTERACTIVE
+    ) -> Dict:
+        """전체 재무제표가 로컬에 없으면 수집 (행은 읽지 않고 상태만 반환)"""
+        stored = await session.execute(
+            select(FullFinancialStatement.line_no).where(
+                FullFinancialStatement.corp_code == corp_code,
+                FullFinancialStatement.bsns_year == bsns_year,
+                FullFinancialStatement.reprt_code == reprt_code,
+                FullFinancialStatement.fs_div == fs_div
+            ).limit(1)
+        )
+        if stored.first() is not None:
+            return {'status': '000', 'message': '정상'}
+        
+        params = {
+            'corp_code': corp_code,
+            'bsns_year': bsns_year,
+            'reprt_code': reprt_code,
+            'fs_div': fs_div
+        }
+        
+        async def fetch() -> Dict:
+            data = await self._make_api_request("fnlttSinglAcntAll.json", params, priority)
+            if data.get('status') == '000' and data.get('list'):
+                async with async_session() as flight_session:
+                    await self._save_full_statements(flight_session, data['list'], corp_code, bsns_year, reprt_code, fs_div)
+                    await flight_session.commit()
+            return data
+        
+        data = await self._single_flight(self._generate_cache_key("fnlttSinglAcntAll.json", params), fetch)
+        if data.get('status') != '000':
+            return data
+        return {'status': '000', 'message': '정상'}
+    
+    def full_statements_query(
+        self,
+        corp_code: str,
+        bsns_year: str,
+        reprt_code: str,
+        fs_div: str,
+        sj_div: Optional[str] = None
+    ):
+        """전체 재무제표 조회 구문 (기본키 구간 조회)"""
+        columns = [getattr(FullFinancialStatement, field) for field in FULL_STATEMENT_FIELDS]
+        stmt = select(FullFinancialStatement.sj_div, *columns).where(
+            FullFinancialStatement.corp_code == corp_code,
+            FullFinancialStatement.bsns_year == bsns_year,
+            FullFinancialStatement.reprt_code == reprt_code,
+            FullFinancialStatement.fs_div == fs_div
+        )
+        if sj_div:
+            stmt = stmt.where(FullFinancialStatement.sj_div == sj_div)
+        return stmt.order_by(FullFinancialStatement.sj_div, FullFinancialStatement.line_no)
+    
+    async def _get_full_statements_local(
+        self,
+        session: AsyncSession,
+        corp_code: str,
+        bsns_year: str,
+        reprt_code: str,
+        fs_div: str,
+        sj_div: Optional[str] = None
+    ) -> Dict:
+        """로컬 DB에서 전체 재무제표 조회"""
+        stmt = self.full_statements_query(corp_code, bsns_year, reprt_code, fs_div, sj_div)
+        result = await session.execute(stmt)
+        statement_list = [dict(row) for row in result.mappings().all()]
+        
+        return {
+            'status': '000' if statement_list else '013',
+            'message': '정상' if statement_list else '조회된 데이타가 없습니다.',
+            'corp_code': corp_code,
+            'bsns_year': bsns_year,
+            'reprt_code': reprt_code,
+            'fs_div': fs_div,
+            'list': statement_list
+        }
+    
+    async def _save_full_statements(
+        self,
+        session: AsyncSession,
+        statements: List[Dict],
+        corp_code: str,
+        bsns_year: str,
+        reprt_code: str,
+        fs_div: str
+    ):
+        """전체 재무제표를 DB에 일괄 저장 (커밋은 호출자가 수행)"""
+        from sqlalchemy import delete
+        await session.execute(
+            delete(FullFinancialStatement).where(
+                FullFinancialStatement.corp_code == corp_code,
+                FullFinancialStatement.bsns_year == bsns_year,
+                FullFinancialStatement.reprt_code == reprt_code,
+                FullFinancialStatement.fs_div == fs_div
+            )
+        )
+        
+        # 재무제표별 행 순서를 기본키 일부로 사용 (응답 순서 유지)
+        line_numbers: Dict[str, int] = {}
+        rows = []
+        for stmt_data in statements:
+            sj_div = stmt_data.get('sj_div') or ''
+            line_numbers[sj_div] = line_numbers.get(sj_div, 0) + 1
+            row = {
+                'corp_code': corp_code,
+                'bsns_year': bsns_year,
+                'reprt_code': reprt_code,
+                'fs_div': fs_div,
+                'sj_div': sj_div,
+                'line_no': line_numbers[sj_div],
+            }
+            for field in FULL_STATEMENT_FIELDS:
+                row[field] = stmt_data.get(field)
+            row['account_nm'] = row['account_nm'] or ''
+            for text_column, num_column in AMOUNT_COLUMNS.items():
+                row[num_column] = parse_amount(stmt_data.get(text_column))
+            rows.append(row)
+        
+        if rows:
+            await session.execute(insert(FullFinancialStatement.__table__), rows)
+        
+        # 세부 계정이 있는 재무상태표로 계층형 집계 다시 계산
+        balance_rows = [row for row in rows if row['sj_div'] == 'BS']
+        if balance_rows:
+            await self._save_financial_rollup(session, balance_rows, corp_code, bsns_year, reprt_code, source="full")
+        print(f"전체 재무제표 저장: {corp_code} {bsns_year} {reprt_code} {fs_div} {len(rows)}행")
+    
+    def financial_statements_query(self, corp_code: str, bsns_year: str, reprt_code: str):
+        """재무제표(주요계정) 조회 구문"""
+        columns = [
+            FinancialStatement.fs_div, FinancialStatement.sj_div, FinancialStatement.sj_nm,
+            FinancialStatement.account_id, FinancialStatement.account_nm, FinancialStatement.account_detail,
+            FinancialStatement.thstrm_nm, FinancialStatement.thstrm_amount,
+            FinancialStatement.frmtrm_nm, FinancialStatement.frmtrm_amount,
+            FinancialStatement.bfefrmtrm_nm, FinancialStatement.bfefrmtrm_amount,
+            FinancialStatement.ord, FinancialStatement.currency
+        ]
+        return select(*columns).where(
+            FinancialStatement.corp_code == corp_code,
+            FinancialStatement.bsns_year == bsns_year,
+            FinancialStatement.reprt_code == reprt_code
+        ).order_by(asc(FinancialStatement.ord))
     
     async def _get_financial_data_local(
         self,
@@ -474,6 +1020,7 @@ class DartApiService:
         statement_list = []
         for stmt in statements:
             statement_list.append({
+                'fs_div': stmt.fs_div,
                 'sj_div': stmt.sj_div,
                 'sj_nm': stmt.sj_nm,
                 'account_id': stmt.account_id,
@@ -503,7 +1050,7 @@ class DartApiService:
         bsns_year: str,
         reprt_code: str
     ):
-        """재무제표 데이터를 DB에 저장"""
+        """재무제표 데이터를 DB에 일괄 저장 (커밋은 호출자가 수행)"""
         
         # 기존 데이터 삭제
         from sqlalchemy import delete
@@ -516,53 +1063,152 @@ class DartApiService:
         )
         await session.execute(delete_stmt)
         
-        # 새 데이터 삽입
+        # 새 데이터 삽입 (executemany 한 번)
+        rows = []
         for stmt_data in statements:
-            statement = FinancialStatement(
-                corp_code=corp_code,
-                bsns_year=bsns_year,
-                reprt_code=reprt_code,
-                sj_div=stmt_data.get('sj_div'),
-                sj_nm=stmt_data.get('sj_nm'),
-                account_id=stmt_data.get('account_id'),
-                account_nm=stmt_data.get('account_nm', ''),
-                account_detail=stmt_data.get('account_detail'),
-                thstrm_nm=stmt_data.get('thstrm_nm'),
-                thstrm_amount=stmt_data.get('thstrm_amount'),
-                frmtrm_nm=stmt_data.get('frmtrm_nm'),
-                frmtrm_amount=stmt_data.get('frmtrm_amount'),
-                bfefrmtrm_nm=stmt_data.get('bfefrmtrm_nm'),
-                bfefrmtrm_amount=stmt_data.get('bfefrmtrm_amount'),
-                ord=stmt_data.get('ord'),
-                currency=stmt_data.get('currency')
-            )
-            session.add(statement)
+            row = {
+                'corp_code': corp_code,
+                'bsns_year': bsns_year,
+                'reprt_code': reprt_code,
+                'fs_div': stmt_data.get('fs_div'),
+                'sj_div': stmt_data.get('sj_div'),
+                'sj_nm': stmt_data.get('sj_nm'),
+                'account_id': stmt_data.get('account_id'),
+                'account_nm': stmt_data.get('account_nm', ''),
+                'account_detail': stmt_data.get('account_detail'),
+                'thstrm_nm': stmt_data.get('thstrm_nm'),
+                'frmtrm_nm': stmt_data.get('frmtrm_nm'),
+                'bfefrmtrm_nm': stmt_data.get('bfefrmtrm_nm'),
+                'ord': stmt_data.get('ord'),
+                'currency': stmt_data.get('currency')
+            }
+            # 금액은 원문 텍스트와 숫자 컬럼을 함께 저장
+            for text_column, num_column in AMOUNT_COLUMNS.items():
+                row[text_column] = stmt_data.get(text_column)
+                row[num_column] = parse_amount(stmt_data.get(text_column))
+            rows.append(row)
+        
+        if rows:
+            await session.execute(insert(FinancialStatement.__table__), rows)
         
-        await session.commit()
+        await self._save_financial_rollup(session, rows, corp_code, bsns_year, reprt_code)
     
-    async def _update_account_cache(self, session: AsyncSession, statements: List[Dict]):
-        """계정명 캐시 업데이트"""
-        account_names = set()
-        for stmt in statements:
-            if stmt.get('account_nm'):
-                account_names.add(stmt['account_nm'])
+    async def _save_financial_rollup(
+        self,
+        session: AsyncSession,
+        rows: List[Dict],
+        corp_code: str,
+        bsns_year: str,
+        reprt_code: str,
+        source: str = "summary"
+    ):
+        """재무상태표 계정으로 계층형 집계를 계산하여 저장 (커밋은 호출자가 수행)
+        
+        연결재무제표(CFS)가 있으면 연결, 없으면 개별(OFS) 기준으로 집계합니다.
+        당기/전기/전전기 금액은 각각 사업연도, 1년 전, 2년 전 값으로 저장합니다.
+        source는 "summary"(주요계정) 또는 "full"(전체 재무제표)이며, 세부 계정이 있는
+        전체 재무제표 집계는 주요계정 집계로 덮어쓰지 않습니다.
+        집계할 계정이 없어도 빈 집계를 저장하여 조회/백필 때 다시 계산하지 않도록 합니다.
+        """
+        balance_rows = [row for row in rows if row.get('sj_div') in (None, 'BS')]
+        fs_divs = {row.get('fs_div') for row in balance_rows}
+        fs_div = 'CFS' if 'CFS' in fs_divs else ('OFS' if 'OFS' in fs_divs else None)
+        
+        year = int(bsns_year)
+        periods = [
+            ('thstrm_amount_num', str(year)),
+            ('frmtrm_amount_num', str(year - 1)),
+            ('bfefrmtrm_amount_num', str(year - 2)),
+        ]
+        
+        financial_data: Dict[str, Dict[str, int]] = {}
+        for row in balance_rows:
+            if fs_div and row.get('fs_div') != fs_div:
+                continue
+            account_nm = (row.get('account_nm') or '').replace(' ', '')
+            if not account_nm or account_nm in financial_data:
+                continue
+            amounts = {
+                period_year: row[num_column]
+                for num_column, period_year in periods
+                if row.get(num_column) is not None
+            }
+            if amounts:
+                financial_data[account_nm] = amounts
+        
+        hierarchy = xbrl_parser.build_statement_hierarchy(financial_data) if financial_data else {}
+        payload, _ = cache_serializer.encode(hierarchy)
+        now = datetime.utcnow()
+        table = FinancialRollup.__table__
+        stmt = upsert_insert(table).values(
+            corp_code=corp_code,
+            reprt_code=reprt_code,
+            bsns_year=bsns_year,
+            fs_div=fs_div,
+            source=source,
+            hierarchy=payload,
+            updated_at=now
+        )
+        if source == "full":
+            # 연결 전체 재무제표 집계는 개별 전체 재무제표 집계로 덮어쓰지 않음
+            keep_existing = and_(table.c.source == "full", table.c.fs_div == "CFS", stmt.excluded.fs_div != "CFS")
+        else:
+            keep_existing = table.c.source == "full"
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['corp_code', 'reprt_code', 'bsns_year'],
+            set_={
+                'fs_div': stmt.excluded.fs_div,
+                'source': stmt.excluded.source,
+                'hierarchy': stmt.excluded.hierarchy,
+                'updated_at': now
+            },
+            where=or_(table.c.source.is_(None), ~keep_existing)
+        )
+        await session.execute(stmt)
+    
+    async def get_hierarchical_financials(
+        self,
+        session: AsyncSession,
+        corp_code: str,
+        years: int = 5,
+        reprt_code: str = "11011"
+    ) -> Optional[Dict]:
+        """저장된 계층형 집계를 최근 years개 연도로 병합하여 반환 (없으면 None)"""
+        stmt = select(FinancialRollup.hierarchy).where(
+            FinancialRollup.corp_code == corp_code,
+            FinancialRollup.reprt_code == reprt_code
+        ).order_by(desc(FinancialRollup.bsns_year)).limit(years)
         
-        for account_nm in account_names:
-            stmt = select(AccountCache).where(AccountCache.account_nm == account_nm)
-            result = await session.execute(stmt)
-            existing = result.scalar_one_or_none()
-            
-            if existing:
-                existing.usage_count += 1
-                existing.last_used = datetime.utcnow()
-            else:
-                cache_entry = AccountCache(
-                    account_nm=account_nm,
-                    usage_count=1
-                )
-                session.add(cache_entry)
+        result = await session.execute(stmt)
         
-        await session.commit()
+        # 집계할 계정이 없던 보고서는 빈 집계로 저장되어 있음
+        hierarchies = [cache_serializer.decode(payload)[0] for payload in result.scalars().all()]
+        hierarchies = [hierarchy for hierarchy in hierarchies if hierarchy]
+        if not hierarchies:
+            return None
+        return xbrl_parser.merge_hierarchies(hierarchies, years)
+    
+    async def _update_account_cache(self, session: AsyncSession, statements: List[Dict]) -> set:
+        """계정명 캐시 일괄 업데이트 후 계정명 반환 (커밋과 자동완성 인덱스 반영은 호출자가 수행)"""
+        account_names = _account_names(statements)
+        if not account_names:
+            return account_names
+        
+        now = datetime.utcnow()
+        table = AccountCache.__table__
+        stmt = upsert_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['account_nm'],
+            set_={
+                'usage_count': table.c.usage_count + 1,
+                'last_used': now
+            }
+        )
+        await session.execute(
+            stmt,
+            [{'account_nm': account_nm, 'usage_count': 1, 'last_used': now} for account_nm in account_names]
+        )
+        return account_names
     
     async def get_popular_accounts(
         self, 
@@ -584,7 +1230,10 @@ class DartApiService:
         query: str, 
         limit: int = 20
     ) -> List[str]:
-        """계정명 검색"""
+        """계정명 검색 (인메모리 인덱스 우선, 초성 검색 지원)"""
+        if account_index.loaded:
+            return account_index.search(query, limit)
+        
         stmt = select(AccountCache.account_nm).where(
             AccountCache.account_nm.like(f"%{query}%")
         ).order_by(
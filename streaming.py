@@ -0,0 +1,108 @@
+import csv
+import io
+import json
+import os
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional
+
+from fastapi import HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from database import async_session
+
+# 환경변수 로드
+from dotenv import load_dotenv
+load_dotenv()
+
+# 스트리밍 응답에서 한 번에 읽어 내보내는 행 수
+STREAM_CHUNK_SIZE = int(os.getenv("DART_STREAM_CHUNK_SIZE", "1000"))
+
+# 응답 형식 → Content-Type
+STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+ACCEPT_FORMATS = [
+    ("application/x-ndjson", "ndjson"),
+    ("application/jsonl", "ndjson"),
+    ("text/csv", "csv"),
+]
+RESPONSE_FORMATS = ("json", *STREAM_MEDIA_TYPES)
+
+
+def negotiate_format(request: Request, format: Optional[str] = None) -> str:
+    """응답 형식 결정 (format 파라미터 > Accept 헤더 > json)"""
+    if format:
+        format = format.lower()
+        if format not in RESPONSE_FORMATS:
+            raise HTTPException(status_code=400, detail=f"format은 {', '.join(RESPONSE_FORMATS)} 중 하나여야 합니다.")
+        return format
+
+    accept = request.headers.get("accept", "").lower()
+    for media_type, name in ACCEPT_FORMATS:
+        if media_type in accept:
+            return name
+    return "json"
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _csv_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _encode_header(keys, fmt: str) -> bytes:
+    if fmt != "csv":
+        return b""
+    # 엑셀에서 한글이 깨지지 않도록 BOM 포함
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(keys)
+    return ("\ufeff" + buffer.getvalue()).encode("utf-8")
+
+
+def _encode_rows(keys, rows, fmt: str) -> bytes:
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerows([_csv_value(value) for value in row] for row in rows)
+        return buffer.getvalue().encode("utf-8")
+    return "".join(
+        json.dumps(dict(zip(keys, row)), ensure_ascii=False, default=_json_default) + "\n"
+        for row in rows
+    ).encode("utf-8")
+
+
+async def _iter_rows(stmt, fmt: str) -> AsyncIterator[bytes]:
+    """서버 측 커서로 STREAM_CHUNK_SIZE 행씩 읽어 바로 인코딩"""
+    # 요청 세션은 응답 전송 전에 닫힐 수 있으므로 스트리밍 전용 세션 사용
+    async with async_session() as session:
+        result = await session.stream(stmt.execution_options(yield_per=STREAM_CHUNK_SIZE))
+        keys = list(result.keys())
+        yield _encode_header(keys, fmt)
+
+        async for rows in result.partitions(STREAM_CHUNK_SIZE):
+            yield _encode_rows(keys, rows, fmt)
+
+
+def _headers(fmt: str, filename: Optional[str]) -> Dict[str, str]:
+    if filename and fmt == "csv":
+        return {"Content-Disposition": f'attachment; filename="{filename}.csv"'}
+    return {}
+
+
+def stream_query(stmt, fmt: str, filename: Optional[str] = None) -> StreamingResponse:
+    """SELECT 결과를 NDJSON/CSV 스트리밍 응답으로 반환 (메모리에 전체 결과를 올리지 않음)"""
+    return StreamingResponse(_iter_rows(stmt, fmt), media_type=STREAM_MEDIA_TYPES[fmt], headers=_headers(fmt, filename))
+
+
+def stream_rows(rows: List[Dict], fmt: str, filename: Optional[str] = None) -> StreamingResponse:
+    """이미 메모리에 있는 행 목록을 NDJSON/CSV 응답으로 반환 (샘플 데이터 등)"""
+    keys = list(rows[0]) if rows else []
+    body = _encode_header(keys, fmt) + _encode_rows(keys, [[row.get(key) for key in keys] for row in rows], fmt)
+    return StreamingResponse(iter([body]), media_type=STREAM_MEDIA_TYPES[fmt], headers=_headers(fmt, filename))
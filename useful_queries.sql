@@ -143,3 +143,32 @@ GROUP BY account_nm
 HAVING COUNT(DISTINCT corp_code) >= 10  -- 10개 이상 기업에서 사용하는 계정만
 ORDER BY 사용기업수 DESC, 총사용횟수 DESC
 LIMIT 30;
+
+-- 11. 계정별 매출액 상위 기업 (숫자 컬럼 사용)
+SELECT 
+    c.corp_name as 기업명,
+    fs.bsns_year as 사업연도,
+    fs.thstrm_amount_num as 당기금액
+FROM financial_statements fs
+JOIN companies c ON fs.corp_code = c.corp_code
+WHERE fs.account_nm = '매출액'  -- 계정명 변경 가능
+  AND fs.bsns_year = '2023'
+  AND fs.reprt_code = '11011'
+  AND fs.thstrm_amount_num IS NOT NULL
+ORDER BY fs.thstrm_amount_num DESC
+LIMIT 20;
+
+-- 12. 전기 대비 증감률 (숫자 컬럼 사용)
+SELECT 
+    fs.corp_code as 기업코드,
+    fs.account_nm as 계정명,
+    fs.thstrm_amount_num as 당기금액,
+    fs.frmtrm_amount_num as 전기금액,
+    ROUND((fs.thstrm_amount_num - fs.frmtrm_amount_num) * 100.0 / ABS(fs.frmtrm_amount_num), 2) as 증감률
+FROM financial_statements fs
+WHERE fs.account_nm = '영업이익'  -- 계정명 변경 가능
+  AND fs.bsns_year = '2023'
+  AND fs.frmtrm_amount_num IS NOT NULL
+  AND fs.frmtrm_amount_num <> 0
+ORDER BY 증감률 DESC
+LIMIT 30;
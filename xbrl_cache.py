@@ -0,0 +1,169 @@
+import hashlib
+import re
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+from sqlalchemy import select, update, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import XbrlHierarchyCache, upsert_insert
+from cache_codec import cache_serializer
+
+# 보고서명 → 보고서 코드
+REPORT_CODES = [
+    ("1분기보고서", "11013"),
+    ("3분기보고서", "11014"),
+    ("반기보고서", "11012"),
+    ("사업보고서", "11011"),
+]
+
+# 보고서명의 사업연도 (예: "[기재정정]사업보고서 (2023.12)" → 2023)
+REPORT_PERIOD_PATTERN = re.compile(r"\((\d{4})\.\d{2}\)")
+
+
+def content_hash(xbrl_content: Union[str, bytes]) -> str:
+    """XBRL 원문 SHA-256"""
+    if isinstance(xbrl_content, str):
+        xbrl_content = xbrl_content.encode("utf-8")
+    return hashlib.sha256(xbrl_content).hexdigest()
+
+
+def amended_report_key(report_nm: str) -> Optional[Tuple[str, str]]:
+    """정정 공시인 정기보고서의 (사업연도, 보고서 코드), 해당 없으면 None"""
+    if not report_nm or "정정" not in report_nm:
+        return None
+
+    period = REPORT_PERIOD_PATTERN.search(report_nm)
+    if not period:
+        return None
+
+    for name, reprt_code in REPORT_CODES:
+        if name in report_nm:
+            return period.group(1), reprt_code
+    return None
+
+
+class XBRLHierarchyCache:
+    """(기업, 사업연도, 보고서) 단위 XBRL 계층 구조 캐시
+
+    제출된 보고서는 바뀌지 않으므로 만료 시간 없이 보관하고,
+    정정 공시가 접수되면 stale로 표시하여 다음 조회시 원문을 다시 확인합니다.
+    원문 해시가 같으면 다시 파싱하지 않습니다.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.invalidated = 0
+
+    async def get(self, session: AsyncSession, corp_code: str, bsns_year: str, reprt_code: str) -> Optional[Dict]:
+        """stale이 아닌 캐시 조회"""
+        result = await session.execute(
+            select(XbrlHierarchyCache.hierarchy).where(
+                XbrlHierarchyCache.corp_code == corp_code,
+                XbrlHierarchyCache.bsns_year == bsns_year,
+                XbrlHierarchyCache.reprt_code == reprt_code,
+                XbrlHierarchyCache.stale.is_(False)
+            )
+        )
+        payload = result.scalar()
+        if payload is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return cache_serializer.decode(payload)[0]
+
+    async def get_by_hash(
+        self,
+        session: AsyncSession,
+        corp_code: str,
+        bsns_year: str,
+        reprt_code: str,
+        xbrl_hash: str
+    ) -> Optional[Dict]:
+        """원문 해시가 같은 캐시가 있으면 stale 해제 후 반환 (다시 파싱할 필요 없음)"""
+        result = await session.execute(
+            select(XbrlHierarchyCache).where(
+                XbrlHierarchyCache.corp_code == corp_code,
+                XbrlHierarchyCache.bsns_year == bsns_year,
+                XbrlHierarchyCache.reprt_code == reprt_code
+            )
+        )
+        entry = result.scalar_one_or_none()
+        if entry is None or entry.content_hash != xbrl_hash:
+            return None
+
+        if entry.stale:
+            entry.stale = False
+            await session.commit()
+            self.revalidated += 1
+        return cache_serializer.decode(entry.hierarchy)[0]
+
+    async def put(
+        self,
+        session: AsyncSession,
+        corp_code: str,
+        bsns_year: str,
+        reprt_code: str,
+        xbrl_hash: str,
+        hierarchy: Dict
+    ):
+        """파싱 결과 저장"""
+        payload, _ = cache_serializer.encode(hierarchy)
+        now = datetime.utcnow()
+        stmt = upsert_insert(XbrlHierarchyCache.__table__).values(
+            corp_code=corp_code,
+            bsns_year=bsns_year,
+            reprt_code=reprt_code,
+            content_hash=xbrl_hash,
+            hierarchy=payload,
+            stale=False,
+            created_at=now,
+            updated_at=now
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['corp_code', 'bsns_year', 'reprt_code'],
+            set_={
+                'content_hash': stmt.excluded.content_hash,
+                'hierarchy': stmt.excluded.hierarchy,
+                'stale': False,
+                'updated_at': now
+            }
+        )
+        await session.execute(stmt)
+        await session.commit()
+
+    async def invalidate_amendments(self, session: AsyncSession, documents: Iterable[Dict]) -> int:
+        """새로 접수된 정정 공시에 해당하는 캐시를 stale로 표시 (커밋은 호출자가 수행)"""
+        keys = set()
+        for doc in documents:
+            report_key = amended_report_key(doc.get('report_nm', ''))
+            if report_key:
+                keys.add((doc['corp_code'], *report_key))
+
+        if not keys:
+            return 0
+
+        result = await session.execute(
+            update(XbrlHierarchyCache)
+            .where(tuple_(
+                XbrlHierarchyCache.corp_code, XbrlHierarchyCache.bsns_year, XbrlHierarchyCache.reprt_code
+            ).in_(list(keys)))
+            .values(stale=True)
+        )
+        self.invalidated += result.rowcount or 0
+        return result.rowcount or 0
+
+    def stats(self) -> Dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidated": self.revalidated,
+            "invalidated": self.invalidated,
+        }
+
+
+# XBRL 계층 구조 캐시 인스턴스
+xbrl_hierarchy_cache = XBRLHierarchyCache()
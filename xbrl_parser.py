@@ -1,9 +1,154 @@
 import xml.etree.ElementTree as ET
 import re
-from typing import Dict, List, Optional, Tuple
+from typing import AsyncIterable, Dict, IO, Iterator, List, Optional, Tuple, Union
 import asyncio
 import httpx
-from datetime import datetime
+from datetime import datetime, date
+
+# 스트리밍 파싱시 한 번에 읽는 크기
+PARSE_CHUNK_SIZE = 64 * 1024
+
+# 금액을 나타내는 요소 이름에 포함되는 단어
+FINANCIAL_TAGS = [
+    'Assets', 'Liabilities', 'Equity', 'Revenue', 'Expenses',
+    'Cash', 'Receivables', 'Inventory', 'Debt', 'Capital'
+]
+
+# XBRL 인스턴스 네임스페이스
+XBRLI_NS = "http://www.xbrl.org/2003/instance"
+XBRLI_CONTEXT = f"{{{XBRLI_NS}}}context"
+XBRLI_UNIT = f"{{{XBRLI_NS}}}unit"
+
+# 재무제표에 합계로 기재되는 계정명 (대분류명과 다른 경우)
+STATEMENT_TOTAL_ACCOUNTS = {
+    "자본": "자본총계",
+}
+
+# 태그 분류 결과 메모 최대 크기 (회사별 확장 태그가 계속 늘어나는 경우 대비)
+TAG_MEMO_MAX_SIZE = 50000
+
+
+def _iter_chunks(source: Union[str, bytes, IO]) -> Iterator[Union[str, bytes]]:
+    """문자열/bytes/파일 객체를 일정 크기 조각으로 나눔"""
+    if hasattr(source, 'read'):
+        while True:
+            chunk = source.read(PARSE_CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+    else:
+        for start in range(0, len(source), PARSE_CHUNK_SIZE):
+            yield source[start:start + PARSE_CHUNK_SIZE]
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+
+def _parse_context(elem) -> Dict:
+    """xbrli:context → 기간(instant/duration), 엔터티, 차원 정보"""
+    context = {
+        'entity': None,
+        'period_type': 'forever',
+        'start_date': None,
+        'end_date': None,
+        'dimensions': {},
+    }
+    for child in elem.iter():
+        name = _local_name(child.tag)
+        if name == 'identifier':
+            context['entity'] = (child.text or '').strip()
+        elif name == 'instant':
+            context['period_type'] = 'instant'
+            context['end_date'] = (child.text or '').strip()[:10]
+        elif name == 'startDate':
+            context['period_type'] = 'duration'
+            context['start_date'] = (child.text or '').strip()[:10]
+        elif name == 'endDate':
+            context['period_type'] = 'duration'
+            context['end_date'] = (child.text or '').strip()[:10]
+        elif name == 'explicitMember':
+            context['dimensions'][child.get('dimension')] = (child.text or '').strip()
+        elif name == 'typedMember':
+            context['dimensions'][child.get('dimension')] = ''.join(child.itertext()).strip()
+    
+    end_date = context['end_date']
+    context['year'] = end_date[:4] if end_date else 'unknown'
+    
+    # 같은 연도에 여러 기간이 있으면 가장 늦게 끝나고 가장 긴 기간을 사용
+    days = 0
+    if context['start_date'] and end_date:
+        try:
+            days = (date.fromisoformat(end_date) - date.fromisoformat(context['start_date'])).days
+        except ValueError:
+            pass
+    context['rank'] = (end_date or '', days)
+    return context
+
+
+def _parse_unit(elem) -> str:
+    """xbrli:unit → 측정 단위 (예: iso4217:KRW, iso4217:KRW/xbrli:shares)"""
+    numerator, denominator = [], []
+    denominator_measures = set()
+    for child in elem.iter():
+        name = _local_name(child.tag)
+        if name == 'unitDenominator':
+            for measure in child.iter():
+                if _local_name(measure.tag) == 'measure':
+                    denominator.append((measure.text or '').strip())
+                    denominator_measures.add(id(measure))
+        elif name == 'measure' and id(child) not in denominator_measures:
+            numerator.append((child.text or '').strip())
+    
+    unit = '*'.join(numerator)
+    return f"{unit}/{'*'.join(denominator)}" if denominator else unit
+
+
+class _FactCollector:
+    """XMLPullParser로 요소를 하나씩 처리하고, 처리가 끝난 요소는 바로 해제
+    
+    컨텍스트와 단위는 id별 조회 테이블로 만들고, 재무 요소는 해당 id만 참조합니다.
+    """
+    
+    def __init__(self, parser: "XBRLParser"):
+        self._parser = parser
+        self._pull = ET.XMLPullParser(events=("start", "end"))
+        self._root = None
+        self._depth = 0
+        self.contexts: Dict[str, Dict] = {}
+        self.units: Dict[str, str] = {}
+        # (계정명, contextRef, unitRef, 금액)
+        self.facts: List[Tuple[str, Optional[str], Optional[str], float]] = []
+    
+    def feed(self, chunk: Union[str, bytes]):
+        self._pull.feed(chunk)
+        self._drain()
+    
+    def close(self) -> "_FactCollector":
+        self._pull.close()
+        self._drain()
+        return self
+    
+    def _drain(self):
+        for event, elem in self._pull.read_events():
+            if event == "start":
+                if self._root is None:
+                    self._root = elem
+                self._depth += 1
+                continue
+            
+            self._depth -= 1
+            if elem.tag == XBRLI_CONTEXT:
+                self.contexts[elem.get('id')] = _parse_context(elem)
+            elif elem.tag == XBRLI_UNIT:
+                self.units[elem.get('id')] = _parse_unit(elem)
+            else:
+                self._parser._collect_fact(elem, self.facts)
+            
+            # 최상위 요소의 직계 자식이 끝나면 지금까지 처리한 요소 해제
+            if self._depth == 1:
+                self._root.clear()
+
 
 class XBRLParser:
     """XBRL 데이터 파싱 클래스"""
@@ -85,67 +230,138 @@ class XBRLParser:
                 "기타자본구성요소": ["자기주식", "기타포괄손익누계액"]
             }
         }
+        
+        self._compile_classifier()
     
-    def parse_xbrl_content(self, xbrl_content: str) -> Dict:
-        """XBRL XML 내용을 파싱하여 계층 구조 생성"""
+    def parse_xbrl_content(self, xbrl_content: Union[str, bytes, IO]) -> Dict:
+        """XBRL XML 내용을 파싱하여 계층 구조 생성 (문자열, bytes, 파일 객체)
+        
+        문서 전체를 트리로 만들지 않고 조각 단위로 읽으며, 처리한 요소는 바로 해제합니다.
+        """
         try:
-            # XML 네임스페이스 처리
-            root = ET.fromstring(xbrl_content)
-            
-            # 네임스페이스 매핑
-            namespaces = {
-                'xbrli': 'http://www.xbrl.org/2003/instance',
-                'us-gaap': 'http://fasb.org/us-gaap/2019-01-31',
-                'ifrs': 'http://xbrl.ifrs.org/taxonomy/2019-03-27/ifrs',
-                'dart': 'http://dart.fss.or.kr/xbrl/taxonomy/kr-gaap-2019-03-31'
-            }
-            
-            financial_data = {}
-            
-            # 모든 재무 항목 추출
-            for elem in root.iter():
-                if self._is_financial_element(elem):
-                    account_name = self._extract_account_name(elem)
-                    amount = self._extract_amount(elem)
-                    context = self._extract_context(elem)
-                    
-                    if account_name and amount is not None:
-                        if account_name not in financial_data:
-                            financial_data[account_name] = {}
-                        
-                        financial_data[account_name][context] = amount
+            collector = self._collect(xbrl_content)
             
             # 계층 구조로 정리
-            hierarchical_data = self._build_hierarchy(financial_data)
+            return self._build_hierarchy(self._financial_data(collector))
             
-            return hierarchical_data
+        except ET.ParseError as e:
+            print(f"XBRL 파싱 오류: {e}")
+            return {}
+    
+    async def parse_xbrl_stream(self, stream: AsyncIterable[bytes]) -> Dict:
+        """비동기 바이트 스트림(예: httpx 응답 aiter_bytes)을 받는 대로 파싱"""
+        try:
+            collector = _FactCollector(self)
+            async for chunk in stream:
+                collector.feed(chunk)
+            collector.close()
+            
+            return self._build_hierarchy(self._financial_data(collector))
             
         except ET.ParseError as e:
             print(f"XBRL 파싱 오류: {e}")
             return {}
     
-    def _is_financial_element(self, elem) -> bool:
-        """재무 요소인지 확인"""
-        # 금액을 나타내는 요소들 확인
-        financial_tags = [
-            'Assets', 'Liabilities', 'Equity', 'Revenue', 'Expenses',
-            'Cash', 'Receivables', 'Inventory', 'Debt', 'Capital'
-        ]
+    def parse_xbrl_facts(self, xbrl_content: Union[str, bytes, IO]) -> Dict:
+        """컨텍스트/단위 조회 테이블과 이를 id로 참조하는 재무 요소 목록"""
+        collector = self._collect(xbrl_content)
+        return {
+            'contexts': {
+                context_id: {key: value for key, value in context.items() if key != 'rank'}
+                for context_id, context in collector.contexts.items()
+            },
+            'units': collector.units,
+            'facts': [
+                {'account_nm': account_name, 'context_ref': context_ref, 'unit_ref': unit_ref, 'amount': amount}
+                for account_name, context_ref, unit_ref, amount in collector.facts
+            ],
+        }
+    
+    def _collect(self, xbrl_content: Union[str, bytes, IO]) -> _FactCollector:
+        collector = _FactCollector(self)
+        for chunk in _iter_chunks(xbrl_content):
+            collector.feed(chunk)
+        return collector.close()
+    
+    def _collect_fact(self, elem, facts: List):
+        """재무 요소이면 계정명, 컨텍스트/단위 id, 금액 저장"""
+        account_name = self.classify_tag(elem.tag)
+        if account_name is None:
+            return
+        
+        amount = self._extract_amount(elem)
+        if amount is not None:
+            facts.append((account_name, elem.get('contextRef'), elem.get('unitRef'), amount))
+    
+    def _financial_data(self, collector: _FactCollector) -> Dict:
+        """계정명 → 연도별 금액
         
-        tag_name = elem.tag.split('}')[-1] if '}' in elem.tag else elem.tag
+        차원(세그먼트 등)이 있는 컨텍스트는 세부 내역이므로 합계에서 제외하고,
+        같은 연도에 여러 기간이 있으면 가장 늦게 끝나는 가장 긴 기간(누적)의 값을 사용합니다.
+        """
+        financial_data: Dict = {}
+        ranks: Dict[Tuple[str, str], Tuple[str, int]] = {}
         
-        return any(financial_tag in tag_name for financial_tag in financial_tags)
+        for account_name, context_ref, _, amount in collector.facts:
+            context = collector.contexts.get(context_ref)
+            if context is None:
+                year, rank = self._extract_context(context_ref), ('', 0)
+            elif context['dimensions']:
+                continue
+            else:
+                year, rank = context['year'], context['rank']
+            
+            key = (account_name, year)
+            if key in ranks and ranks[key] > rank:
+                continue
+            ranks[key] = rank
+            
+            if account_name not in financial_data:
+                financial_data[account_name] = {}
+            financial_data[account_name][year] = amount
+        
+        return financial_data
     
-    def _extract_account_name(self, elem) -> str:
-        """계정명 추출"""
-        tag_name = elem.tag.split('}')[-1] if '}' in elem.tag else elem.tag
+    def _compile_classifier(self):
+        """태그 분류기 준비 (account_mapping을 변경한 경우 다시 호출)"""
+        self._financial_pattern = re.compile("|".join(re.escape(tag) for tag in FINANCIAL_TAGS))
+        
+        # 매핑 순서 유지 (앞에 있는 항목이 우선)
+        self._mapping_items = [(english.lower(), korean) for korean, english in self.account_mapping.items()]
+        self._mapping_pattern = re.compile("|".join(re.escape(english) for english, _ in self._mapping_items))
         
-        # CamelCase를 한국어로 변환 (간단한 매핑)
-        for korean, english in self.account_mapping.items():
-            if english.lower() in tag_name.lower():
+        # 표준 이름과 정확히 같은 태그는 바로 조회
+        self._exact_names = {english: self._match_mapping(english) for english, _ in self._mapping_items}
+        
+        # 태그(네임스페이스 포함) → 계정명 (재무 요소가 아니면 None)
+        self._tag_memo: Dict[str, Optional[str]] = {}
+    
+    def _match_mapping(self, lowered: str) -> Optional[str]:
+        """표준 이름이 포함된 첫 번째 매핑의 한국어 계정명"""
+        if not self._mapping_pattern.search(lowered):
+            return None
+        for english, korean in self._mapping_items:
+            if english in lowered:
                 return korean
+        return None
+    
+    def classify_tag(self, tag: str) -> Optional[str]:
+        """재무 요소이면 계정명, 아니면 None (태그별로 한 번만 계산)"""
+        try:
+            return self._tag_memo[tag]
+        except KeyError:
+            pass
+        
+        tag_name = tag.rsplit('}', 1)[-1]
+        account_name = None
+        if self._financial_pattern.search(tag_name):
+            lowered = tag_name.lower()
+            account_name = self._exact_names.get(lowered) or self._match_mapping(lowered) or tag_name
         
-        return tag_name
+        if len(self._tag_memo) >= TAG_MEMO_MAX_SIZE:
+            self._tag_memo.clear()
+        self._tag_memo[tag] = account_name
+        return account_name
     
     def _extract_amount(self, elem) -> Optional[float]:
         """금액 추출"""
@@ -159,12 +375,9 @@ class XBRLParser:
             pass
         return None
     
-    def _extract_context(self, elem) -> str:
-        """컨텍스트 추출 (연도 정보)"""
-        context_ref = elem.get('contextRef', '')
-        
-        # 연도 정보 추출 (예: "2023_12_31" → "2023")
-        year_match = re.search(r'(\d{4})', context_ref)
+    def _extract_context(self, context_ref: Optional[str]) -> str:
+        """문서에 정의되지 않은 contextRef의 연도 추정 (예: "2023_12_31" → "2023")"""
+        year_match = re.search(r'(\d{4})', context_ref or '')
         if year_match:
             return year_match.group(1)
         
@@ -222,6 +435,53 @@ class XBRLParser:
         
         return result
 
+    def build_statement_hierarchy(self, financial_data: Dict) -> Dict:
+        """재무제표 계정 금액으로 계층 구조 생성
+        
+        하위 항목 합계보다 보고서에 직접 기재된 합계 계정(예: 유동자산)을 우선 사용합니다.
+        """
+        result = self._build_hierarchy(financial_data)
+        
+        for main_category, main_node in result.items():
+            category_total: Dict[str, float] = {}
+            for sub_category, sub_node in main_node["details"].items():
+                if sub_category in financial_data:
+                    sub_node["amount"] = dict(financial_data[sub_category])
+                for year, amount in sub_node["amount"].items():
+                    category_total[year] = category_total.get(year, 0) + amount
+            main_node["amount"] = category_total
+            
+            for total_name in (main_category, STATEMENT_TOTAL_ACCOUNTS.get(main_category)):
+                if total_name in financial_data:
+                    main_node["amount"] = dict(financial_data[total_name])
+                    break
+        
+        return result
+    
+    def merge_hierarchies(self, hierarchies: List[Dict], years: int) -> Dict:
+        """보고서별 계층 구조를 연도별로 병합 (앞쪽 = 최신 보고서 값 우선, 최근 years개 연도만)"""
+        def merge(target: Dict, source: Dict):
+            for name, node in source.items():
+                merged = target.setdefault(name, {"amount": {}, "has_details": node.get("has_details", False)})
+                for year, amount in node.get("amount", {}).items():
+                    merged["amount"].setdefault(year, amount)
+                if node.get("details"):
+                    merge(merged.setdefault("details", {}), node["details"])
+        
+        def trim(nodes: Dict, keep: set):
+            for node in nodes.values():
+                node["amount"] = {year: amount for year, amount in node["amount"].items() if year in keep}
+                if node.get("details"):
+                    trim(node["details"], keep)
+        
+        result: Dict = {}
+        for hierarchy in hierarchies:
+            merge(result, hierarchy)
+        
+        all_years = {year for node in result.values() for year in node["amount"]}
+        trim(result, set(sorted(all_years, reverse=True)[:years]))
+        return result
+
 # 샘플 데이터 생성 함수 (XBRL API가 없을 때 사용)
 def generate_sample_hierarchical_data() -> Dict:
     """네이버 증권 스타일의 샘플 데이터 생성"""
@@ -0,0 +1,191 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional, Set, Tuple, Union
+
+# 환경변수 로드
+from dotenv import load_dotenv
+load_dotenv()
+
+# XBRL 파싱 프로세스 수 / 처리 중+대기 중 최대 요청 수 / 요청당 최대 파싱 시간 (초)
+XBRL_POOL_SIZE = int(os.getenv("DART_XBRL_POOL_SIZE", "2"))
+XBRL_POOL_MAX_PENDING = int(os.getenv("DART_XBRL_POOL_MAX_PENDING", "16"))
+XBRL_PARSE_TIMEOUT = float(os.getenv("DART_XBRL_PARSE_TIMEOUT", "60"))
+
+# 지연시간 통계에 사용할 최근 요청 수
+LATENCY_WINDOW = 200
+
+
+class XBRLPoolBusy(Exception):
+    """대기 중인 파싱 요청이 너무 많음"""
+    pass
+
+
+class XBRLParseTimeout(Exception):
+    """파싱 시간 초과"""
+    pass
+
+
+class XBRLWorkerCrashed(XBRLPoolBusy):
+    """파싱 프로세스가 비정상 종료됨 (풀을 새로 만들었으므로 다시 요청 가능)"""
+    pass
+
+
+def _parse_in_worker(xbrl_content: Union[str, bytes]) -> Tuple[Dict, float]:
+    """워커 프로세스에서 실행 (파싱 결과, 파싱 시작 시각) 반환"""
+    from xbrl_parser import xbrl_parser
+
+    started_at = time.time()
+    return xbrl_parser.parse_xbrl_content(xbrl_content), started_at
+
+
+def _percentile(values, ratio: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * ratio))]
+
+
+class XBRLParsePool:
+    """XBRL 파싱 전용 프로세스 풀 (이벤트 루프를 막지 않도록 별도 프로세스에서 파싱)"""
+
+    def __init__(
+        self,
+        max_workers: int = XBRL_POOL_SIZE,
+        max_pending: int = XBRL_POOL_MAX_PENDING,
+        timeout: float = XBRL_PARSE_TIMEOUT
+    ):
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # 풀별 처리 중인 요청 수 / 교체되어 남은 요청이 끝나면 종료할 풀
+        self._inflight: Dict[ProcessPoolExecutor, int] = {}
+        self._retiring: Set[ProcessPoolExecutor] = set()
+
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.cancelled = 0
+        self.recycles = 0
+        self._queue_ms = deque(maxlen=LATENCY_WINDOW)
+        self._latency_ms = deque(maxlen=LATENCY_WINDOW)
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        # 실행 중인 이벤트 루프/스레드를 복제하지 않도록 spawn 방식 사용
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+
+    def start(self):
+        """프로세스 풀 생성 (앱 시작시 호출)"""
+        if self._executor is None:
+            self._executor = self._create_executor()
+            print(f"XBRL 파싱 프로세스 풀 시작: {self.max_workers}개")
+
+    def shutdown(self):
+        """프로세스 풀 종료 (앱 종료시 호출)"""
+        for executor in list(self._retiring):
+            self._inflight[executor] = 0
+            self._terminate_if_drained(executor)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            print("XBRL 파싱 프로세스 풀 종료")
+
+    def _recycle(self, executor: ProcessPoolExecutor):
+        """멈추거나 깨진 풀을 새 풀로 교체 (이미 교체된 풀이면 무시)
+
+        교체된 풀에서 처리 중인 다른 요청은 끝날 때까지 기다린 뒤 프로세스를 정리합니다.
+        """
+        if self._executor is not executor:
+            return
+        self._executor = self._create_executor()
+        self._retiring.add(executor)
+        self.recycles += 1
+        self._terminate_if_drained(executor)
+
+    def _terminate_if_drained(self, executor: ProcessPoolExecutor):
+        """교체된 풀에 기다리는 요청이 없으면 남은 프로세스(멈춘 워커 포함) 종료"""
+        if executor not in self._retiring or self._inflight.get(executor, 0) > 0:
+            return
+        self._retiring.discard(executor)
+        self._inflight.pop(executor, None)
+        processes = list((getattr(executor, "_processes", None) or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+
+    async def parse(self, xbrl_content: Union[str, bytes]) -> Dict:
+        """XBRL 문서를 프로세스 풀에서 파싱하여 계층 구조 반환"""
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise XBRLPoolBusy(f"XBRL 파싱 대기 요청이 너무 많습니다. (최대 {self.max_pending}건)")
+
+        if self._executor is None:
+            self.start()
+
+        # 요청을 보낸 풀을 기록 (중간에 풀이 교체되어도 이 풀 기준으로 정리)
+        executor = self._executor
+        loop = asyncio.get_running_loop()
+        submitted_at = time.time()
+        self.pending += 1
+        self._inflight[executor] = self._inflight.get(executor, 0) + 1
+        try:
+            future = loop.run_in_executor(executor, _parse_in_worker, xbrl_content)
+            result, started_at = await asyncio.wait_for(future, self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            self._recycle(executor)
+            raise XBRLParseTimeout(f"XBRL 파싱 시간이 {self.timeout:g}초를 넘었습니다.")
+        except asyncio.CancelledError:
+            # 아직 시작하지 않은 요청은 wait_for 취소와 함께 풀에서 제거됨
+            self.cancelled += 1
+            raise
+        except BrokenProcessPool:
+            self.failed += 1
+            self._recycle(executor)
+            raise XBRLWorkerCrashed("XBRL 파싱 프로세스가 비정상 종료되었습니다. 다시 시도해주세요.")
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.pending -= 1
+            self._inflight[executor] -= 1
+            self._terminate_if_drained(executor)
+
+        finished_at = time.time()
+        self.completed += 1
+        self._queue_ms.append((started_at - submitted_at) * 1000)
+        self._latency_ms.append((finished_at - submitted_at) * 1000)
+        return result
+
+    def stats(self) -> Dict:
+        return {
+            "workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "timeout_seconds": self.timeout,
+            "pending": self.pending,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "cancelled": self.cancelled,
+            "recycles": self.recycles,
+            "retiring_pools": len(self._retiring),
+            "queue_ms_p50": round(_percentile(self._queue_ms, 0.5), 1),
+            "queue_ms_p95": round(_percentile(self._queue_ms, 0.95), 1),
+            "latency_ms_p50": round(_percentile(self._latency_ms, 0.5), 1),
+            "latency_ms_p95": round(_percentile(self._latency_ms, 0.95), 1),
+        }
+
+
+# XBRL 파싱 프로세스 풀 인스턴스
+xbrl_pool = XBRLParsePool()